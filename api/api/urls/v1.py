@@ -6,7 +6,7 @@ from rest_framework import authentication, permissions, routers
 
 from app_analytics.views import SDKAnalyticsFlags, SelfHostedTelemetryAPIView
 from environments.identities.traits.views import SDKTraits
-from environments.identities.views import SDKIdentities
+from environments.identities.views import SDKBulkIdentities, SDKIdentities
 from environments.sdk.views import SDKEnvironmentAPIView
 from features.feature_health.views import feature_health_webhook
 from features.views import SDKFeatureStates
@@ -60,6 +60,12 @@ urlpatterns = [
     # Client SDK urls
     re_path(r"^flags/$", SDKFeatureStates.as_view(), name="flags"),
     re_path(r"^identities/$", SDKIdentities.as_view(), name="sdk-identities"),
+    # Note that `identities/<...>/` is taken by the deprecated identities endpoint.
+    re_path(
+        r"^identities-bulk/$",
+        SDKBulkIdentities.as_view(),
+        name="sdk-identities-bulk",
+    ),
     re_path(r"^traits/", include(traits_router.urls), name="traits"),
     re_path(r"^analytics/flags/$", SDKAnalyticsFlags.as_view(), name="analytics-flags"),
     re_path(r"^analytics/telemetry/$", SelfHostedTelemetryAPIView.as_view()),
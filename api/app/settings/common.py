@@ -384,9 +384,22 @@ INFLUXDB_TOKEN = env.str("INFLUXDB_TOKEN", default="")
 INFLUXDB_BUCKET = env.str("INFLUXDB_BUCKET", default="")
 INFLUXDB_URL = env.str("INFLUXDB_URL", default="")
 INFLUXDB_ORG = env.str("INFLUXDB_ORG", default="")
+# Records are written to Influx in batches, in the background. Records are
+# dropped while the writer has INFLUXDB_WRITER_MAX_QUEUE_SIZE records to write.
+INFLUXDB_WRITER_BATCH_SIZE = env.int("INFLUXDB_WRITER_BATCH_SIZE", default=500)
+INFLUXDB_WRITER_FLUSH_INTERVAL_MS = env.int(
+    "INFLUXDB_WRITER_FLUSH_INTERVAL_MS", default=1000
+)
+INFLUXDB_WRITER_MAX_QUEUE_SIZE = env.int(
+    "INFLUXDB_WRITER_MAX_QUEUE_SIZE", default=10000
+)
 
 USE_POSTGRES_FOR_ANALYTICS = env.bool("USE_POSTGRES_FOR_ANALYTICS", default=False)
 USE_CACHE_FOR_USAGE_DATA = env.bool("USE_CACHE_FOR_USAGE_DATA", default=True)
+# Read organisation wide API usage from the daily rollups, rather than from the
+# API usage buckets. Enable once the rollups have been populated for the
+# periods being read, e.g. with the `populate_buckets` management command.
+USE_API_USAGE_DAILY_ROLLUPS = env.bool("USE_API_USAGE_DAILY_ROLLUPS", default=False)
 
 API_USAGE_CACHE_SECONDS = env.int("API_USAGE_CACHE_SECONDS", default=0)
 
@@ -399,6 +412,18 @@ FEATURE_EVALUATION_CACHE_SECONDS = env.int(
     "FEATURE_EVALUATION_CACHE_SECONDS", default=60
 )
 
+# Number of independently locked stripes the API usage and feature evaluation
+# caches spread their counts over, to reduce lock contention between threads.
+ANALYTICS_CACHE_STRIPES = env.int("ANALYTICS_CACHE_STRIPES", default=16)
+
+# Flush the API usage and feature evaluation caches from a background thread.
+# When disabled, they're flushed on the request path once their interval has
+# elapsed instead. Either way, they're flushed when the process exits.
+ANALYTICS_CACHE_FLUSH_IN_BACKGROUND = env.bool(
+    "ANALYTICS_CACHE_FLUSH_IN_BACKGROUND", default=True
+)
+ANALYTICS_CACHE_FLUSH_AT_EXIT = True
+
 ENABLE_API_USAGE_TRACKING = env.bool("ENABLE_API_USAGE_TRACKING", default=True)
 
 if ENABLE_API_USAGE_TRACKING:
@@ -698,6 +723,10 @@ FLAGS_CACHE_LOCATION = "environment-flags"
 CHARGEBEE_CACHE_LOCATION = "chargebee-objects"
 
 ENVIRONMENT_CACHE_SECONDS = env.int("ENVIRONMENT_CACHE_SECONDS", default=60)
+# When set, environments are kept in the cache for this many seconds after
+# ENVIRONMENT_CACHE_SECONDS has elapsed. During that time the stale environment is
+# still used while a background thread refreshes it from the database.
+ENVIRONMENT_CACHE_STALE_SECONDS = env.int("ENVIRONMENT_CACHE_STALE_SECONDS", default=0)
 ENVIRONMENT_CACHE_BACKEND = env.str(
     "ENVIRONMENT_CACHE_BACKEND",
     default="django.core.cache.backends.locmem.LocMemCache",
@@ -707,6 +736,14 @@ ENVIRONMENT_CACHE_LOCATION = env.str(
     "ENVIRONMENT_CACHE_LOCATION", default=ENVIRONMENT_CACHE_NAME
 )
 
+# Redis used to broadcast environment cache invalidation events to all API
+# processes, so they can drop their cached copies of changed environments. When
+# unset, events are only handled by the process which publishes them.
+CACHE_INVALIDATION_REDIS_URL = env.str("CACHE_INVALIDATION_REDIS_URL", default=None)
+CACHE_INVALIDATION_CHANNEL = env.str(
+    "CACHE_INVALIDATION_CHANNEL", default="environment-cache-invalidation"
+)
+
 GET_FLAGS_ENDPOINT_CACHE_SECONDS = env.int(
     "GET_FLAGS_ENDPOINT_CACHE_SECONDS", default=0
 )
@@ -733,6 +770,14 @@ GET_IDENTITIES_ENDPOINT_CACHE_LOCATION = env.str(
     default=GET_IDENTITIES_ENDPOINT_CACHE_NAME,
 )
 
+# Add ETags to the responses of the SDK flags and identities endpoints so that
+# polling clients can send If-None-Match and receive a 304 when nothing changed.
+ENABLE_SDK_ETAGS = env.bool("ENABLE_SDK_ETAGS", default=False)
+
+# The maximum number of identities which can be evaluated in a single request
+# to the SDK bulk identities endpoint.
+SDK_BULK_IDENTITIES_MAX_ITEMS = env.int("SDK_BULK_IDENTITIES_MAX_ITEMS", default=5000)
+
 BAD_ENVIRONMENTS_CACHE_LOCATION = "bad-environments"
 CACHE_BAD_ENVIRONMENTS_SECONDS = env.int("CACHE_BAD_ENVIRONMENTS_SECONDS", 0)
 CACHE_BAD_ENVIRONMENTS_AFTER_FAILURES = env.int(
@@ -752,6 +797,67 @@ ENVIRONMENT_SEGMENTS_CACHE_BACKEND = env(
     "django.core.cache.backends.locmem.LocMemCache",
 )
 
+# Select the highest priority version of each feature state in the database,
+# rather than loading every live version. Not used with v2 versioning.
+RESOLVE_FEATURE_STATE_PRIORITY_IN_DATABASE = env.bool(
+    "RESOLVE_FEATURE_STATE_PRIORITY_IN_DATABASE", default=True
+)
+
+# Read live feature states from a table of the feature states which are live in
+# each environment, rather than resolving their versions. To enable, maintain the
+# table, populate it with the `rebuild_live_feature_states` management command,
+# and then use it. Note that, when reading from the table, scheduled feature
+# states and versions only go live once the `promote_scheduled_live_feature_states`
+# recurring task next runs, i.e. up to a minute after they're scheduled to.
+USE_LIVE_FEATURE_STATES = env.bool("USE_LIVE_FEATURE_STATES", default=False)
+MAINTAIN_LIVE_FEATURE_STATES = env.bool(
+    "MAINTAIN_LIVE_FEATURE_STATES", default=USE_LIVE_FEATURE_STATES
+)
+
+# Names of the features in each environment, used to validate the flag analytics
+# posted by SDKs. Entries are invalidated when features are created or deleted.
+ENVIRONMENT_FEATURE_NAMES_CACHE_LOCATION = "environment-feature-names"
+ENVIRONMENT_FEATURE_NAMES_CACHE_SECONDS = env.int(
+    "CACHE_ENVIRONMENT_FEATURE_NAMES_SECONDS", 60
+)
+
+# Latest versions of the features in each environment using v2 versioning. Entries
+# expire when the next scheduled version goes live, and are invalidated when
+# versions are published.
+ENVIRONMENT_LATEST_VERSIONS_CACHE_LOCATION = "environment-latest-versions"
+ENVIRONMENT_LATEST_VERSIONS_CACHE_SECONDS = env.int(
+    "CACHE_ENVIRONMENT_LATEST_VERSIONS_SECONDS", 60
+)
+
+# Results of InfluxDB usage queries, per day, for the days which are over.
+# These don't change, so are cached without a timeout.
+INFLUXDB_QUERY_CACHE_NAME = "influxdb-query"
+INFLUXDB_QUERY_CACHE_BACKEND = env(
+    "INFLUXDB_QUERY_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+)
+INFLUXDB_QUERY_CACHE_LOCATION = env("INFLUXDB_QUERY_CACHE_LOCATION", "influxdb-query")
+INFLUXDB_QUERY_CACHE_OPTIONS: dict[str, str] = env.dict(
+    "INFLUXDB_QUERY_CACHE_OPTIONS", default={"MAX_ENTRIES": "10000"}
+)
+
+# Compiled segment indexes are held in-process (unpickled) and are invalidated
+# whenever the environment's `updated_at` changes. Set to 0 to disable.
+SEGMENT_INDEX_CACHE_MAX_ENTRIES = env.int("SEGMENT_INDEX_CACHE_MAX_ENTRIES", 1000)
+
+# Engine models of the environment documents read from DynamoDB, with their
+# compiled segments, used to evaluate the segments of edge identities. Held
+# in-process and invalidated whenever the environment's `updated_at` changes.
+# Set to 0 to disable.
+ENGINE_ENVIRONMENT_CACHE_MAX_ENTRIES = env.int(
+    "ENGINE_ENVIRONMENT_CACHE_MAX_ENTRIES", 100
+)
+
+# When set, only one worker at a time rebuilds a missing flags or environment
+# document cache entry, with other workers waiting up to this many seconds for it
+# to be written. Requires a cache backend shared between workers, e.g. Redis.
+# Rebuilds are always coalesced within a single process.
+CACHE_REBUILD_LOCK_SECONDS = env.int("CACHE_REBUILD_LOCK_SECONDS", 0)
+
 CACHE_ENVIRONMENT_DOCUMENT_LOCATION = env(
     "CACHE_ENVIRONMENT_DOCUMENT_LOCATION", default="environment-documents"
 )
@@ -764,6 +870,18 @@ CACHE_ENVIRONMENT_DOCUMENT_MODE = env.enum(
     default=EnvironmentDocumentCacheMode.EXPIRING.value,
 )
 CACHE_ENVIRONMENT_DOCUMENT_SECONDS = env.int("CACHE_ENVIRONMENT_DOCUMENT_SECONDS", 0)
+# Number of environment documents to keep in an in-process cache in front of the
+# shared environment document cache. Entries are validated against a version stamp
+# held in the shared cache. Set to 0 to disable.
+CACHE_ENVIRONMENT_DOCUMENT_LOCAL_MAX_ENTRIES = env.int(
+    "CACHE_ENVIRONMENT_DOCUMENT_LOCAL_MAX_ENTRIES", 0
+)
+# Store environment documents as rendered and gzip compressed JSON, alongside the
+# documents themselves, so they can be served to SDKs as-is. Only applies when
+# CACHE_ENVIRONMENT_DOCUMENT_MODE == "PERSISTENT".
+CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED = env.bool(
+    "CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED", default=False
+)
 CACHE_ENVIRONMENT_DOCUMENT_OPTIONS = env.json(
     "CACHE_ENVIRONMENT_DOCUMENT_OPTIONS", default=None
 )
@@ -777,6 +895,15 @@ if (
         'since CACHE_ENVIRONMENT_DOCUMENT_MODE == "PERSISTENT"'
     )  # pragma: no cover
 
+if (
+    CACHE_ENVIRONMENT_DOCUMENT_MODE != EnvironmentDocumentCacheMode.PERSISTENT
+    and CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED
+):
+    warnings.warn(
+        "Ignoring CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED variable "
+        'since CACHE_ENVIRONMENT_DOCUMENT_MODE != "PERSISTENT"'
+    )  # pragma: no cover
+
 USER_THROTTLE_CACHE_NAME = "user-throttle"
 USER_THROTTLE_CACHE_BACKEND = env.str(
     "USER_THROTTLE_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
@@ -834,6 +961,22 @@ CACHES = {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
         "LOCATION": PROJECT_SEGMENTS_CACHE_LOCATION,
     },
+    ENVIRONMENT_FEATURE_NAMES_CACHE_LOCATION: {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": ENVIRONMENT_FEATURE_NAMES_CACHE_LOCATION,
+        "TIMEOUT": ENVIRONMENT_FEATURE_NAMES_CACHE_SECONDS,
+    },
+    ENVIRONMENT_LATEST_VERSIONS_CACHE_LOCATION: {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": ENVIRONMENT_LATEST_VERSIONS_CACHE_LOCATION,
+        "TIMEOUT": ENVIRONMENT_LATEST_VERSIONS_CACHE_SECONDS,
+    },
+    INFLUXDB_QUERY_CACHE_NAME: {
+        "BACKEND": INFLUXDB_QUERY_CACHE_BACKEND,
+        "LOCATION": INFLUXDB_QUERY_CACHE_LOCATION,
+        "OPTIONS": INFLUXDB_QUERY_CACHE_OPTIONS,
+        "TIMEOUT": None,
+    },
     BAD_ENVIRONMENTS_CACHE_LOCATION: {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
         "LOCATION": BAD_ENVIRONMENTS_CACHE_LOCATION,
@@ -1170,6 +1313,8 @@ RETRY_WEBHOOKS = TASK_RUN_METHOD == TaskRunMethod.TASK_PROCESSOR
 SSE_SERVER_BASE_URL = env.str("SSE_SERVER_BASE_URL", None)
 SSE_AUTHENTICATION_TOKEN = env.str("SSE_AUTHENTICATION_TOKEN", None)
 AWS_SSE_LOGS_BUCKET_NAME = env.str("AWS_SSE_LOGS_BUCKET_NAME", None)
+# Number of SSE access log files downloaded and decrypted in parallel.
+SSE_ACCESS_LOGS_MAX_WORKERS = env.int("SSE_ACCESS_LOGS_MAX_WORKERS", 8)
 
 RAW_ANALYTICS_DATA_RETENTION_DAYS = env.int("RAW_ANALYTICS_DATA_RETENTION_DAYS", 30)
 BUCKETED_ANALYTICS_DATA_RETENTION_DAYS = env.int(
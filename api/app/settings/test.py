@@ -65,4 +65,8 @@ PAhkbx1Jf3FftZf4YL9X3W3ghczPPatemfylyAFiTGH5FrjlhlRJn+8owfWjK3zN
 
 ENABLE_POSTPONE_DECORATOR = False
 
+ANALYTICS_CACHE_FLUSH_IN_BACKGROUND = False
+# The database isn't available once the tests have finished.
+ANALYTICS_CACHE_FLUSH_AT_EXIT = False
+
 DEBUG = True
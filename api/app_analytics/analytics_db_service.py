@@ -1,4 +1,4 @@
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time, timedelta
 
 import structlog
 from dateutil.relativedelta import relativedelta
@@ -9,6 +9,9 @@ from rest_framework.exceptions import NotFound
 
 from app_analytics import constants
 from app_analytics.dataclasses import FeatureEvaluationData, UsageData
+from app_analytics.influxdb_wrapper import (
+    get_current_api_usage as get_current_api_usage_from_influxdb,
+)
 from app_analytics.influxdb_wrapper import (
     get_events_for_organisation,
 )
@@ -21,6 +24,7 @@ from app_analytics.influxdb_wrapper import (
 from app_analytics.mappers import map_annotated_api_usage_buckets_to_usage_data
 from app_analytics.models import (
     APIUsageBucket,
+    APIUsageDailyRollup,
     FeatureEvaluationBucket,
 )
 from app_analytics.types import Labels, PeriodType
@@ -87,6 +91,14 @@ def get_usage_data_from_local_db(
     if date_stop is None:
         date_stop = timezone.now()
 
+    if settings.USE_API_USAGE_DAILY_ROLLUPS and not (project_id or environment_id):
+        return _get_organisation_usage_data_from_daily_rollups(
+            organisation_id=organisation.id,
+            date_start=date_start,
+            date_stop=date_stop,
+            labels_filter=labels_filter,
+        )
+
     qs = APIUsageBucket.objects.filter(
         environment_id__in=_get_environment_ids_for_org(organisation),
         bucket_size=constants.ANALYTICS_READ_BUCKET_SIZE,
@@ -123,7 +135,13 @@ def get_total_events_count(organisation) -> int:  # type: ignore[no-untyped-def]
     """
     Return total number of events for an organisation in the last 30 days
     """
-    if settings.USE_POSTGRES_FOR_ANALYTICS:
+    if settings.USE_POSTGRES_FOR_ANALYTICS and settings.USE_API_USAGE_DAILY_ROLLUPS:
+        count = APIUsageDailyRollup.objects.filter(
+            organisation_id=organisation.id,
+            day__lte=date.today(),
+            day__gt=date.today() - timedelta(days=30),
+        ).aggregate(total_count=Sum("total_count"))["total_count"]
+    elif settings.USE_POSTGRES_FOR_ANALYTICS:
         count = APIUsageBucket.objects.filter(
             environment_id__in=_get_environment_ids_for_org(organisation),
             created_at__date__lte=date.today(),
@@ -135,6 +153,15 @@ def get_total_events_count(organisation) -> int:  # type: ignore[no-untyped-def]
     return count  # type: ignore[no-any-return]
 
 
+def get_current_api_usage(organisation_id: int, date_start: datetime) -> int:
+    """
+    Return the number of API calls made by an organisation since `date_start`.
+    """
+    if settings.USE_POSTGRES_FOR_ANALYTICS and settings.USE_API_USAGE_DAILY_ROLLUPS:
+        return _get_current_api_usage_from_daily_rollups(organisation_id, date_start)
+    return get_current_api_usage_from_influxdb(organisation_id, date_start)
+
+
 def get_feature_evaluation_data(
     feature: Feature,
     environment_id: int,
@@ -197,6 +224,73 @@ def get_feature_evaluation_data_from_local_db(
     return usage_list
 
 
+def _get_organisation_usage_data_from_daily_rollups(
+    organisation_id: int,
+    date_start: datetime,
+    date_stop: datetime,
+    labels_filter: Labels | None = None,
+) -> list[UsageData]:
+    qs = APIUsageDailyRollup.objects.filter(
+        organisation_id=organisation_id,
+        day__lte=date_stop,
+        day__gt=date_start,
+    )
+    if labels_filter:
+        qs = qs.filter(labels__contains=labels_filter)
+
+    return map_annotated_api_usage_buckets_to_usage_data(
+        {
+            "created_at__date": row["day"],
+            "resource": row["resource"],
+            "labels": row["labels"],
+            "count": row["count"],
+        }
+        for row in qs.order_by("day")
+        .values("day", "resource", "labels")
+        .annotate(count=Sum("total_count"))
+    )
+
+
+def _get_current_api_usage_from_daily_rollups(
+    organisation_id: int,
+    date_start: datetime,
+) -> int:
+    # The rollups are only read for the whole days in the period, while the
+    # partial first day, and the current day, are read from the buckets.
+    first_day = timezone.localdate(date_start)
+    first_whole_day = (
+        first_day
+        if date_start == _get_start_of_day(first_day)
+        else first_day + timedelta(days=1)
+    )
+    today = timezone.localdate()
+
+    rollups_count: int | None = APIUsageDailyRollup.objects.filter(
+        organisation_id=organisation_id,
+        day__gte=first_whole_day,
+        day__lt=today,
+    ).aggregate(total_count=Sum("total_count"))["total_count"]
+
+    environment_ids = list(
+        Environment.objects.filter(
+            project__organisation_id=organisation_id,
+        ).values_list("id", flat=True)
+    )
+    buckets_count: int | None = APIUsageBucket.objects.filter(
+        Q(created_at__lt=_get_start_of_day(first_whole_day))
+        | Q(created_at__gte=_get_start_of_day(today)),
+        created_at__gte=date_start,
+        environment_id__in=environment_ids,
+        bucket_size=constants.ANALYTICS_READ_BUCKET_SIZE,
+    ).aggregate(total_count=Sum("total_count"))["total_count"]
+
+    return (rollups_count or 0) + (buckets_count or 0)
+
+
+def _get_start_of_day(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
 def _get_environment_ids_for_org(organisation: Organisation) -> list[int]:
     # We need to do this to prevent Django from generating a query that
     # references the environments and projects tables,
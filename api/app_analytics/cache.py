@@ -1,15 +1,20 @@
-from threading import Lock
+import atexit
+import logging
+import time
+import typing
+from threading import Lock, Thread
 
 from django.conf import settings
-from django.utils import timezone
+from django.db import close_old_connections
 
+from app_analytics.counters import StripedCounter
 from app_analytics.mappers import (
     map_feature_evaluation_cache_to_track_feature_evaluations_by_environment_kwargs,
 )
 from app_analytics.models import Resource
 from app_analytics.tasks import (
     track_feature_evaluations_by_environment,
-    track_request,
+    track_requests,
 )
 from app_analytics.types import (
     APIUsageCacheKey,
@@ -17,67 +22,151 @@ from app_analytics.types import (
     Labels,
 )
 
+logger = logging.getLogger(__name__)
+
+
+class CacheFlusher:
+    """
+    Flush a cache periodically from a background thread, rather than on the
+    request path, and once more when the process exits so that its data isn't
+    lost when workers are shut down.
+
+    Since a single thread flushes the cache, flushing uses at most one extra
+    thread (and database connection) per process. If background flushing is
+    disabled, the cache is flushed on the request path instead.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush: typing.Callable[[], None],
+        get_interval_seconds: typing.Callable[[], int],
+    ) -> None:
+        self.name = name
+        self._flush = flush
+        self._get_interval_seconds = get_interval_seconds
+        self._thread: Thread | None = None
+        self._lock = Lock()
+        self._registered_at_exit = False
+        self._last_flushed_at = time.monotonic()
+
+    def ensure_running(self) -> None:
+        """
+        Start flushing in the background, unless already running. This is safe
+        to call on every request, and restarts the thread in processes forked
+        after it was started.
+
+        If background flushing is disabled, flush the cache inline once its
+        interval has elapsed.
+        """
+        if settings.ANALYTICS_CACHE_FLUSH_AT_EXIT and not self._registered_at_exit:
+            with self._lock:
+                if not self._registered_at_exit:
+                    atexit.register(self.flush)
+                    self._registered_at_exit = True
+
+        if not settings.ANALYTICS_CACHE_FLUSH_IN_BACKGROUND:
+            self._flush_if_due()
+            return
+
+        if self._thread and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def flush(self) -> None:
+        # This isn't run on the request path, so make sure that we're not
+        # using a connection which has since been closed or timed out.
+        try:
+            close_old_connections()
+            self._flush()
+        except Exception:
+            logger.exception("Failed to flush %s.", self.name)
+
+    def _flush_if_due(self) -> None:
+        if time.monotonic() - self._last_flushed_at < self._get_interval_seconds():
+            return
+        # Only one caller flushes, the others carry on without waiting for it.
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._last_flushed_at = time.monotonic()
+            self.flush()
+        finally:
+            self._lock.release()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(max(self._get_interval_seconds(), 1))
+            self.flush()
+
 
 class APIUsageCache:
     def __init__(self) -> None:
-        self._cache: dict[APIUsageCacheKey, int] = {}
-        self._last_flushed_at = timezone.now()
-        self._lock = Lock()
+        self._cache = StripedCounter[APIUsageCacheKey](
+            stripes=settings.ANALYTICS_CACHE_STRIPES
+        )
+        self._flusher = CacheFlusher(
+            name="api-usage-cache-flusher",
+            flush=self.flush,
+            get_interval_seconds=lambda: settings.API_USAGE_CACHE_SECONDS,
+        )
 
-    def _flush(self) -> None:
-        for key, value in self._cache.items():
-            track_request.run_in_thread(
-                kwargs={
-                    "resource": key.resource.value,
-                    "host": key.host,
-                    "environment_key": key.environment_key,
-                    "count": value,
-                    "labels": dict(key.labels),
-                }
+    def flush(self) -> None:
+        if cache := self._cache.drain():
+            track_requests(
+                requests=[
+                    {
+                        "resource": key.resource.value,
+                        "host": key.host,
+                        "environment_key": key.environment_key,
+                        "count": value,
+                        "labels": dict(key.labels),  # type: ignore[typeddict-item]
+                    }
+                    for key, value in cache.items()
+                ]
             )
 
-        self._cache = {}
-        self._last_flushed_at = timezone.now()
-
     def track_request(
         self,
         resource: Resource,
         host: str,
         environment_key: str,
         labels: Labels,
+        count: int = 1,
     ) -> None:
+        self._flusher.ensure_running()
         key = APIUsageCacheKey(
             resource=resource,
             host=host,
             environment_key=environment_key,
             labels=tuple(sorted(labels.items())),
         )
-        with self._lock:
-            if key not in self._cache:
-                self._cache[key] = 1
-            else:
-                self._cache[key] += 1
-            if (
-                timezone.now() - self._last_flushed_at
-            ).seconds > settings.API_USAGE_CACHE_SECONDS:
-                self._flush()
+        self._cache.increment(key, count)
 
 
 class FeatureEvaluationCache:
     def __init__(self) -> None:
-        self._cache: dict[FeatureEvaluationCacheKey, int] = {}
-        self._last_flushed_at = timezone.now()
-        self._lock = Lock()
+        self._cache = StripedCounter[FeatureEvaluationCacheKey](
+            stripes=settings.ANALYTICS_CACHE_STRIPES
+        )
+        self._flusher = CacheFlusher(
+            name="feature-evaluation-cache-flusher",
+            flush=self.flush,
+            get_interval_seconds=lambda: settings.FEATURE_EVALUATION_CACHE_SECONDS,
+        )
 
-    def _flush(self) -> None:
+    def flush(self) -> None:
+        cache = self._cache.drain()
         for kwargs in map_feature_evaluation_cache_to_track_feature_evaluations_by_environment_kwargs(
-            self._cache
+            cache
         ):
             track_feature_evaluations_by_environment.delay(kwargs=dict(kwargs))
 
-        self._cache = {}
-        self._last_flushed_at = timezone.now()
-
     def track_feature_evaluation(
         self,
         environment_id: int,
@@ -85,18 +174,10 @@ class FeatureEvaluationCache:
         evaluation_count: int,
         labels: Labels,
     ) -> None:
+        self._flusher.ensure_running()
         key = FeatureEvaluationCacheKey(
             feature_name=feature_name,
             environment_id=environment_id,
             labels=tuple((sorted(labels.items()))),
         )
-        with self._lock:
-            if key not in self._cache:
-                self._cache[key] = evaluation_count
-            else:
-                self._cache[key] += evaluation_count
-
-            if (
-                timezone.now() - self._last_flushed_at
-            ).seconds > settings.FEATURE_EVALUATION_CACHE_SECONDS:
-                self._flush()
+        self._cache.increment(key, evaluation_count)
@@ -0,0 +1,59 @@
+import itertools
+import threading
+import typing
+
+K = typing.TypeVar("K", bound=typing.Hashable)
+
+DEFAULT_STRIPES = 16
+
+
+class _Stripe(typing.Generic[K]):
+    __slots__ = ("lock", "counts")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.counts: dict[K, int] = {}
+
+
+class StripedCounter(typing.Generic[K]):
+    """
+    A thread safe counter which spreads its counts over a number of stripes,
+    each with its own lock, so that threads incrementing it concurrently
+    rarely wait for each other.
+
+    Each thread is assigned a stripe the first time it increments the counter,
+    in turn, so that the threads of a worker are spread evenly over them. The
+    stripes are merged when the counter is drained.
+    """
+
+    def __init__(self, stripes: int = DEFAULT_STRIPES) -> None:
+        self._stripes = [_Stripe[K]() for _ in range(max(stripes, 1))]
+        self._next_stripe = itertools.count()
+        self._local = threading.local()
+
+    def increment(self, key: K, value: int = 1) -> None:
+        stripe = self._get_stripe()
+        with stripe.lock:
+            stripe.counts[key] = stripe.counts.get(key, 0) + value
+
+    def drain(self) -> dict[K, int]:
+        """
+        Return the counts incremented since the counter was last drained, and
+        reset them.
+        """
+        drained: dict[K, int] = {}
+        for stripe in self._stripes:
+            with stripe.lock:
+                counts, stripe.counts = stripe.counts, {}
+            for key, value in counts.items():
+                drained[key] = drained.get(key, 0) + value
+        return drained
+
+    def _get_stripe(self) -> _Stripe[K]:
+        try:
+            stripe: _Stripe[K] = self._local.stripe
+        except AttributeError:
+            # `next` on `itertools.count` is atomic, so no lock is needed here.
+            stripe = self._stripes[next(self._next_stripe) % len(self._stripes)]
+            self._local.stripe = stripe
+        return stripe
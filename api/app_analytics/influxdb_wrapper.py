@@ -1,21 +1,26 @@
+import atexit
+import hashlib
 import json
 import logging
+import os
 import typing
 from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from threading import Lock
 
 from django.conf import settings
+from django.core.cache import caches
 from django.utils import timezone
 from influxdb_client import InfluxDBClient, Point
-from influxdb_client.client.exceptions import InfluxDBError
 from influxdb_client.client.flux_table import FluxTable
-from influxdb_client.client.write_api import SYNCHRONOUS
 from sentry_sdk import capture_exception
 from urllib3 import Retry
 from urllib3.exceptions import HTTPError
 
 from app_analytics.constants import LABELS
 from app_analytics.dataclasses import FeatureEvaluationData, UsageData
+from app_analytics.influxdb_writer import InfluxDBWriter
 from app_analytics.mappers import (
     map_flux_tables_to_feature_evaluation_data,
     map_flux_tables_to_usage_data,
@@ -35,6 +40,16 @@ influxdb_client = InfluxDBClient(
     url=url, token=token, org=influx_org, retries=retries, timeout=3000
 )
 
+influxdb_query_cache = caches[settings.INFLUXDB_QUERY_CACHE_NAME]
+
+# Data for a day is only cached once the day has been over for this long, to
+# allow for the downsampling of late writes.
+CLOSED_DAY_DELAY = timedelta(hours=1)
+
+_writer: InfluxDBWriter | None = None
+_writer_pid: int | None = None
+_writer_lock = Lock()
+
 DEFAULT_DROP_COLUMNS = (
     "organisation",
     "organisation_id",
@@ -50,6 +65,33 @@ GET_MULTIPLE_EVENTS_LIST_GROUP_CLAUSE = (
     f"|> group(columns: {json.dumps(['resource', *LABELS])}) "
 )
 
+DailyData = typing.TypeVar("DailyData", UsageData, FeatureEvaluationData)
+
+
+def get_influxdb_writer() -> InfluxDBWriter:
+    """
+    Return the process's writer, creating it on first use, and again in
+    processes forked after it was created, as its threads don't survive forking.
+    """
+    global _writer, _writer_pid
+
+    pid = os.getpid()
+    if _writer is not None and _writer_pid == pid:
+        return _writer
+
+    with _writer_lock:
+        if _writer is None or _writer_pid != pid:
+            writer = InfluxDBWriter(
+                client=influxdb_client,
+                bucket=settings.INFLUXDB_BUCKET,
+                batch_size=settings.INFLUXDB_WRITER_BATCH_SIZE,
+                flush_interval_ms=settings.INFLUXDB_WRITER_FLUSH_INTERVAL_MS,
+                max_queue_size=settings.INFLUXDB_WRITER_MAX_QUEUE_SIZE,
+            )
+            atexit.register(writer.close)
+            _writer, _writer_pid = writer, pid
+    return _writer
+
 
 def get_range_bucket_mappings(date_start: datetime) -> str:
     now = timezone.now()
@@ -62,7 +104,6 @@ class InfluxDBWrapper:
     def __init__(self, name):  # type: ignore[no-untyped-def]
         self.name = name
         self.records = []
-        self.write_api = influxdb_client.write_api(write_options=SYNCHRONOUS)
 
     def add_data_point(
         self,
@@ -84,22 +125,32 @@ class InfluxDBWrapper:
         self.records.append(point)
 
     def write(self) -> None:
+        get_influxdb_writer().write(self.records)
+
+    @staticmethod
+    def influx_query_manager(
+        date_start: datetime | None = None,
+        date_stop: datetime | None = None,
+        drop_columns: tuple[str, ...] = DEFAULT_DROP_COLUMNS,
+        filters: str = "|> filter(fn:(r) => r._measurement == 'api_call')",
+        extra: str = "",
+        bucket: str = read_bucket,
+    ) -> list[FluxTable]:
         try:
-            self.write_api.write(bucket=settings.INFLUXDB_BUCKET, record=self.records)
-        except (HTTPError, InfluxDBError) as e:
-            logger.warning(
-                "Failed to write records to Influx: %s",
-                str(e),
-                exc_info=e,
-            )
-            logger.debug(
-                "Records: %s. Bucket: %s",
-                self.records,
-                settings.INFLUXDB_BUCKET,
+            return InfluxDBWrapper.query(
+                date_start=date_start,
+                date_stop=date_stop,
+                drop_columns=drop_columns,
+                filters=filters,
+                extra=extra,
+                bucket=bucket,
             )
+        except HTTPError as e:
+            capture_exception(e)
+            return []
 
     @staticmethod
-    def influx_query_manager(
+    def query(
         date_start: datetime | None = None,
         date_stop: datetime | None = None,
         drop_columns: tuple[str, ...] = DEFAULT_DROP_COLUMNS,
@@ -107,6 +158,9 @@ class InfluxDBWrapper:
         extra: str = "",
         bucket: str = read_bucket,
     ) -> list[FluxTable]:
+        """
+        Run the query, as `influx_query_manager`, but raise any HTTP errors.
+        """
         now = timezone.now()
         if date_start is None:
             date_start = now - timedelta(days=30)
@@ -130,11 +184,7 @@ class InfluxDBWrapper:
         )
         logger.debug("Running query in influx: \n\n %s", query)
 
-        try:
-            return query_api.query(org=influx_org, query=query)
-        except HTTPError as e:
-            capture_exception(e)
-            return []
+        return query_api.query(org=influx_org, query=query)
 
 
 def get_events_for_organisation(
@@ -224,6 +274,115 @@ def get_event_list_for_organisation(
     return dataset, labels
 
 
+def get_cached_daily_data(
+    map_flux_tables: typing.Callable[[list[FluxTable]], list[DailyData]],
+    date_start: datetime,
+    date_stop: datetime,
+    filters: str,
+    extra: str,
+) -> list[DailyData]:
+    """
+    Query influx db for data aggregated by (UTC) day, reading the data for the
+    days which are over from the cache, and querying for the rest of the range.
+
+    Results are cached per day, keyed by the query, so that overlapping ranges
+    reuse the days already queried. Days adjacent to each other are queried
+    together, so a range with no cached days is read in a single query.
+
+    :param map_flux_tables: maps the query results to data with a `day`
+    :param filters: the query's filters, which must aggregate by day
+    :param extra: the query's aggregation, which must aggregate by day
+    """
+    days = _get_closed_days(date_start, date_stop)
+    cache_keys = {day: _get_daily_data_cache_key(filters, extra, day) for day in days}
+    cached_data = influxdb_query_cache.get_many(cache_keys.values())
+    if not cached_data:
+        return _query_daily_data(map_flux_tables, date_start, date_stop, filters, extra)
+
+    data_by_day: dict[date, list[DailyData]] = {}
+    ranges: list[tuple[datetime, datetime]] = []
+    range_start = date_start
+    for day, cache_key in cache_keys.items():
+        if cache_key not in cached_data:
+            continue
+        data_by_day[day] = cached_data[cache_key]
+        day_start = _get_day_start(day)
+        if range_start < day_start:
+            ranges.append((range_start, day_start))
+        range_start = day_start + timedelta(days=1)
+    if range_start < date_stop:
+        ranges.append((range_start, date_stop))
+
+    for range_start, range_stop in ranges:
+        for data in _query_daily_data(
+            map_flux_tables, range_start, range_stop, filters, extra
+        ):
+            data_by_day.setdefault(data.day, []).append(data)
+
+    return [data for day in sorted(data_by_day) for data in data_by_day[day]]
+
+
+def _query_daily_data(
+    map_flux_tables: typing.Callable[[list[FluxTable]], list[DailyData]],
+    date_start: datetime,
+    date_stop: datetime,
+    filters: str,
+    extra: str,
+) -> list[DailyData]:
+    try:
+        results = InfluxDBWrapper.query(
+            date_start=date_start,
+            date_stop=date_stop,
+            filters=filters,
+            extra=extra,
+        )
+    except HTTPError as e:
+        capture_exception(e)
+        return []
+
+    daily_data = map_flux_tables(results)
+
+    if days := _get_closed_days(date_start, date_stop):
+        data_by_day: dict[date, list[DailyData]] = {day: [] for day in days}
+        for data in daily_data:
+            if data.day in data_by_day:
+                data_by_day[data.day].append(data)
+        # The days are over, so their data won't change.
+        influxdb_query_cache.set_many(
+            {
+                _get_daily_data_cache_key(filters, extra, day): data
+                for day, data in data_by_day.items()
+            },
+            timeout=None,
+        )
+
+    return daily_data
+
+
+def _get_closed_days(date_start: datetime, date_stop: datetime) -> list[date]:
+    """
+    Return the days which are entirely within the range, and are over.
+    """
+    first_day = date_start.astimezone(dt_timezone.utc).date()
+    if _get_day_start(first_day) < date_start:
+        first_day += timedelta(days=1)
+    stop = min(date_stop, timezone.now() - CLOSED_DAY_DELAY)
+    last_day = stop.astimezone(dt_timezone.utc).date() - timedelta(days=1)
+    return [
+        first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)
+    ]
+
+
+def _get_daily_data_cache_key(filters: str, extra: str, day: date) -> str:
+    # Normalise whitespace, so that formatting doesn't affect the key.
+    query = " ".join(f"{read_bucket} {filters} {extra}".split())
+    return f"influxdb-query:{hashlib.sha256(query.encode()).hexdigest()}:{day}"
+
+
+def _get_day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=dt_timezone.utc)
+
+
 def get_multiple_event_list_for_organisation(
     organisation_id: int,
     project_id: int | None = None,
@@ -262,7 +421,8 @@ def get_multiple_event_list_for_organisation(
     if labels_filter:
         filters += [f'r["{key}"] == "{value}"' for key, value in labels_filter.items()]
 
-    results = InfluxDBWrapper.influx_query_manager(
+    return get_cached_daily_data(
+        map_flux_tables=map_flux_tables_to_usage_data,
         date_start=date_start,
         date_stop=date_stop,
         filters=build_filter_string(filters),
@@ -272,8 +432,6 @@ def get_multiple_event_list_for_organisation(
         ),
     )
 
-    return map_flux_tables_to_usage_data(results)
-
 
 def get_usage_data(
     organisation_id: int,
@@ -334,18 +492,28 @@ def get_multiple_event_list_for_feature(
             [f'r["{key}"] == "{value}"' for key, value in labels_filter.items()]
         )
 
-    results = InfluxDBWrapper.influx_query_manager(
+    extra = (
+        f"|> group(columns: {json.dumps(LABELS)}) "
+        f'|> aggregateWindow(every: {aggregate_every}, fn: sum, createEmpty: false, timeSrc: "_start") '
+        '|> yield(name: "sum")'
+    )
+
+    if aggregate_every != "24h":
+        results = InfluxDBWrapper.influx_query_manager(
+            date_start=date_start,
+            filters=filters,
+            extra=extra,
+        )
+        return map_flux_tables_to_feature_evaluation_data(results)
+
+    return get_cached_daily_data(
+        map_flux_tables=map_flux_tables_to_feature_evaluation_data,
         date_start=date_start,
+        date_stop=now,
         filters=filters,
-        extra=(
-            f"|> group(columns: {json.dumps(LABELS)}) "
-            f'|> aggregateWindow(every: {aggregate_every}, fn: sum, createEmpty: false, timeSrc: "_start") '
-            '|> yield(name: "sum")'
-        ),
+        extra=extra,
     )
 
-    return map_flux_tables_to_feature_evaluation_data(results)
-
 
 def get_feature_evaluation_data(
     feature_name: str,
@@ -0,0 +1,138 @@
+import logging
+import typing
+from threading import Lock
+
+from influxdb_client import InfluxDBClient, Point, WriteOptions
+from influxdb_client.client.exceptions import InfluxDBError
+from influxdb_client.client.write_api import SYNCHRONOUS, WriteApi
+
+from app_analytics.metrics import (
+    INFLUXDB_WRITE_RESULT_DROPPED,
+    INFLUXDB_WRITE_RESULT_FAILED,
+    INFLUXDB_WRITE_RESULT_WRITTEN,
+    flagsmith_influxdb_writer_queued_records,
+    flagsmith_influxdb_writer_records_total,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class InfluxDBWriter:
+    """
+    Write records to InfluxDB in batches from background threads, using the
+    client's batching write API, so that callers don't block on HTTP requests.
+
+    A single writer is shared by the process. Records are dropped, rather than
+    queued, while `max_queue_size` records are waiting to be written, so that
+    an unavailable InfluxDB can't exhaust the process's memory.
+    """
+
+    def __init__(
+        self,
+        client: InfluxDBClient,
+        bucket: str,
+        batch_size: int,
+        flush_interval_ms: int,
+        max_queue_size: int,
+    ) -> None:
+        self.bucket = bucket
+        self._client = client
+        self._synchronous_write_api: WriteApi | None = None
+        self.max_queue_size = max_queue_size
+        self._queued = 0
+        self._lock = Lock()
+        self._write_api = client.write_api(
+            write_options=WriteOptions(
+                batch_size=batch_size,
+                flush_interval=flush_interval_ms,
+            ),
+            success_callback=self._on_success,
+            error_callback=self._on_error,
+        )
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def write(self, records: typing.Sequence[Point]) -> bool:
+        """
+        Queue the records to be written, returning False if they were dropped
+        because the queue is full.
+        """
+        if not records:
+            return True
+
+        with self._lock:
+            if self._queued + len(records) > self.max_queue_size:
+                flagsmith_influxdb_writer_records_total.labels(
+                    result=INFLUXDB_WRITE_RESULT_DROPPED,
+                ).inc(len(records))
+                logger.warning(
+                    "InfluxDB writer queue is full. Dropped %d records.",
+                    len(records),
+                )
+                return False
+            self._queued += len(records)
+        flagsmith_influxdb_writer_queued_records.labels(bucket=self.bucket).inc(
+            len(records)
+        )
+
+        self._write_api.write(bucket=self.bucket, record=records)
+        return True
+
+    def write_synchronously(self, records: typing.Sequence[Point]) -> None:
+        """
+        Write the records, bypassing the queue, and raise if they can't be
+        written. For callers which need to know that the records were written.
+        """
+        if self._synchronous_write_api is None:
+            self._synchronous_write_api = self._client.write_api(
+                write_options=SYNCHRONOUS
+            )
+        try:
+            self._synchronous_write_api.write(bucket=self.bucket, record=records)
+        except Exception:
+            flagsmith_influxdb_writer_records_total.labels(
+                result=INFLUXDB_WRITE_RESULT_FAILED,
+            ).inc(len(records))
+            raise
+        flagsmith_influxdb_writer_records_total.labels(
+            result=INFLUXDB_WRITE_RESULT_WRITTEN,
+        ).inc(len(records))
+
+    def close(self) -> None:
+        """
+        Write any queued records, and stop the background threads.
+        """
+        self._write_api.close()
+
+    def _on_success(self, conf: tuple[str, str, str], data: str | bytes) -> None:
+        count = self._dequeue(data)
+        flagsmith_influxdb_writer_records_total.labels(
+            result=INFLUXDB_WRITE_RESULT_WRITTEN,
+        ).inc(count)
+
+    def _on_error(
+        self,
+        conf: tuple[str, str, str],
+        data: str | bytes,
+        exception: InfluxDBError,
+    ) -> None:
+        count = self._dequeue(data)
+        flagsmith_influxdb_writer_records_total.labels(
+            result=INFLUXDB_WRITE_RESULT_FAILED,
+        ).inc(count)
+        logger.warning(
+            "Failed to write %d records to Influx: %s",
+            count,
+            str(exception),
+            exc_info=exception,
+        )
+
+    def _dequeue(self, data: str | bytes) -> int:
+        # Batches are written as line protocol, with one record per line.
+        count = (data.count(b"\n") if isinstance(data, bytes) else data.count("\n")) + 1
+        with self._lock:
+            self._queued = max(self._queued - count, 0)
+        flagsmith_influxdb_writer_queued_records.labels(bucket=self.bucket).dec(count)
+        return count
@@ -0,0 +1,38 @@
+import argparse
+from typing import Any
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from app_analytics.partitions import (
+    PARTITIONED_TABLES,
+    is_partitioned,
+    maintain_partitions,
+    partition_table,
+)
+
+
+class Command(BaseCommand):
+    help = "Create upcoming, and drop expired, partitions of the analytics tables."
+
+    def add_arguments(self, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help=(
+                "Partition any analytics tables which aren't partitioned yet. "
+                "Each table is locked while it's converted."
+            ),
+        )
+
+    def handle(self, *args: Any, convert: bool, **options: Any) -> None:
+        if not settings.USE_POSTGRES_FOR_ANALYTICS:
+            return
+
+        if convert:
+            for table in PARTITIONED_TABLES:
+                if not is_partitioned(table):
+                    partition_table(table)
+                    self.stdout.write(f"Partitioned {table.name}.")
+
+        maintain_partitions()
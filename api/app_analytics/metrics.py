@@ -0,0 +1,19 @@
+import prometheus_client
+
+INFLUXDB_WRITE_RESULT_WRITTEN = "written"
+INFLUXDB_WRITE_RESULT_FAILED = "failed"
+INFLUXDB_WRITE_RESULT_DROPPED = "dropped"
+
+flagsmith_influxdb_writer_records_total = prometheus_client.Counter(
+    "flagsmith_influxdb_writer_records_total",
+    "Records handled by the InfluxDB writer. `result` label is either `written`, "
+    "`failed` (after retries), or `dropped` (because the writer's queue was full).",
+    ["result"],
+)
+flagsmith_influxdb_writer_queued_records = prometheus_client.Gauge(
+    "flagsmith_influxdb_writer_queued_records",
+    "Records queued by the InfluxDB writer which are yet to be written. "
+    "`bucket` label is the InfluxDB bucket the records are written to.",
+    ["bucket"],
+    multiprocess_mode="livesum",
+)
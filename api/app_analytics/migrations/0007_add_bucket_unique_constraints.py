@@ -0,0 +1,64 @@
+# Generated by Django 4.2.22 on 2026-10-18 18:53
+
+from django.db import migrations, models
+
+from core.migration_helpers import PostgresOnlyRunSQL
+
+# Buckets are populated with `update_or_create` prior to this migration, so
+# duplicates are not expected, but remove any so that the constraints can be
+# added. Keep the most recently created of each.
+REMOVE_DUPLICATE_BUCKETS_SQL = """
+DELETE FROM "app_analytics_{table}" a
+USING "app_analytics_{table}" b
+WHERE a.id < b.id
+    AND a.environment_id = b.environment_id
+    AND a.bucket_size = b.bucket_size
+    AND a.created_at = b.created_at
+    AND a.{key} = b.{key}
+    AND a.labels = b.labels;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app_analytics", "0006_add_labels"),
+    ]
+
+    operations = [
+        PostgresOnlyRunSQL(
+            REMOVE_DUPLICATE_BUCKETS_SQL.format(table="apiusagebucket", key="resource"),
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        PostgresOnlyRunSQL(
+            REMOVE_DUPLICATE_BUCKETS_SQL.format(
+                table="featureevaluationbucket", key="feature_name"
+            ),
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name="apiusagebucket",
+            constraint=models.UniqueConstraint(
+                fields=(
+                    "environment_id",
+                    "bucket_size",
+                    "created_at",
+                    "resource",
+                    "labels",
+                ),
+                name="unique_api_usage_bucket",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="featureevaluationbucket",
+            constraint=models.UniqueConstraint(
+                fields=(
+                    "environment_id",
+                    "bucket_size",
+                    "created_at",
+                    "feature_name",
+                    "labels",
+                ),
+                name="unique_feature_evaluation_bucket",
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.22 on 2026-10-18 19:36
+
+import django.contrib.postgres.fields.hstore
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app_analytics", "0007_add_bucket_unique_constraints"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="APIUsageDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("organisation_id", models.PositiveIntegerField()),
+                ("day", models.DateField()),
+                (
+                    "resource",
+                    models.IntegerField(
+                        choices=[
+                            (1, "Flags"),
+                            (2, "Identities"),
+                            (3, "Traits"),
+                            (4, "Environment Document"),
+                        ]
+                    ),
+                ),
+                (
+                    "labels",
+                    django.contrib.postgres.fields.hstore.HStoreField(default=dict),
+                ),
+                ("total_count", models.PositiveBigIntegerField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="apiusagedailyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("organisation_id", "day", "resource", "labels"),
+                name="unique_api_usage_daily_rollup",
+            ),
+        ),
+    ]
@@ -96,6 +96,20 @@ class AbstractBucket(LifecycleModelMixin, models.Model):  # type: ignore[misc]
 class APIUsageBucket(AbstractBucket):
     resource = models.IntegerField(choices=Resource.choices)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    "environment_id",
+                    "bucket_size",
+                    "created_at",
+                    "resource",
+                    "labels",
+                ],
+                name="unique_api_usage_bucket",
+            )
+        ]
+
     @hook(BEFORE_CREATE)
     def check_overlapping_buckets(self):  # type: ignore[no-untyped-def]
         filter = models.Q(resource=self.resource)
@@ -125,7 +139,42 @@ class FeatureEvaluationRaw(models.Model):
 class FeatureEvaluationBucket(AbstractBucket):
     feature_name = models.CharField(max_length=2000)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    "environment_id",
+                    "bucket_size",
+                    "created_at",
+                    "feature_name",
+                    "labels",
+                ],
+                name="unique_feature_evaluation_bucket",
+            )
+        ]
+
     @hook(BEFORE_CREATE)
     def check_overlapping_buckets(self):  # type: ignore[no-untyped-def]
         filter = models.Q(feature_name=self.feature_name)
         super().check_overlapping_buckets(filter)  # type: ignore[no-untyped-call]
+
+
+class APIUsageDailyRollup(models.Model):
+    """
+    API usage per organisation per day, rolled up from the API usage buckets
+    as they're populated, for reading organisation wide usage cheaply.
+    """
+
+    organisation_id = models.PositiveIntegerField()
+    day = models.DateField()
+    resource = models.IntegerField(choices=Resource.choices)
+    labels = HStoreField(default=dict)
+    total_count = models.PositiveBigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["organisation_id", "day", "resource", "labels"],
+                name="unique_api_usage_daily_rollup",
+            )
+        ]
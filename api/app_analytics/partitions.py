@@ -0,0 +1,337 @@
+"""
+Time range partitioning of the analytics tables by `created_at`.
+
+`partition_table` swaps an existing table for a partitioned one, attaching the
+existing table as its first partition so that no data is copied. From then on
+`create_partitions` creates partitions ahead of time, and
+`drop_expired_partitions` drops the partitions which are past the retention
+period, rather than deleting their rows.
+
+Rows outside of every other partition, e.g. when partitions weren't created in
+time, are written to the default partition. They are moved to their partition
+when it's created, and otherwise deleted once they're past the retention period.
+"""
+
+import logging
+import re
+import typing
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.utils import CursorWrapper
+from django.db.models import Model
+
+from app_analytics.models import (
+    APIUsageBucket,
+    APIUsageRaw,
+    FeatureEvaluationBucket,
+    FeatureEvaluationRaw,
+)
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_BOUND_RE = re.compile(r"FROM \((?:'([^']+)'|MINVALUE)\) TO \('([^']+)'\)")
+
+
+class PartitionedTable(typing.NamedTuple):
+    model: type[Model]
+    interval: timedelta
+    # Number of partitions to create ahead of the current one.
+    premake: int
+    get_retention_days: typing.Callable[[], int]
+
+    @property
+    def name(self) -> str:
+        return self.model._meta.db_table
+
+    @property
+    def default_partition_name(self) -> str:
+        return f"{self.name}_default"
+
+    def get_period_start(self, dt: datetime) -> datetime:
+        start = dt.astimezone(timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        if self.interval == timedelta(weeks=1):
+            start -= timedelta(days=start.weekday())
+        return start
+
+
+PARTITIONED_TABLES = [
+    *(
+        PartitionedTable(
+            model=model,
+            interval=timedelta(days=1),
+            premake=7,
+            get_retention_days=lambda: settings.RAW_ANALYTICS_DATA_RETENTION_DAYS,
+        )
+        for model in (APIUsageRaw, FeatureEvaluationRaw)
+    ),
+    *(
+        PartitionedTable(
+            model=model,
+            interval=timedelta(weeks=1),
+            premake=4,
+            get_retention_days=lambda: settings.BUCKETED_ANALYTICS_DATA_RETENTION_DAYS,
+        )
+        for model in (APIUsageBucket, FeatureEvaluationBucket)
+    ),
+]
+
+
+def maintain_partitions() -> None:
+    """
+    Create upcoming partitions, and drop expired ones, for each of the analytics
+    tables which have been partitioned.
+    """
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(table):
+            continue
+        create_partitions(table)
+        drop_expired_partitions(
+            table,
+            before=datetime.now(tz=timezone.utc)
+            - timedelta(days=table.get_retention_days()),
+        )
+
+
+def is_partitioned(table: PartitionedTable) -> bool:
+    connection = _get_connection(table)
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass)",
+            [table.name],
+        )
+        return bool(cursor.fetchone()[0])
+
+
+def partition_table(table: PartitionedTable) -> None:
+    """
+    Replace the table with one partitioned by `created_at`. The existing table
+    is renamed and attached as the partition for everything before the next
+    period, and a default partition is created for rows outside of any other.
+
+    The table is locked while it's converted, and its primary key is extended
+    with `created_at`, which is required for partitioning.
+    """
+    name = table.name
+    legacy_name = f"{name}_legacy"
+    sequence_name = f"{name}_partitioned_id_seq"
+    legacy_until = table.get_period_start(datetime.now(tz=timezone.utc)) + (
+        table.interval
+    )
+
+    connection = _get_connection(table)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE "{name}" IN ACCESS EXCLUSIVE MODE')
+        indexes = _get_indexes(cursor, name)
+
+        cursor.execute(f'ALTER TABLE "{name}" RENAME TO "{legacy_name}"')
+        for i, (index_name, _, constraint_type, _) in enumerate(indexes):
+            if constraint_type == "p":
+                # Replaced by the parent's primary key when the table is attached.
+                cursor.execute(
+                    f'ALTER TABLE "{legacy_name}" DROP CONSTRAINT "{index_name}"'
+                )
+            else:
+                cursor.execute(
+                    f'ALTER INDEX "{index_name}" RENAME TO "{legacy_name}_{i}"'
+                )
+        # Partitions can't have identity columns unless their parent does,
+        # so ids are generated from a new sequence owned by the parent.
+        cursor.execute(
+            f'ALTER TABLE "{legacy_name}" ALTER COLUMN id DROP IDENTITY IF EXISTS'
+        )
+
+        cursor.execute(
+            f'CREATE TABLE "{name}" '
+            f'(LIKE "{legacy_name}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            "PARTITION BY RANGE (created_at)"
+        )
+        cursor.execute(f'CREATE SEQUENCE "{sequence_name}" OWNED BY "{name}".id')
+        cursor.execute(
+            f'SELECT setval(%s, COALESCE((SELECT max(id) FROM "{legacy_name}"), 0) + 1, false)',
+            [sequence_name],
+        )
+        cursor.execute(
+            f'ALTER TABLE "{name}" ALTER COLUMN id '
+            f"SET DEFAULT nextval('\"{sequence_name}\"')"
+        )
+
+        for (
+            index_name,
+            index_definition,
+            constraint_type,
+            constraint_definition,
+        ) in indexes:
+            if constraint_type == "p":
+                cursor.execute(
+                    f'ALTER TABLE "{name}" ADD CONSTRAINT "{index_name}" '
+                    "PRIMARY KEY (id, created_at)"
+                )
+            elif constraint_type:
+                cursor.execute(
+                    f'ALTER TABLE "{name}" ADD CONSTRAINT "{index_name}" '
+                    f"{constraint_definition}"
+                )
+            else:
+                unique = (
+                    "UNIQUE " if index_definition.startswith("CREATE UNIQUE") else ""
+                )
+                cursor.execute(
+                    f'CREATE {unique}INDEX "{index_name}" ON "{name}" '
+                    f"USING {index_definition.split(' USING ', 1)[1]}"
+                )
+
+        cursor.execute(
+            f'ALTER TABLE "{name}" ATTACH PARTITION "{legacy_name}" '
+            "FOR VALUES FROM (MINVALUE) TO (%s)",
+            [legacy_until],
+        )
+        cursor.execute(
+            f'CREATE TABLE "{table.default_partition_name}" PARTITION OF "{name}" DEFAULT'
+        )
+
+    create_partitions(table)
+
+
+def create_partitions(table: PartitionedTable) -> list[str]:
+    """
+    Create the partitions for the current period, and `table.premake` periods
+    after it, unless they're already covered by another partition.
+
+    Any rows in the default partition for the period are moved to the new
+    partition, since it can't be attached while they're there.
+    """
+    connection = _get_connection(table)
+    created = []
+    with connection.cursor() as cursor:
+        bounds = [bound for _, bound in _get_partition_bounds(cursor, table.name)]
+        has_default_partition = _has_default_partition(cursor, table)
+        start = table.get_period_start(datetime.now(tz=timezone.utc))
+        for _ in range(table.premake + 1):
+            end = start + table.interval
+            if not any(
+                (lower is None or lower < end) and start < upper
+                for lower, upper in bounds
+            ):
+                partition_name = f"{table.name}_p{start:%Y%m%d}"
+                try:
+                    with transaction.atomic(using=connection.alias):
+                        cursor.execute(
+                            f'CREATE TABLE "{partition_name}" (LIKE "{table.name}" '
+                            "INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                        )
+                        if has_default_partition:
+                            # Stop rows for the period being written to the
+                            # default partition until the new one is attached.
+                            cursor.execute(
+                                f'LOCK TABLE "{table.default_partition_name}" '
+                                "IN SHARE ROW EXCLUSIVE MODE"
+                            )
+                            cursor.execute(
+                                "WITH moved AS ("
+                                f'DELETE FROM "{table.default_partition_name}" '
+                                "WHERE created_at >= %s AND created_at < %s "
+                                "RETURNING *"
+                                f') INSERT INTO "{partition_name}" SELECT * FROM moved',
+                                [start, end],
+                            )
+                        cursor.execute(
+                            f'ALTER TABLE "{table.name}" ATTACH PARTITION "{partition_name}" '
+                            "FOR VALUES FROM (%s) TO (%s)",
+                            [start, end],
+                        )
+                except Exception:
+                    logger.exception("Failed to create partition %s.", partition_name)
+                else:
+                    created.append(partition_name)
+            start = end
+    return created
+
+
+def drop_expired_partitions(table: PartitionedTable, before: datetime) -> list[str]:
+    """
+    Detach and drop the partitions which only hold rows created before `before`,
+    and delete the rows in the default partition created before `before`.
+    """
+    connection = _get_connection(table)
+    dropped = []
+    with connection.cursor() as cursor:
+        for partition_name, (_, upper) in _get_partition_bounds(cursor, table.name):
+            if upper > before:
+                continue
+            with transaction.atomic(using=connection.alias):
+                cursor.execute(
+                    f'ALTER TABLE "{table.name}" DETACH PARTITION "{partition_name}"'
+                )
+                cursor.execute(f'DROP TABLE "{partition_name}"')
+            dropped.append(partition_name)
+        if _has_default_partition(cursor, table):
+            cursor.execute(
+                f'DELETE FROM "{table.default_partition_name}" WHERE created_at < %s',
+                [before],
+            )
+    return dropped
+
+
+def _get_connection(table: PartitionedTable) -> BaseDatabaseWrapper:
+    return connections[router.db_for_write(table.model) or "default"]
+
+
+def _has_default_partition(cursor: CursorWrapper, table: PartitionedTable) -> bool:
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [table.default_partition_name])
+    return bool(cursor.fetchone()[0])
+
+
+def _get_indexes(
+    cursor: CursorWrapper, table_name: str
+) -> list[tuple[str, str, str | None, str | None]]:
+    cursor.execute(
+        """
+        SELECT i.relname, pg_get_indexdef(i.oid), c.contype, pg_get_constraintdef(c.oid)
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        LEFT JOIN pg_constraint c ON c.conindid = i.oid AND c.conrelid = x.indrelid
+        WHERE x.indrelid = %s::regclass
+        ORDER BY i.relname
+        """,
+        [table_name],
+    )
+    return cursor.fetchall()  # type: ignore[no-any-return]
+
+
+def _get_partition_bounds(
+    cursor: CursorWrapper, table_name: str
+) -> list[tuple[str, tuple[datetime | None, datetime]]]:
+    """
+    Return the name, and lower and upper bounds, of each of the table's range
+    partitions, with a lower bound of `None` for `MINVALUE`.
+    """
+    cursor.execute(
+        """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+        """,
+        [table_name],
+    )
+    bounds = []
+    for partition_name, bound in cursor.fetchall():
+        if match := _PARTITION_BOUND_RE.search(bound):
+            lower, upper = match.groups()
+            bounds.append(
+                (
+                    partition_name,
+                    (
+                        datetime.fromisoformat(lower) if lower else None,
+                        datetime.fromisoformat(upper),
+                    ),
+                )
+            )
+    return bounds
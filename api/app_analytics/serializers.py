@@ -1,7 +1,9 @@
+from collections.abc import Mapping
 from typing import TYPE_CHECKING, Any, get_args
 
 from django.conf import settings
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 from app_analytics.constants import LABELS
 from app_analytics.tasks import (
@@ -10,7 +12,7 @@ from app_analytics.tasks import (
 )
 from app_analytics.types import Labels, PeriodType
 from environments.models import Environment
-from features.models import FeatureState
+from features.features_service import get_environment_feature_names
 
 if TYPE_CHECKING:
     _SerializerType = serializers.Serializer[Any]
@@ -71,6 +73,43 @@ class UsageTotalCountSerializer(serializers.Serializer):  # type: ignore[type-ar
     count = serializers.IntegerField()
 
 
+_evaluation_count_field = serializers.IntegerField()
+
+
+class SDKAnalyticsFlagsV1Serializer(serializers.Serializer):  # type: ignore[type-arg]
+    """
+    Validate a mapping of feature names to evaluation counts, ignoring any
+    features which aren't in the request's environment.
+
+    The counts are validated with a single shared field, rather than building
+    a field for every feature in the environment.
+    """
+
+    def to_internal_value(self, data: Any) -> dict[str, int]:
+        if not isinstance(data, Mapping):
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: ["Expected a dictionary."]}
+            )
+
+        environment_feature_names = get_environment_feature_names(
+            self.context["request"].environment.id
+        )
+        evaluation_counts, errors = {}, {}
+        for feature_name, evaluation_count in data.items():
+            if feature_name not in environment_feature_names:
+                continue
+            try:
+                evaluation_counts[feature_name] = (
+                    _evaluation_count_field.run_validation(evaluation_count)
+                )
+            except serializers.ValidationError as e:
+                errors[feature_name] = e.detail
+
+        if errors:
+            raise serializers.ValidationError(errors)
+        return evaluation_counts
+
+
 class SDKAnalyticsFlagsSerializerDetail(serializers.Serializer):  # type: ignore[type-arg]
     feature_name = serializers.CharField()
     identity_identifier = serializers.CharField(required=False, default=None)
@@ -83,12 +122,8 @@ class SDKAnalyticsFlagsSerializer(serializers.Serializer):  # type: ignore[type-
 
     def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
         request = self.context["request"]
-        environment_feature_names = set(
-            FeatureState.objects.filter(
-                environment=request.environment,
-                feature_segment=None,
-                identity=None,
-            ).values_list("feature__name", flat=True)
+        environment_feature_names = get_environment_feature_names(
+            request.environment.id
         )
         return {
             "evaluations": [
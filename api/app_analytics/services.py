@@ -13,6 +13,7 @@ def track_usage_by_resource_host_and_environment(
     host: str,
     environment_key: str,
     labels: Labels,
+    count: int = 1,
 ) -> None:
     if resource and resource.is_tracked:
         if settings.USE_CACHE_FOR_USAGE_DATA:
@@ -21,6 +22,7 @@ def track_usage_by_resource_host_and_environment(
                 host=host,
                 environment_key=environment_key,
                 labels=labels,
+                count=count,
             )
         else:
             track_request.run_in_thread(
@@ -28,6 +30,7 @@ def track_usage_by_resource_host_and_environment(
                     "resource": resource.value,
                     "host": host,
                     "environment_key": environment_key,
+                    "count": count,
                     "labels": labels,
                 }
             )
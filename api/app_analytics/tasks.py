@@ -1,5 +1,5 @@
-from datetime import datetime, timedelta
-from typing import Any, List, Tuple, Unpack
+from datetime import date, datetime, timedelta
+from typing import Any, Iterable, List, Tuple, Unpack
 
 from django.conf import settings
 from django.db.models import Q, Sum
@@ -14,14 +14,21 @@ from app_analytics.constants import ANALYTICS_READ_BUCKET_SIZE
 from app_analytics.mappers import map_feature_evaluation_data_to_feature_evaluation_raw
 from app_analytics.models import (
     APIUsageBucket,
+    APIUsageDailyRollup,
     APIUsageRaw,
     FeatureEvaluationBucket,
     FeatureEvaluationRaw,
     Resource,
 )
+from app_analytics.partitions import (
+    PARTITIONED_TABLES,
+    is_partitioned,
+    maintain_partitions,
+)
 from app_analytics.track import (
     track_feature_evaluation_influxdb,
     track_request_influxdb,
+    track_requests_influxdb,
 )
 from app_analytics.track import (
     track_feature_evaluation_influxdb_v2 as track_feature_evaluation_influxdb_v2_service,
@@ -29,6 +36,7 @@ from app_analytics.track import (
 from app_analytics.types import (
     Labels,
     TrackFeatureEvaluationsByEnvironmentKwargs,
+    TrackRequestData,
 )
 from environments.models import Environment
 
@@ -54,26 +62,25 @@ if settings.USE_POSTGRES_FOR_ANALYTICS:  # pragma: no cover
     run_every=timedelta(days=1),
 )
 def clean_up_old_analytics_data():  # type: ignore[no-untyped-def]
-    # delete raw analytics data older than `RAW_ANALYTICS_DATA_RETENTION_DAYS`
-    APIUsageRaw.objects.filter(
-        created_at__lt=timezone.now()
-        - timedelta(days=settings.RAW_ANALYTICS_DATA_RETENTION_DAYS)
-    ).delete()
-    FeatureEvaluationRaw.objects.filter(
-        created_at__lt=timezone.now()
-        - timedelta(days=settings.RAW_ANALYTICS_DATA_RETENTION_DAYS)
-    ).delete()
-
-    # delete bucketed analytics data older than `BUCKETED_ANALYTICS_DATA_RETENTION_DAYS`
-    APIUsageBucket.objects.filter(
-        created_at__lt=timezone.now()
-        - timedelta(days=settings.BUCKETED_ANALYTICS_DATA_RETENTION_DAYS)
-    ).delete()
-
-    FeatureEvaluationBucket.objects.filter(
-        created_at__lt=timezone.now()
-        - timedelta(days=settings.BUCKETED_ANALYTICS_DATA_RETENTION_DAYS)
-    ).delete()
+    # delete analytics data older than its retention period, i.e.
+    # `RAW_ANALYTICS_DATA_RETENTION_DAYS` for raw data and
+    # `BUCKETED_ANALYTICS_DATA_RETENTION_DAYS` for bucketed data, unless the
+    # table is partitioned, in which case `maintain_analytics_partitions` drops
+    # the expired partitions instead
+    for table in PARTITIONED_TABLES:
+        if is_partitioned(table):
+            continue
+        table.model.objects.filter(  # type: ignore[attr-defined]
+            created_at__lt=timezone.now() - timedelta(days=table.get_retention_days())
+        ).delete()
+
+
+@register_recurring_task(
+    run_every=timedelta(days=1),
+)
+def maintain_analytics_partitions() -> None:
+    # a no-op unless the tables were partitioned with `manage_analytics_partitions`
+    maintain_partitions()
 
 
 @register_task_handler()
@@ -143,6 +150,47 @@ def track_request(
             )
 
 
+@register_task_handler()
+def track_requests(requests: list[TrackRequestData]) -> None:
+    """
+    Write the usage data for many requests, resolving all of their environments
+    at once and writing all of the data in a single write.
+    """
+    environments = Environment.get_many_from_cache(
+        {request["environment_key"] for request in requests}
+    )
+    requests_by_environment = [
+        (environment, request)
+        for request in requests
+        if (environment := environments.get(request["environment_key"]))
+    ]
+
+    if settings.USE_POSTGRES_FOR_ANALYTICS:
+        APIUsageRaw.objects.bulk_create(
+            [
+                APIUsageRaw(
+                    resource=Resource(request["resource"]),
+                    host=request["host"],
+                    environment_id=environment.id,
+                    count=request["count"],
+                    labels=request["labels"],
+                )
+                for environment, request in requests_by_environment
+            ]
+        )
+    elif settings.INFLUXDB_TOKEN:
+        track_requests_influxdb(
+            (
+                Resource(request["resource"]),
+                request["host"],
+                environment,
+                request["count"],
+                request["labels"],
+            )
+            for environment, request in requests_by_environment
+        )
+
+
 track_feature_evaluation_influxdb_v2 = register_task_handler()(
     track_feature_evaluation_influxdb_v2_service
 )
@@ -182,19 +230,114 @@ def populate_api_usage_bucket(
     run_every: int,
     source_bucket_size: int | None = None,
 ) -> None:
+    days: set[date] = set()
+    environment_ids: set[int] = set()
     for bucket_start_time, bucket_end_time in get_time_buckets(bucket_size, run_every):
         data = _get_api_usage_source_data(
             bucket_start_time, bucket_end_time, source_bucket_size
         )
-        for row in data:
-            APIUsageBucket.objects.update_or_create(
-                defaults={"total_count": row["count"]},
-                environment_id=row["environment_id"],
-                resource=row["resource"],
-                bucket_size=bucket_size,
-                created_at=bucket_start_time,
-                labels=row["labels"],
+        APIUsageBucket.objects.bulk_create(
+            [
+                APIUsageBucket(
+                    environment_id=row["environment_id"],
+                    resource=row["resource"],
+                    bucket_size=bucket_size,
+                    created_at=bucket_start_time,
+                    labels=row["labels"],
+                    total_count=row["count"],
+                )
+                for row in data
+            ],
+            update_conflicts=True,
+            unique_fields=[
+                "environment_id",
+                "bucket_size",
+                "created_at",
+                "resource",
+                "labels",
+            ],
+            update_fields=["total_count"],
+        )
+        if bucket_size == ANALYTICS_READ_BUCKET_SIZE and data:
+            days.add(timezone.localdate(bucket_start_time))
+            environment_ids.update(row["environment_id"] for row in data)
+
+    populate_api_usage_daily_rollups(days, environment_ids)
+
+
+def populate_api_usage_daily_rollups(
+    days: Iterable[date],
+    environment_ids: Iterable[int] | None = None,
+) -> None:
+    """
+    Roll up the API usage buckets for each of the given days into per
+    organisation totals, updating the rollups of the organisations of the
+    given environments, or of every organisation if none are given.
+    """
+    # The analytics database doesn't have the environments table, so
+    # environments are mapped to their organisations separately.
+    organisation_ids: dict[int, int] | None = None
+    if environment_ids is not None:
+        organisation_ids = dict(
+            Environment.objects.filter(
+                project__organisation_id__in=Environment.objects.filter(
+                    id__in=list(environment_ids)
+                ).values("project__organisation_id")
+            ).values_list("id", "project__organisation_id")
+        )
+
+    for day in days:
+        buckets = APIUsageBucket.objects.filter(
+            bucket_size=ANALYTICS_READ_BUCKET_SIZE,
+            created_at__date=day,
+        )
+        if organisation_ids is not None:
+            buckets = buckets.filter(environment_id__in=list(organisation_ids))
+        rows = list(
+            buckets.values("environment_id", "resource", "labels").annotate(
+                count=Sum("total_count")
+            )
+        )
+
+        day_organisation_ids = (
+            organisation_ids
+            if organisation_ids is not None
+            else dict(
+                Environment.objects.filter(
+                    id__in={row["environment_id"] for row in rows}
+                ).values_list("id", "project__organisation_id")
+            )
+        )
+        totals: dict[tuple[int, int, tuple[tuple[str, str], ...]], int] = {}
+        for row in rows:
+            if (
+                organisation_id := day_organisation_ids.get(row["environment_id"])
+            ) is None:
+                continue
+            key = (
+                organisation_id,
+                row["resource"],
+                tuple(sorted(row["labels"].items())),
             )
+            totals[key] = totals.get(key, 0) + row["count"]
+
+        # API usage buckets are only ever added to, so the totals only ever
+        # increase, and the rollups they replace are updated in place.
+        APIUsageDailyRollup.objects.bulk_create(
+            [
+                APIUsageDailyRollup(
+                    organisation_id=organisation_id,
+                    day=day,
+                    resource=resource,
+                    labels=dict(labels),
+                    total_count=count,
+                )
+                for (organisation_id, resource, labels), count in totals.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["organisation_id", "day", "resource", "labels"],
+            update_fields=["total_count"],
+        )
 
 
 def populate_feature_evaluation_bucket(
@@ -206,15 +349,28 @@ def populate_feature_evaluation_bucket(
         data = _get_feature_evaluation_source_data(
             bucket_start_time, bucket_end_time, source_bucket_size
         )
-        for row in data:
-            FeatureEvaluationBucket.objects.update_or_create(
-                defaults={"total_count": row["count"]},
-                environment_id=row["environment_id"],
-                feature_name=row["feature_name"],
-                bucket_size=bucket_size,
-                created_at=bucket_start_time,
-                labels=row["labels"],
-            )
+        FeatureEvaluationBucket.objects.bulk_create(
+            [
+                FeatureEvaluationBucket(
+                    environment_id=row["environment_id"],
+                    feature_name=row["feature_name"],
+                    bucket_size=bucket_size,
+                    created_at=bucket_start_time,
+                    labels=row["labels"],
+                    total_count=row["count"],
+                )
+                for row in data
+            ],
+            update_conflicts=True,
+            unique_fields=[
+                "environment_id",
+                "bucket_size",
+                "created_at",
+                "feature_name",
+                "labels",
+            ],
+            update_fields=["total_count"],
+        )
 
 
 def _get_api_usage_source_data(
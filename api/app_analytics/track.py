@@ -1,4 +1,5 @@
 import logging
+import typing
 import uuid
 from urllib.parse import quote
 
@@ -94,7 +95,24 @@ def track_request_influxdb(
 
     :param request: (HttpRequest) the request being made
     """
-    if resource.is_tracked:
+    track_requests_influxdb([(resource, host, environment, count, labels)])
+
+
+def track_requests_influxdb(
+    requests: typing.Iterable[tuple[Resource, str, "Environment", int, Labels]],
+) -> None:
+    """
+    Sends API event data for many requests to InfluxDB in a single write
+
+    :param requests: (iterable) tuples of resource, host, environment, count
+        and labels
+    """
+    influxdb = InfluxDBWrapper("api_call")  # type: ignore[no-untyped-call]
+
+    for resource, host, environment, count, labels in requests:
+        if not resource.is_tracked:
+            continue
+
         tags: dict[str, str | int | float] = {
             "resource": resource.resource_name,
             "organisation": environment.project.organisation.get_unique_slug(),
@@ -108,9 +126,9 @@ def track_request_influxdb(
             # `Literal["one", 2, 2.9999999]` are possible
             **{str(label): value for label, value in labels.items()},
         }
-
-        influxdb = InfluxDBWrapper("api_call")  # type: ignore[no-untyped-call]
         influxdb.add_data_point("request_count", count, tags=tags)
+
+    if influxdb.records:
         influxdb.write()
 
 
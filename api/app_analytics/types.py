@@ -24,6 +24,14 @@ class FeatureEvaluationCacheKey(NamedTuple):
     labels: tuple[tuple["Label", str], ...]
 
 
+class TrackRequestData(TypedDict):
+    resource: int
+    host: str
+    environment_key: str
+    count: int
+    labels: "Labels"
+
+
 class TrackFeatureEvaluationsByEnvironmentData(TypedDict):
     feature_name: str
     labels: "Labels"
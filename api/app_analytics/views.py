@@ -4,12 +4,10 @@ import typing
 from drf_yasg.utils import swagger_auto_schema  # type: ignore[import-untyped]
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.fields import IntegerField
 from rest_framework.generics import CreateAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.serializers import Serializer
 
 from app_analytics.analytics_db_service import (
     get_total_events_count,
@@ -21,13 +19,13 @@ from app_analytics.mappers import (
 )
 from environments.authentication import EnvironmentKeyAuthentication
 from environments.permissions.permissions import EnvironmentKeyPermissions
-from features.models import FeatureState
 from organisations.models import Organisation
 from telemetry.serializers import TelemetrySerializer
 
 from .permissions import UsageDataPermission
 from .serializers import (
     SDKAnalyticsFlagsSerializer,
+    SDKAnalyticsFlagsV1Serializer,
     UsageDataQuerySerializer,
     UsageDataSerializer,
     UsageTotalCountSerializer,
@@ -63,37 +61,7 @@ class SDKAnalyticsFlags(CreateAPIView):  # type: ignore[type-arg]
     authentication_classes = (EnvironmentKeyAuthentication,)
     throttle_classes = []
     format_kwarg = None
-
-    def get_serializer_class(self):  # type: ignore[no-untyped-def]
-        if getattr(self, "swagger_fake_view", False):
-            return Serializer
-
-        environment_feature_names = set(
-            FeatureState.objects.filter(
-                environment=self.request.environment,
-                feature_segment=None,
-                identity=None,
-            ).values_list("feature__name", flat=True)
-        )
-
-        class _AnalyticsSerializer(Serializer):  # type: ignore[type-arg]
-            def get_fields(self):  # type: ignore[no-untyped-def]
-                return {
-                    feature_name: IntegerField(required=False)
-                    for feature_name in environment_feature_names
-                }
-
-            def save(self, **kwargs: typing.Any) -> None:
-                request = self.context["request"]
-                for feature_name, evaluation_count in self.validated_data.items():
-                    feature_evaluation_cache.track_feature_evaluation(
-                        environment_id=request.environment.id,
-                        feature_name=feature_name,
-                        evaluation_count=evaluation_count,
-                        labels=map_request_to_labels(request),
-                    )
-
-        return _AnalyticsSerializer
+    serializer_class = SDKAnalyticsFlagsV1Serializer
 
     @swagger_auto_schema(  # type: ignore[misc]
         request_body=SDKAnalyticsFlagsSerializer(),
@@ -109,8 +77,15 @@ class SDKAnalyticsFlags(CreateAPIView):  # type: ignore[type-arg]
               this endpoint once SDKs have been updated.
         """
         serializer = self.get_serializer(data=request.data)
-        serializer.is_valid()
-        serializer.save(environment=self.request.environment)
+        if serializer.is_valid():
+            labels = map_request_to_labels(request)
+            for feature_name, evaluation_count in serializer.validated_data.items():
+                feature_evaluation_cache.track_feature_evaluation(
+                    environment_id=request.environment.id,
+                    feature_name=feature_name,
+                    evaluation_count=evaluation_count,
+                    labels=labels,
+                )
         return Response(status=status.HTTP_200_OK)
 
 
@@ -0,0 +1,162 @@
+import time
+import typing
+from collections import OrderedDict
+from threading import Event, Lock
+
+from django.conf import settings
+from django.core.cache import BaseCache
+
+K = typing.TypeVar("K", bound=typing.Hashable)
+V = typing.TypeVar("V")
+
+CACHE_REBUILD_POLL_INTERVAL_SECONDS = 0.05
+
+
+class VersionedLRUCache(typing.Generic[K, V]):
+    """
+    A bounded, thread-safe, process-local cache whose entries are stamped with
+    a version (e.g. a model's `updated_at`).
+
+    Values are stored as-is (i.e. not pickled), so this is suitable for objects
+    which are expensive to build or to deserialise. A lookup only results in a
+    hit when the caller supplies the same version the entry was stored with.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[K, tuple[typing.Hashable, V]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: K, version: typing.Hashable) -> V | None:
+        with self._lock:
+            try:
+                entry_version, value = self._entries[key]
+            except KeyError:
+                return None
+
+            if entry_version != version:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: K, version: typing.Hashable, value: V) -> None:
+        if self._max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_set(
+        self,
+        key: K,
+        version: typing.Hashable,
+        default: typing.Callable[[], V],
+    ) -> V:
+        if (value := self.get(key, version)) is None:
+            value = default()
+            self.set(key, version, value)
+        return value
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _Call(typing.Generic[V]):
+    __slots__ = ("done", "value", "exception")
+
+    def __init__(self) -> None:
+        self.done = Event()
+        self.value: V | None = None
+        self.exception: BaseException | None = None
+
+
+class SingleFlight(typing.Generic[K, V]):
+    """
+    Coalesces concurrent calls for the same key within a process, so that
+    only the first caller runs the (expensive) function while the others
+    wait for, and share, its result.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[K, _Call[V]] = {}
+        self._lock = Lock()
+
+    def do(self, key: K, fn: typing.Callable[[], V]) -> V:
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.value  # type: ignore[return-value]
+
+        try:
+            call.value = fn()
+        except BaseException as exception:
+            call.exception = exception
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.value
+
+
+def coalesce_cache_rebuild(
+    cache: BaseCache,
+    key: str,
+    rebuild: typing.Callable[[], V],
+    single_flight: SingleFlight[str, V],
+) -> V:
+    """
+    Rebuild a value missing from `cache` so that only one caller per process
+    runs `rebuild`, which is expected to write the value to `cache` itself.
+
+    If `CACHE_REBUILD_LOCK_SECONDS` is set, callers in other processes are
+    coalesced too, using a lock added to `cache`: they wait, for at most that
+    many seconds, for the lock holder to write the value before rebuilding it
+    themselves.
+    """
+
+    def _rebuild() -> V:
+        # the value may have been written since the caller's cache miss
+        if (value := cache.get(key)) is not None:
+            return value  # type: ignore[no-any-return]
+
+        if (lock_seconds := settings.CACHE_REBUILD_LOCK_SECONDS) <= 0:
+            return rebuild()
+
+        lock_key = f"rebuild-lock:{key}"
+        if cache.add(lock_key, True, lock_seconds):
+            try:
+                return rebuild()
+            finally:
+                cache.delete(lock_key)
+
+        deadline = time.monotonic() + lock_seconds
+        while time.monotonic() < deadline:
+            time.sleep(CACHE_REBUILD_POLL_INTERVAL_SECONDS)
+            if (value := cache.get(key)) is not None:
+                return value  # type: ignore[no-any-return]
+
+        return rebuild()
+
+    return single_flight.do(key, _rebuild)
@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING
 
 import structlog
+from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 
@@ -8,6 +9,7 @@ from environments.tasks import rebuild_environment_document
 from features.versioning.models import EnvironmentFeatureVersion
 from features.versioning.signals import environment_feature_version_published
 from features.versioning.tasks import trigger_update_version_webhooks
+from features.versioning.versioning_service import refresh_live_feature_states
 from features.workflows.core.exceptions import ChangeRequestNotApprovedError
 
 if TYPE_CHECKING:
@@ -54,6 +56,16 @@ class ChangeRequestCommitService:
         if feature_states:
             type(fs).objects.bulk_update(feature_states, ["live_from", "version"])
 
+        if settings.MAINTAIN_LIVE_FEATURE_STATES:
+            for feature_id, identity_id in {
+                (fs.feature_id, fs.identity_id) for fs in feature_states
+            }:
+                refresh_live_feature_states(
+                    self.change_request.environment,  # type: ignore[arg-type]
+                    feature_id,
+                    identity_id,
+                )
+
     def _publish_environment_feature_versions(
         self, published_by: "FFAdminUser"
     ) -> None:
@@ -77,6 +89,11 @@ class ChangeRequestCommitService:
             )
 
             for environment_feature_version in environment_feature_versions:
+                # Sent first, so that the live feature states are refreshed
+                # before the webhooks are triggered.
+                environment_feature_version_published.send(
+                    EnvironmentFeatureVersion, instance=environment_feature_version
+                )
                 trigger_update_version_webhooks.delay(
                     kwargs={
                         "environment_feature_version_uuid": str(
@@ -89,9 +106,6 @@ class ChangeRequestCommitService:
                     kwargs={"environment_id": self.change_request.environment_id},
                     delay_until=environment_feature_version.live_from,
                 )
-                environment_feature_version_published.send(
-                    EnvironmentFeatureVersion, instance=environment_feature_version
-                )
 
     def _publish_change_sets(self, published_by: "FFAdminUser") -> None:
         for change_set in self.change_request.change_sets.all():
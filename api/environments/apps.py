@@ -7,3 +7,13 @@ from core.apps import BaseAppConfig
 class EnvironmentsConfig(BaseAppConfig):
     name = "environments"
     default = True
+
+    def ready(self) -> None:
+        super().ready()  # type: ignore[no-untyped-call]
+
+        from environments.invalidation import (
+            invalidate_environment_caches,
+            invalidation_bus,
+        )
+
+        invalidation_bus.subscribe(invalidate_environment_caches)
@@ -6,6 +6,7 @@ from rest_framework.exceptions import AuthenticationFailed
 
 from core.request_origin import RequestOrigin
 from environments.api_keys import SERVER_API_KEY_PREFIX
+from environments.invalidation import invalidation_bus
 from environments.models import Environment
 
 environment_cache = caches[settings.ENVIRONMENT_CACHE_NAME]
@@ -26,6 +27,8 @@ class EnvironmentKeyAuthentication(BaseAuthentication):
         if not (api_key and api_key.startswith(self.required_key_prefix)):
             raise AuthenticationFailed("Invalid or missing Environment key")
 
+        invalidation_bus.ensure_listening()
+
         environment = Environment.get_from_cache(api_key)
         if not environment:
             raise AuthenticationFailed("Invalid or missing Environment Key")
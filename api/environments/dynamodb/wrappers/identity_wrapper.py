@@ -10,12 +10,14 @@ from django.core.exceptions import ObjectDoesNotExist
 from flag_engine.context.mappers import map_environment_identity_to_context
 from flag_engine.environments.models import EnvironmentModel
 from flag_engine.identities.models import IdentityModel
-from flag_engine.segments.evaluator import get_context_segments
+from flag_engine.segments.models import SegmentModel
 from rest_framework.exceptions import NotFound
 
+from core.cache import VersionedLRUCache
 from edge_api.identities.search import EdgeIdentitySearchData
 from environments.dynamodb.constants import IDENTITIES_PAGINATION_LIMIT
 from environments.dynamodb.wrappers.exceptions import CapacityBudgetExceeded
+from segments.evaluator import SegmentIndex
 from util.mappers import map_identity_to_identity_document
 
 from .base import BaseDynamoWrapper
@@ -34,6 +36,16 @@ if typing.TYPE_CHECKING:
 logger = logging.getLogger()
 
 
+class EngineEnvironment(typing.NamedTuple):
+    model: EnvironmentModel
+    segment_index: SegmentIndex[SegmentModel]
+
+
+_engine_environments: VersionedLRUCache[str, EngineEnvironment] = VersionedLRUCache(
+    max_entries=settings.ENGINE_ENVIRONMENT_CACHE_MAX_ENTRIES
+)
+
+
 class DynamoIdentityWrapper(BaseDynamoWrapper):
     def get_table_name(self) -> str | None:  # type: ignore[override]
         return settings.IDENTITIES_TABLE_NAME_DYNAMO
@@ -186,17 +198,16 @@ class DynamoIdentityWrapper(BaseDynamoWrapper):
             identity = identity_model or IdentityModel.model_validate(
                 self.get_item_from_uuid(identity_pk)
             )
-            environment_wrapper = DynamoEnvironmentWrapper()
-            environment = EnvironmentModel.model_validate(
-                environment_wrapper.get_item(identity.environment_api_key)
-            )
+            environment = get_engine_environment(identity.environment_api_key)
             context = map_environment_identity_to_context(
-                environment=environment,
+                environment=environment.model,
                 identity=identity,
                 override_traits=None,
             )
-            segments = get_context_segments(context, environment.project.segments)
-            return [segment.id for segment in segments]
+            return [
+                segment.id
+                for segment in environment.segment_index.get_matching_segments(context)
+            ]
 
         return []
 
@@ -230,3 +241,38 @@ class DynamoIdentityWrapper(BaseDynamoWrapper):
                 )
 
         return feature_to_identity_count
+
+
+def get_engine_environment(api_key: str) -> EngineEnvironment:
+    """
+    Get the engine model of an environment's document, and its compiled
+    segments, from DynamoDB.
+
+    These are held in-process until the environment's `updated_at` changes,
+    so that the document is only retrieved, and validated, once per change.
+    """
+    from environments.models import Environment
+
+    django_environment = Environment.get_from_cache(api_key)
+    version = django_environment.updated_at if django_environment else None
+    if version and (engine_environment := _engine_environments.get(api_key, version)):
+        return engine_environment
+
+    model = EnvironmentModel.model_validate(
+        DynamoEnvironmentWrapper().get_item(api_key)
+    )
+    engine_environment = EngineEnvironment(
+        model=model,
+        segment_index=SegmentIndex.from_segment_models(model.project.segments),
+    )
+    # The document is written by a task once the environment has changed, so
+    # it's only held once it has caught up with the environment.
+    if version and model.updated_at == version:
+        _engine_environments.set(api_key, version, engine_environment)
+
+    return engine_environment
+
+
+def delete_engine_environments(api_keys: typing.Iterable[str]) -> None:
+    for api_key in api_keys:
+        _engine_environments.delete(api_key)
@@ -15,10 +15,8 @@ def get_hashed_percentage_for_object_ids(
     :return: (float) number between 0 (inclusive) and 1 (exclusive)
     """
 
-    to_hash = ",".join(str(id_) for id_ in list(object_ids) * iterations)
-    hashed_value = hashlib.md5(to_hash.encode("utf-8"))
-    hashed_value_as_int = int(hashed_value.hexdigest(), base=16)
-    value = (hashed_value_as_int % 9999) / 9998
+    *prefix_ids, last_id = list(object_ids) * iterations
+    [value] = _get_hashed_percentages(prefix_ids, [last_id])
 
     if value == 1:
         # since we want a number between 0 (inclusive) and 1 (exclusive), in the
@@ -29,3 +27,52 @@ def get_hashed_percentage_for_object_ids(
         )
 
     return value
+
+
+def get_hashed_percentages_for_object_ids(
+    object_ids: typing.Sequence[typing.Union[str, int]],
+    identity_keys: typing.Sequence[typing.Union[str, int]],
+) -> list[list[float]]:
+    """
+    Get the value of `get_hashed_percentage_for_object_ids([object_id, identity_key])`
+    for every combination of the given object (e.g. feature state or segment) ids
+    and identity keys, in a single pass.
+
+    The hash state for each object id prefix is computed once and copied for each
+    identity key.
+
+    :return: a list of values per object id, in the order of `identity_keys`
+    """
+    percentages = []
+    for object_id in object_ids:
+        object_percentages = _get_hashed_percentages([object_id], identity_keys)
+        for i, value in enumerate(object_percentages):
+            if value == 1:
+                object_percentages[i] = get_hashed_percentage_for_object_ids(
+                    [object_id, identity_keys[i]], iterations=2
+                )
+        percentages.append(object_percentages)
+
+    return percentages
+
+
+def _get_hashed_percentages(
+    prefix_ids: typing.Sequence[typing.Union[str, int]],
+    keys: typing.Sequence[typing.Union[str, int]],
+) -> list[float]:
+    """
+    Get the hashed percentage of `[*prefix_ids, key]` for each of the given keys.
+    The hash state for the prefix is computed once and copied for each key.
+    """
+    prefix_hash = hashlib.md5("".join(f"{id_}," for id_ in prefix_ids).encode("utf-8"))
+    values = []
+    for key in keys:
+        hashed_value = prefix_hash.copy()
+        hashed_value.update(str(key).encode("utf-8"))
+        values.append(_get_hashed_percentage(hashed_value))
+    return values
+
+
+def _get_hashed_percentage(hashed_value: "hashlib._Hash") -> float:
+    hashed_value_as_int = int(hashed_value.hexdigest(), base=16)
+    return (hashed_value_as_int % 9999) / 9998
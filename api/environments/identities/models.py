@@ -4,7 +4,6 @@ from itertools import chain
 from django.db import models
 from django.db.models import Prefetch, Q
 from flag_engine.context.mappers import map_environment_identity_to_context
-from flag_engine.segments.evaluator import is_context_in_segment
 
 from environments.identities.managers import IdentityManager
 from environments.identities.traits.models import Trait
@@ -13,10 +12,10 @@ from environments.sdk.types import SDKTraitData
 from features.models import FeatureState
 from features.multivariate.models import MultivariateFeatureStateValue
 from features.versioning.versioning_service import get_environment_flags_list
-from segments.models import Segment
+from segments.definitions import SegmentDefinition
+from segments.evaluator import get_environment_segment_index
 from util.mappers.engine import (
     map_identity_to_engine,
-    map_segment_to_engine,
     map_traits_to_engine,
 )
 
@@ -84,7 +83,7 @@ class Identity(models.Model):
             overridden_for_identity_query = Q()
 
         overridden_for_segment_query = Q(
-            feature_segment__segment__in=segments,
+            feature_segment__segment_id__in=[segment.id for segment in segments],
             feature_segment__environment=self.environment,
         )
         environment_default_query = Q(identity=None, feature_segment=None)
@@ -143,47 +142,34 @@ class Identity(models.Model):
         self,
         traits: typing.List[Trait] = None,  # type: ignore[assignment]
         overrides_only: bool = False,
-    ) -> typing.List[Segment]:
+    ) -> list[SegmentDefinition]:
         """
-        Get the list of segments this identity is a part of.
+        Get the definitions of the segments this identity is a part of.
 
         :param traits: override the identity's traits when evaluating segments
         :param overrides_only: only retrieve the segments which have a valid override in the environment
-        :return: List of matching segments
+        :return: List of matching segment definitions
         """
-        matching_segments = []
         traits = (
             self.identity_traits.all() if (traits is None and self.id) else traits or []
         )
 
-        if overrides_only:
-            all_segments = self.environment.get_segments_from_cache()
-        else:
-            all_segments = self.environment.project.get_segments_from_cache()
-
         engine_identity = map_identity_to_engine(
             self,
             with_overrides=False,
             with_traits=False,
         )
-        engine_traits = map_traits_to_engine(traits)
-
-        for segment in all_segments:
-            engine_segment = map_segment_to_engine(segment)
-
-            context = map_environment_identity_to_context(
-                environment=self.environment,
-                identity=engine_identity,
-                override_traits=engine_traits,
-            )
-
-            if is_context_in_segment(
-                context=context,
-                segment=engine_segment,
-            ):
-                matching_segments.append(segment)
+        context = map_environment_identity_to_context(
+            environment=self.environment,
+            identity=engine_identity,
+            override_traits=map_traits_to_engine(traits),
+        )
 
-        return matching_segments
+        segment_index = get_environment_segment_index(
+            self.environment,
+            overrides_only=overrides_only,
+        )
+        return segment_index.get_matching_segments(context)
 
     def get_all_user_traits(self):  # type: ignore[no-untyped-def]
         # this is pointless, we should probably replace all uses with the below code
@@ -7,19 +7,25 @@ from common.environments.permissions import (
 )
 from django.conf import settings
 from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from django.views.decorators.http import condition
 from django.views.decorators.vary import vary_on_headers
 from drf_yasg.utils import swagger_auto_schema  # type: ignore[import-untyped]
 from rest_framework import status, viewsets
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
 from app.pagination import CustomPagination
+from app_analytics.mappers import map_request_to_labels
+from app_analytics.models import Resource
+from app_analytics.services import track_usage_by_resource_host_and_environment
 from core.constants import FLAGSMITH_UPDATED_AT_HEADER, SDK_ENVIRONMENT_KEY_HEADER
 from core.request_origin import RequestOrigin
 from edge_api.identities.tasks import forward_identity_request
+from environments.authentication import EnvironmentKeyAuthentication
 from environments.identities.models import Identity
 from environments.identities.serializers import (
     IdentitySerializer,
@@ -28,9 +34,16 @@ from environments.identities.serializers import (
 )
 from environments.models import Environment
 from environments.permissions.permissions import NestedEnvironmentPermissions
+from environments.sdk.cache import cache_page_per_environment
+from environments.sdk.etags import get_identity_flags_etag
 from environments.sdk.serializers import (
     IdentifyWithTraitsSerializer,
     IdentitySerializerWithTraitsAndSegments,
+    SDKBulkIdentitiesSerializer,
+)
+from environments.sdk.services import (
+    IdentityTraitsAndFlags,
+    get_bulk_identities_flags,
 )
 from features.serializers import SDKFeatureStateSerializer
 from integrations.integration import (
@@ -162,9 +175,10 @@ class SDKIdentities(SDKAPIView):
         query_serializer=SDKIdentitiesQuerySerializer(),
         operation_id="identify_user",
     )
+    @method_decorator(condition(etag_func=get_identity_flags_etag))
     @method_decorator(vary_on_headers(SDK_ENVIRONMENT_KEY_HEADER))
     @method_decorator(
-        cache_page(
+        cache_page_per_environment(
             timeout=settings.GET_IDENTITIES_ENDPOINT_CACHE_SECONDS,
             cache=settings.GET_IDENTITIES_ENDPOINT_CACHE_NAME,
         )
@@ -322,3 +336,74 @@ class SDKIdentities(SDKAPIView):
         return Response(
             data=serializer.data, status=status.HTTP_200_OK, headers=headers
         )
+
+
+class SDKBulkIdentities(SDKAPIView):
+    """
+    Evaluate the flags for many identities in a single request, e.g. for
+    server-side batch jobs.
+
+    Nothing is persisted and integrations are not notified. The results are
+    streamed as newline delimited JSON, with one line per identity in the order
+    of the request, each in the same format as the identities endpoint.
+    """
+
+    serializer_class = SDKBulkIdentitiesSerializer
+    pagination_class = None
+    throttle_classes = []
+
+    def get_authenticators(self):  # type: ignore[no-untyped-def]
+        return [EnvironmentKeyAuthentication(required_key_prefix="ser.")]
+
+    @swagger_auto_schema(
+        request_body=SDKBulkIdentitiesSerializer(),
+        responses={200: SDKIdentitiesResponseSerializer(many=True)},
+        operation_id="bulk_identify_users",
+    )
+    def post(self, request):  # type: ignore[no-untyped-def]
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        sdk_identity_data = serializer.validated_data["identities"]
+
+        # Usage isn't tracked by the middleware for this endpoint, since each
+        # identity evaluated is counted as a request to the identities endpoint.
+        track_usage_by_resource_host_and_environment(
+            resource=Resource.IDENTITIES,
+            host=request.get_host(),
+            environment_key=request.headers[SDK_ENVIRONMENT_KEY_HEADER],
+            labels=map_request_to_labels(request),
+            count=len(sdk_identity_data),
+        )
+
+        results = get_bulk_identities_flags(
+            environment=request.environment,
+            sdk_identity_data=sdk_identity_data,
+        )
+        return StreamingHttpResponse(
+            self._render_results(results),
+            content_type="application/x-ndjson",
+            headers={
+                FLAGSMITH_UPDATED_AT_HEADER: request.environment.updated_at.timestamp()
+            },
+        )
+
+    def _render_results(
+        self,
+        results: typing.Iterator[IdentityTraitsAndFlags],
+    ) -> typing.Iterator[bytes]:
+        renderer = JSONRenderer()
+        context = self.get_serializer_context()
+        for identity, traits, flags, feature_state_values in results:
+            serializer = IdentifyWithTraitsSerializer(
+                {
+                    "identifier": identity.identifier,
+                    "traits": traits,
+                    "flags": flags,
+                },
+                context={
+                    **context,
+                    "identity": identity,
+                    "feature_state_values": feature_state_values,
+                },
+            )
+            yield renderer.render(serializer.data) + b"\n"
@@ -0,0 +1,196 @@
+"""
+Broadcasting of environment cache invalidation events.
+
+Events are published by the task which processes environment updates and are
+handled by every API process so that each of them can drop its own (e.g. local
+memory) cache entries for the changed environments. Events are broadcast using
+Redis pub/sub when `CACHE_INVALIDATION_REDIS_URL` is set, otherwise they are
+only handled by the process which publishes them.
+"""
+
+import json
+import logging
+import threading
+import time
+import typing
+
+from django.conf import settings
+from django.core.cache import caches
+
+from environments.sdk.cache import get_endpoint_cache_generation_key
+from segments.definitions import get_segment_definitions_cache_key
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_RECONNECT_INTERVAL_SECONDS = 5
+
+
+class EnvironmentInvalidationEvent(typing.TypedDict):
+    project_id: int
+    environment_ids: list[int]
+    api_keys: list[str]
+
+
+InvalidationHandler = typing.Callable[[EnvironmentInvalidationEvent], None]
+
+
+class LocalInvalidationBus:
+    def __init__(self) -> None:
+        self._handlers: list[InvalidationHandler] = []
+
+    def subscribe(self, handler: InvalidationHandler) -> None:
+        self._handlers.append(handler)
+
+    def publish(self, event: EnvironmentInvalidationEvent) -> None:
+        self._dispatch(event)
+
+    def ensure_listening(self) -> None:
+        pass
+
+    def _dispatch(self, event: EnvironmentInvalidationEvent) -> None:
+        for handler in self._handlers:
+            try:
+                handler(event)
+            except Exception:
+                logger.exception("Failed to handle environment invalidation event.")
+
+
+class RedisInvalidationBus(LocalInvalidationBus):
+    def __init__(self, client: "Redis", channel: str) -> None:
+        super().__init__()
+        self._client = client
+        self._channel = channel
+        self._listener: threading.Thread | None = None
+        self._listener_lock = threading.Lock()
+
+    def publish(self, event: EnvironmentInvalidationEvent) -> None:
+        self._client.publish(self._channel, json.dumps(event))
+
+    def ensure_listening(self) -> None:
+        """
+        Start listening for events in a background thread, unless already
+        listening. This is safe to call on every request, and restarts the
+        listener in processes forked after it was started.
+        """
+        if self._listener and self._listener.is_alive():
+            return
+
+        with self._listener_lock:
+            if self._listener and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(
+                target=self._listen,
+                name="environment-invalidation-listener",
+                daemon=True,
+            )
+            self._listener.start()
+
+    def _listen(self) -> None:
+        from redis.exceptions import RedisError
+
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)  # type: ignore[no-untyped-call]
+                pubsub.subscribe(self._channel)
+                for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._dispatch(json.loads(message["data"]))
+            except RedisError:
+                logger.warning(
+                    "Lost connection to environment invalidation channel, retrying.",
+                    exc_info=True,
+                )
+                time.sleep(REDIS_RECONNECT_INTERVAL_SECONDS)
+
+
+def _get_invalidation_bus() -> LocalInvalidationBus:
+    if redis_url := settings.CACHE_INVALIDATION_REDIS_URL:
+        from redis import Redis
+
+        return RedisInvalidationBus(
+            client=Redis.from_url(redis_url),  # type: ignore[arg-type]
+            channel=settings.CACHE_INVALIDATION_CHANNEL,
+        )
+    return LocalInvalidationBus()
+
+
+invalidation_bus = _get_invalidation_bus()
+
+
+def publish_environment_invalidation(
+    project_id: int,
+    environment_id: int | None = None,
+) -> None:
+    """
+    Publish an invalidation event for a single environment or, if no
+    environment is given, for all of the environments in the project.
+    """
+    from environments.models import Environment, EnvironmentAPIKey
+
+    environments = Environment.objects.filter(project_id=project_id)
+    if environment_id:
+        environments = environments.filter(id=environment_id)
+
+    environment_ids, client_api_keys = [], []
+    for id_, api_key in environments.values_list("id", "api_key"):
+        environment_ids.append(id_)
+        client_api_keys.append(api_key)
+
+    if not environment_ids:
+        return
+
+    server_api_keys = EnvironmentAPIKey.objects.filter(
+        environment_id__in=environment_ids
+    ).values_list("key", flat=True)
+
+    invalidation_bus.publish(
+        {
+            "project_id": project_id,
+            "environment_ids": environment_ids,
+            "api_keys": [*client_api_keys, *server_api_keys],
+        }
+    )
+
+
+def invalidate_environment_caches(event: EnvironmentInvalidationEvent) -> None:
+    from environments.dynamodb.wrappers.identity_wrapper import (
+        delete_engine_environments,
+    )
+    from environments.models import environment_document_local_cache
+    from segments.evaluator import delete_environment_segment_indexes
+
+    api_keys = event["api_keys"]
+
+    caches[settings.ENVIRONMENT_CACHE_NAME].delete_many(api_keys)
+    caches[settings.FLAGS_CACHE_LOCATION].delete_many(api_keys)
+    caches[settings.ENVIRONMENT_SEGMENTS_CACHE_NAME].delete_many(
+        [
+            get_segment_definitions_cache_key(environment_id)
+            for environment_id in event["environment_ids"]
+        ]
+    )
+    caches[settings.ENVIRONMENT_FEATURE_NAMES_CACHE_LOCATION].delete_many(
+        event["environment_ids"]
+    )
+    caches[settings.ENVIRONMENT_LATEST_VERSIONS_CACHE_LOCATION].delete_many(
+        event["environment_ids"]
+    )
+    delete_environment_segment_indexes(event["environment_ids"])
+    caches[settings.PROJECT_SEGMENTS_CACHE_LOCATION].delete_many(
+        [event["project_id"], get_segment_definitions_cache_key(event["project_id"])]
+    )
+
+    for cache_name in (
+        settings.GET_FLAGS_ENDPOINT_CACHE_NAME,
+        settings.GET_IDENTITIES_ENDPOINT_CACHE_NAME,
+    ):
+        caches[cache_name].delete_many(
+            [get_endpoint_cache_generation_key(api_key) for api_key in api_keys]
+        )
+
+    delete_engine_environments(api_keys)
+    for api_key in api_keys:
+        environment_document_local_cache.delete(api_key)
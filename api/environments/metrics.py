@@ -3,8 +3,12 @@ import prometheus_client
 CACHE_HIT = "CACHE_HIT"
 CACHE_MISS = "CACHE_MISS"
 
+CACHE_TIER_LOCAL = "LOCAL"
+CACHE_TIER_SHARED = "SHARED"
+
 flagsmith_environment_document_cache_queries_total = prometheus_client.Counter(
     "flagsmith_environment_document_cache_queries_total",
-    "Results of cache retrieval for environment document. `result` label is either `hit` or `miss`.",
-    ["result"],
+    "Results of cache retrieval for environment document. `result` label is either `hit` or `miss`. "
+    "`tier` label is either `local` (in-process) or `shared` (cache backend).",
+    ["result", "tier"],
 )
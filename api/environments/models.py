@@ -2,13 +2,14 @@ import logging
 import typing
 import uuid
 from copy import deepcopy
+from datetime import datetime
 from typing import TYPE_CHECKING, Literal
 
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericRelation
 from django.core.cache import caches
 from django.db import models
-from django.db.models import Max, Prefetch, Q, QuerySet
+from django.db.models import F, Max, Prefetch, Q, QuerySet
 from django.utils import timezone
 from django_lifecycle import (  # type: ignore[import-untyped]
     AFTER_CREATE,
@@ -28,6 +29,7 @@ from audit.constants import (
     ENVIRONMENT_UPDATED_MESSAGE,
 )
 from audit.related_object_type import RelatedObjectType
+from core.cache import SingleFlight, VersionedLRUCache, coalesce_cache_rebuild
 from core.models import abstract_base_auditable_model_factory
 from core.request_origin import RequestOrigin
 from environments.api_keys import (
@@ -46,18 +48,32 @@ from environments.managers import EnvironmentManager
 from environments.metrics import (
     CACHE_HIT,
     CACHE_MISS,
+    CACHE_TIER_LOCAL,
+    CACHE_TIER_SHARED,
     flagsmith_environment_document_cache_queries_total,
 )
+from environments.sdk.documents import (
+    RenderedEnvironmentDocument,
+    get_rendered_environment_document_etag_key,
+    get_rendered_environment_document_key,
+    render_environment_document,
+)
 from features.models import Feature, FeatureSegment, FeatureState
 from features.multivariate.models import MultivariateFeatureStateValue
 from integrations.flagsmith.client import get_client
 from metadata.models import Metadata
 from projects.models import Project
+from segments.definitions import (
+    SegmentDefinition,
+    get_segment_definitions,
+    get_segment_definitions_cache_key,
+)
 from segments.models import Segment
 from util.mappers import (
     map_environment_to_environment_document,
     map_environment_to_sdk_document,
 )
+from util.util import postpone
 from webhooks.models import AbstractBaseExportableWebhookModel
 
 if TYPE_CHECKING:
@@ -71,6 +87,16 @@ environment_document_cache = caches[settings.CACHE_ENVIRONMENT_DOCUMENT_LOCATION
 environment_segments_cache = caches[settings.ENVIRONMENT_SEGMENTS_CACHE_NAME]
 bad_environments_cache = caches[settings.BAD_ENVIRONMENTS_CACHE_LOCATION]
 
+# In-process tier in front of `environment_document_cache`. Entries are validated
+# against the version stamp stored alongside each document in the shared cache.
+environment_document_local_cache: VersionedLRUCache[str, dict[str, typing.Any]] = (
+    VersionedLRUCache(max_entries=settings.CACHE_ENVIRONMENT_DOCUMENT_LOCAL_MAX_ENTRIES)
+)
+
+environment_document_single_flight: SingleFlight[str, dict[str, typing.Any]] = (
+    SingleFlight()
+)
+
 # Intialize the dynamo environment wrapper(s) globaly
 environment_wrapper = DynamoEnvironmentWrapper()
 environment_v2_wrapper = DynamoEnvironmentV2Wrapper()
@@ -178,7 +204,15 @@ class Environment(
 
     @hook(AFTER_UPDATE, when="api_key", has_changed=True)  # type: ignore[misc]
     def update_environment_document_cache(self) -> None:
-        environment_document_cache.delete(self.initial_value("api_key"))
+        api_key = self.initial_value("api_key")
+        environment_document_cache.delete(api_key)
+        if settings.CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED:
+            environment_document_cache.delete_many(
+                [
+                    get_rendered_environment_document_key(api_key),
+                    get_rendered_environment_document_etag_key(api_key),
+                ]
+            )
         self.write_environment_documents(self.id)
 
     @hook(AFTER_DELETE)  # type: ignore[misc]
@@ -196,6 +230,13 @@ class Environment(
             or settings.CACHE_ENVIRONMENT_DOCUMENT_SECONDS > 0
         ):
             environment_document_cache.delete(self.api_key)
+            if settings.CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED:
+                environment_document_cache.delete_many(
+                    [
+                        get_rendered_environment_document_key(self.api_key),
+                        get_rendered_environment_document_etag_key(self.api_key),
+                    ]
+                )
 
     # Use the BEFORE_SAVE hook instead of BEFORE_CREATE to account for the logic in the
     # Environment.clone() method
@@ -274,34 +315,112 @@ class Environment(
         if cls.is_bad_key(api_key):
             return None
 
-        environment: "Environment" = environment_cache.get(api_key)
+        environment: "Environment | None" = environment_cache.get(api_key)
         if not environment:
-            select_related_args = (
-                "project",
-                "project__organisation",
-                *IDENTITY_INTEGRATIONS_RELATION_NAMES,
-            )
-            base_qs = cls.objects.select_related(*select_related_args).defer(
-                "description"
-            )
-            qs_for_embedded_api_key = base_qs.filter(api_key=api_key)
-            qs_for_fk_api_key = base_qs.filter(api_keys__key=api_key)
-
-            try:
-                environment = qs_for_embedded_api_key.union(qs_for_fk_api_key).get()
-            except cls.DoesNotExist:
-                cls.set_bad_key(api_key)
-                logger.info("Environment with api_key %s does not exist" % api_key)
+            environment = cls._get_environment_for_cache(api_key)
+            if not environment:
                 return None
-            else:
-                environment_cache.set(
-                    api_key,
-                    environment,
-                    timeout=settings.ENVIRONMENT_CACHE_SECONDS,
-                )
+            cls._set_in_environment_cache(api_key, environment)
+        elif settings.ENVIRONMENT_CACHE_STALE_SECONDS > 0 and environment_cache.add(
+            get_environment_cache_fresh_key(api_key),
+            True,
+            timeout=settings.ENVIRONMENT_CACHE_SECONDS,
+        ):
+            # The fresh marker had expired, so the cached environment is stale.
+            # Since `add` is atomic, only this caller refreshes it, while it
+            # (and everyone else) carries on using the stale environment.
+            cls._refresh_environment_cache(api_key)
 
         return environment
 
+    @classmethod
+    def get_many_from_cache(
+        cls, api_keys: typing.Iterable[str]
+    ) -> dict[str, "Environment"]:
+        """
+        Get the environments for many api keys (client or server side) at once,
+        loading any which aren't cached with a fixed number of queries.
+
+        :return: the environments found, keyed by the api key used to find them
+        """
+        api_keys = [api_key for api_key in set(api_keys) if not cls.is_bad_key(api_key)]
+        environments: dict[str, "Environment"] = environment_cache.get_many(api_keys)
+
+        if missing_api_keys := [
+            api_key for api_key in api_keys if api_key not in environments
+        ]:
+            base_qs = cls._get_base_queryset_for_cache()
+            found_environments = {
+                **{
+                    environment.api_key: environment
+                    for environment in base_qs.filter(api_key__in=missing_api_keys)
+                },
+                **{
+                    environment.requested_api_key: environment
+                    for environment in base_qs.filter(
+                        api_keys__key__in=missing_api_keys
+                    ).annotate(requested_api_key=F("api_keys__key"))
+                },
+            }
+            for api_key in missing_api_keys:
+                if environment := found_environments.get(api_key):
+                    cls._set_in_environment_cache(api_key, environment)
+                    environments[api_key] = environment
+                else:
+                    cls.set_bad_key(api_key)
+
+        return environments
+
+    @classmethod
+    def _get_base_queryset_for_cache(cls) -> QuerySet["Environment"]:
+        return cls.objects.select_related(  # type: ignore[no-any-return]
+            "project",
+            "project__organisation",
+            *IDENTITY_INTEGRATIONS_RELATION_NAMES,
+        ).defer("description")
+
+    @classmethod
+    def _get_environment_for_cache(cls, api_key: str) -> "Environment | None":
+        base_qs = cls._get_base_queryset_for_cache()
+        qs_for_embedded_api_key = base_qs.filter(api_key=api_key)
+        qs_for_fk_api_key = base_qs.filter(api_keys__key=api_key)
+
+        try:
+            return qs_for_embedded_api_key.union(qs_for_fk_api_key).get()
+        except cls.DoesNotExist:
+            cls.set_bad_key(api_key)
+            logger.info("Environment with api_key %s does not exist" % api_key)
+            return None
+
+    @classmethod
+    def _set_in_environment_cache(
+        cls, api_key: str, environment: "Environment"
+    ) -> None:
+        timeout = settings.ENVIRONMENT_CACHE_SECONDS
+        if (stale_seconds := settings.ENVIRONMENT_CACHE_STALE_SECONDS) > 0:
+            environment_cache.set(
+                get_environment_cache_fresh_key(api_key), True, timeout=timeout
+            )
+            timeout += stale_seconds
+        environment_cache.set(api_key, environment, timeout=timeout)
+
+    @classmethod
+    @postpone  # type: ignore[misc]
+    def _refresh_environment_cache(cls, api_key: str) -> None:
+        try:
+            environment = cls._get_environment_for_cache(api_key)
+        except Exception:
+            # Drop the fresh marker so that the refresh is retried by the next
+            # request, rather than once the marker would have expired.
+            environment_cache.delete(get_environment_cache_fresh_key(api_key))
+            logger.exception("Failed to refresh cached environment.")
+            return
+
+        if environment:
+            cls._set_in_environment_cache(api_key, environment)
+        else:
+            environment_cache.delete(api_key)
+
     @classmethod
     def write_environment_documents(
         cls,
@@ -358,9 +477,27 @@ class Environment(
             settings.CACHE_ENVIRONMENT_DOCUMENT_MODE
             == EnvironmentDocumentCacheMode.PERSISTENT
         ):
+            environment_documents = {
+                e.api_key: map_environment_to_environment_document(e)
+                for e in environments
+            }
+            environment_document_cache.set_many(environment_documents)
+            if settings.CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED:
+                rendered_environment_documents: dict[str, typing.Any] = {}
+                for api_key, document in environment_documents.items():
+                    rendered = render_environment_document(document)
+                    rendered_environment_documents[
+                        get_rendered_environment_document_key(api_key)
+                    ] = rendered
+                    rendered_environment_documents[
+                        get_rendered_environment_document_etag_key(api_key)
+                    ] = rendered.etag
+                environment_document_cache.set_many(rendered_environment_documents)
+            # Stamp the new versions only after the documents have been written
+            # so that a reader never pairs a new version with an old document.
             environment_document_cache.set_many(
                 {
-                    e.api_key: map_environment_to_environment_document(e)
+                    get_environment_document_version_key(e.api_key): uuid.uuid4().hex
                     for e in environments
                 }
             )
@@ -509,25 +646,31 @@ class Environment(
             == RequestOrigin.SERVER
         )
 
-    def get_segments_from_cache(self) -> typing.List[Segment]:
+    def get_segments_from_cache(self) -> list[SegmentDefinition]:
         """
-        Get any segments that have been overridden in this environment.
+        Get the definitions of any segments that have been overridden in this
+        environment.
+
+        Cached definitions are versioned by the environment's `updated_at`,
+        which is stamped whenever its segments change, so that they're never
+        older than the environment they're read for.
         """
-        segments = environment_segments_cache.get(self.id)
-        if not segments:
-            segments = list(
-                Segment.live_objects.filter(
-                    feature_segments__feature_states__environment=self
-                ).prefetch_related(
-                    "rules",
-                    "rules__conditions",
-                    "rules__rules",
-                    "rules__rules__conditions",
-                    "rules__rules__rules",
-                )
+        cache_key = get_segment_definitions_cache_key(self.id)
+        cached: tuple[datetime, list[SegmentDefinition]] | None = (
+            environment_segments_cache.get(cache_key)
+        )
+        if cached is not None and cached[0] >= self.updated_at:
+            return cached[1]
+
+        segment_definitions = get_segment_definitions(
+            Segment.live_objects.filter(
+                feature_segments__feature_states__environment=self
             )
-            environment_segments_cache.set(self.id, segments)
-        return segments  # type: ignore[no-any-return]
+        )
+        environment_segments_cache.set(
+            cache_key, (self.updated_at, segment_definitions)
+        )
+        return segment_definitions
 
     @classmethod
     def get_environment_document(
@@ -542,6 +685,47 @@ class Environment(
             return cls._get_environment_document_from_cache(api_key)
         return cls._get_environment_document_from_db(api_key)
 
+    @classmethod
+    def get_rendered_environment_document(
+        cls,
+        api_key: str,
+    ) -> RenderedEnvironmentDocument:
+        """
+        Get the environment document as rendered, compressed bytes. These are
+        written to the cache alongside the document itself when running in
+        persistent cache mode.
+        """
+        rendered_key = get_rendered_environment_document_key(api_key)
+        rendered_environment_document: RenderedEnvironmentDocument | None = (
+            environment_document_cache.get(rendered_key)
+        )
+        if rendered_environment_document is None:
+            rendered_environment_document = render_environment_document(
+                cls.get_environment_document(api_key)
+            )
+            # Only add the rendered document, rather than set it, so that a
+            # newer one written by `write_environment_documents` since the
+            # document was read is not overwritten.
+            if environment_document_cache.add(
+                rendered_key, rendered_environment_document
+            ):
+                environment_document_cache.add(
+                    get_rendered_environment_document_etag_key(api_key),
+                    rendered_environment_document.etag,
+                )
+        return rendered_environment_document
+
+    @classmethod
+    def get_rendered_environment_document_etag(cls, api_key: str) -> str | None:
+        """
+        Get the ETag of the rendered environment document, without retrieving
+        the document itself.
+        """
+        etag: str | None = environment_document_cache.get(
+            get_rendered_environment_document_etag_key(api_key)
+        )
+        return etag
+
     def get_create_log_message(self, history_instance) -> typing.Optional[str]:  # type: ignore[no-untyped-def]
         return ENVIRONMENT_CREATED_MESSAGE % self.name  # type: ignore[no-any-return]
 
@@ -559,15 +743,58 @@ class Environment(
         cls,
         api_key: str,
     ) -> dict[str, typing.Any]:
+        version: str | None = None
+        use_local_cache = settings.CACHE_ENVIRONMENT_DOCUMENT_LOCAL_MAX_ENTRIES > 0
+
+        if use_local_cache:
+            # Read the version before the document so that the document we
+            # end up caching locally is at least as new as the version.
+            version = environment_document_cache.get(
+                get_environment_document_version_key(api_key)
+            )
+            local_environment_document = (
+                environment_document_local_cache.get(api_key, version)
+                if version is not None
+                else None
+            )
+            flagsmith_environment_document_cache_queries_total.labels(
+                result=CACHE_HIT if local_environment_document else CACHE_MISS,
+                tier=CACHE_TIER_LOCAL,
+            ).inc()
+            if local_environment_document is not None:
+                return local_environment_document
+
         environment_document = environment_document_cache.get(api_key)
         if not (cache_hit := environment_document is not None):
-            environment_document = cls._get_environment_document_from_db(api_key)
-            environment_document_cache.set(api_key, environment_document)
+
+            def _rebuild() -> dict[str, typing.Any]:
+                nonlocal version
+                rebuilt_environment_document = cls._get_environment_document_from_db(
+                    api_key
+                )
+                environment_document_cache.set(api_key, rebuilt_environment_document)
+                version = uuid.uuid4().hex
+                environment_document_cache.set(
+                    get_environment_document_version_key(api_key), version
+                )
+                return rebuilt_environment_document
+
+            # Concurrent misses for the same document share a single rebuild.
+            environment_document = coalesce_cache_rebuild(
+                environment_document_cache,
+                api_key,
+                _rebuild,
+                environment_document_single_flight,
+            )
 
         flagsmith_environment_document_cache_queries_total.labels(
             result=CACHE_HIT if cache_hit else CACHE_MISS,
+            tier=CACHE_TIER_SHARED,
         ).inc()
 
+        if use_local_cache and version is not None:
+            environment_document_local_cache.set(api_key, version, environment_document)
+
         return environment_document  # type: ignore[no-any-return]
 
     @classmethod
@@ -618,6 +845,14 @@ class Environment(
         return self.project
 
 
+def get_environment_cache_fresh_key(api_key: str) -> str:
+    return f"fresh:{api_key}"
+
+
+def get_environment_document_version_key(api_key: str) -> str:
+    return f"version:{api_key}"
+
+
 class Webhook(AbstractBaseExportableWebhookModel):
     environment = models.ForeignKey(
         Environment, on_delete=models.CASCADE, related_name="webhooks"
@@ -0,0 +1,65 @@
+"""
+Response caching for the SDK endpoints.
+
+Cached responses are keyed by a per-environment generation, which is stored in
+the same cache as the responses. Deleting the generation when an environment
+changes (see `environments.invalidation`) means that subsequent requests are
+keyed by a new generation, so the stale responses are never served again and
+simply expire, without affecting the responses cached for other environments.
+"""
+
+import typing
+import uuid
+from functools import wraps
+
+from django.core.cache import caches
+from django.http import HttpRequest, HttpResponse
+from django.views.decorators.cache import cache_page
+
+from core.constants import SDK_ENVIRONMENT_KEY_HEADER
+
+ViewFunc = typing.Callable[..., HttpResponse]
+
+
+def get_endpoint_cache_generation_key(api_key: str) -> str:
+    return f"generation:{api_key}"
+
+
+def get_endpoint_cache_key_prefix(cache_name: str, api_key: str) -> str:
+    generation = caches[cache_name].get_or_set(
+        get_endpoint_cache_generation_key(api_key),
+        lambda: uuid.uuid4().hex,
+        timeout=None,
+    )
+    return f"{api_key}:{generation}"
+
+
+def cache_page_per_environment(
+    timeout: int,
+    cache: str,
+) -> typing.Callable[[ViewFunc], ViewFunc]:
+    """
+    Equivalent to Django's `cache_page`, with cached responses keyed by the
+    generation of the requesting environment.
+    """
+
+    def decorator(view_func: ViewFunc) -> ViewFunc:
+        @wraps(view_func)
+        def wrapper(
+            request: HttpRequest,
+            *args: typing.Any,
+            **kwargs: typing.Any,
+        ) -> HttpResponse:
+            if not (api_key := request.headers.get(SDK_ENVIRONMENT_KEY_HEADER)):
+                return view_func(request, *args, **kwargs)
+
+            cached_view_func = cache_page(
+                timeout,
+                cache=cache,
+                key_prefix=get_endpoint_cache_key_prefix(cache, api_key),
+            )(view_func)
+            return cached_view_func(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
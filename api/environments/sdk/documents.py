@@ -0,0 +1,38 @@
+import hashlib
+import typing
+
+from django.utils.text import compress_string
+
+from util.renderers import PydanticJSONRenderer
+
+
+class RenderedEnvironmentDocument(typing.NamedTuple):
+    """
+    An environment document rendered ahead of time so that it can be
+    served to SDKs without rendering or compressing it per request.
+    """
+
+    etag: str
+    content: bytes
+    gzip_content: bytes
+
+
+def render_environment_document(
+    environment_document: dict[str, typing.Any],
+) -> RenderedEnvironmentDocument:
+    # Render using the same renderer as the API so that the bytes
+    # are identical to those of a regular response.
+    content = PydanticJSONRenderer().render(environment_document)
+    return RenderedEnvironmentDocument(
+        etag=f'"{hashlib.md5(content, usedforsecurity=False).hexdigest()}"',
+        content=content,
+        gzip_content=compress_string(content),
+    )
+
+
+def get_rendered_environment_document_key(api_key: str) -> str:
+    return f"rendered:{api_key}"
+
+
+def get_rendered_environment_document_etag_key(api_key: str) -> str:
+    return f"rendered-etag:{api_key}"
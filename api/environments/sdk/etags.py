@@ -0,0 +1,88 @@
+"""
+ETag functions for the SDK endpoints, for use with Django's `condition`
+decorator.
+
+The ETags are derived from the data which determines the response, rather than
+from the response itself, so that a matching `If-None-Match` can be answered
+without evaluating or serialising any flags.
+"""
+
+import hashlib
+import typing
+
+from django.conf import settings
+from rest_framework.request import Request
+
+from environments.identities.traits.models import Trait
+from features.models import FeatureState
+
+
+def get_environment_flags_etag(
+    request: Request,
+    identifier: str | None = None,
+    *args: typing.Any,
+    **kwargs: typing.Any,
+) -> str | None:
+    if not settings.ENABLE_SDK_ETAGS or identifier:
+        return None
+    return _make_etag(*_get_environment_etag_components(request))
+
+
+def get_identity_flags_etag(
+    request: Request,
+    *args: typing.Any,
+    **kwargs: typing.Any,
+) -> str | None:
+    if not settings.ENABLE_SDK_ETAGS:
+        return None
+
+    if not (identifier := request.GET.get("identifier")):
+        return None
+
+    traits: list[tuple[typing.Any, ...]] = []
+    identity_overrides: list[tuple[typing.Any, ...]] = []
+    if not request.GET.get("transient"):
+        identity_filter = {
+            "identity__environment": request.environment,
+            "identity__identifier": identifier,
+        }
+        traits = list(
+            Trait.objects.filter(**identity_filter)
+            .order_by("id")
+            .values_list("trait_key", *Trait.BULK_UPDATE_FIELDS)
+        )
+        identity_overrides = list(
+            FeatureState.objects.filter(**identity_filter)
+            .order_by("id")
+            .values_list(
+                "id",
+                "enabled",
+                "updated_at",
+                "feature_state_value__type",
+                "feature_state_value__boolean_value",
+                "feature_state_value__integer_value",
+                "feature_state_value__string_value",
+            )
+        )
+
+    return _make_etag(
+        *_get_environment_etag_components(request),
+        traits,
+        identity_overrides,
+    )
+
+
+def _get_environment_etag_components(request: Request) -> tuple[typing.Any, ...]:
+    environment = request.environment
+    return (
+        environment.api_key,
+        environment.updated_at,
+        environment.get_hide_disabled_flags(),
+        request.originated_from,
+        sorted(request.GET.items()),
+    )
+
+
+def _make_etag(*components: typing.Any) -> str:
+    digest = hashlib.md5(repr(components).encode(), usedforsecurity=False)
+    return f'"{digest.hexdigest()}"'
@@ -1,6 +1,7 @@
 import typing
 from collections import defaultdict
 
+from django.conf import settings
 from rest_framework import serializers
 
 from core.constants import BOOLEAN, FLOAT, INTEGER, STRING
@@ -195,3 +196,18 @@ class IdentifyWithTraitsSerializer(
         if traits and not request.environment.trait_persistence_allowed(request):
             return []
         return traits
+
+
+class SDKBulkIdentitySerializer(serializers.Serializer):  # type: ignore[type-arg]
+    identifier = serializers.CharField()
+    traits = TraitSerializerBasic(required=False, many=True)
+
+
+class SDKBulkIdentitiesSerializer(serializers.Serializer):  # type: ignore[type-arg]
+    identities = SDKBulkIdentitySerializer(many=True, allow_empty=False)
+
+    def get_fields(self):  # type: ignore[no-untyped-def]
+        fields = super().get_fields()
+        # Check the number of identities before validating any of them.
+        fields["identities"].max_length = settings.SDK_BULK_IDENTITIES_MAX_ITEMS  # type: ignore[attr-defined]
+        return fields
@@ -1,17 +1,32 @@
 import hashlib
+import typing
 import uuid
+from collections import defaultdict
 from itertools import chain
 from operator import itemgetter
 from typing import TypeAlias
 
+from django.db.models import Prefetch, Q
 from django.utils import timezone
+from flag_engine.context.mappers import map_environment_identity_to_context
 
 from environments.identities.models import Identity
 from environments.identities.traits.models import Trait
 from environments.models import Environment
-from environments.sdk.types import SDKTraitData
+from environments.sdk.types import SDKIdentityData, SDKTraitData
+from features.feature_types import MULTIVARIATE
+from features.models import FeatureState
+from features.multivariate.models import MultivariateFeatureStateValue
+from features.versioning.versioning_service import get_environment_flags_list
+from segments.evaluator import get_environment_segment_index
+from util.mappers.engine import map_identity_to_engine, map_traits_to_engine
 
 IdentityAndTraits: TypeAlias = tuple[Identity, list[Trait]]
+# The feature state values are the values of the identity's multivariate flags,
+# by feature state id.
+IdentityTraitsAndFlags: TypeAlias = tuple[
+    Identity, list[Trait], list[FeatureState], dict[int, typing.Any]
+]
 
 
 def get_transient_identity_and_traits(
@@ -91,6 +106,191 @@ def get_persisted_identity_and_traits(
     )
 
 
+def get_bulk_identities_flags(
+    environment: Environment,
+    sdk_identity_data: list[SDKIdentityData],
+) -> typing.Iterator[IdentityTraitsAndFlags]:
+    """
+    Evaluate the flags for many identities without persisting anything.
+
+    Stored identities, their traits and overrides, and the environment's flags
+    are loaded up front with a fixed number of queries, regardless of the number
+    of identities. Identities which don't exist are evaluated as transient
+    identities. Traits provided for an identity override its stored traits, and
+    a trait provided with a null value is removed.
+
+    :return: an iterator which lazily evaluates each identity, in the order given
+    """
+    identities_by_identifier = {
+        identity.identifier: identity
+        for identity in Identity.objects.filter(
+            environment=environment,
+            identifier__in={data["identifier"] for data in sdk_identity_data},
+        ).prefetch_related("identity_traits")
+    }
+    for identity in identities_by_identifier.values():
+        identity.environment = environment
+
+    identities_and_traits = [
+        _get_bulk_identity_and_traits(
+            environment,
+            identities_by_identifier.get(data["identifier"]),
+            data,
+        )
+        for data in sdk_identity_data
+    ]
+    bulk_flags = _BulkFlags(
+        environment,
+        identities_by_identifier.values(),
+        identity_hash_keys=[
+            identity.get_hash_key(environment.use_identity_composite_key_for_hashing)
+            for identity, _ in identities_and_traits
+        ],
+    )
+
+    return _evaluate_bulk_identities(environment, identities_and_traits, bulk_flags)
+
+
+class _BulkFlags:
+    """
+    The flags of an environment, along with the overrides for a set of
+    identities, grouped by what they apply to.
+    """
+
+    def __init__(
+        self,
+        environment: Environment,
+        identities: typing.Iterable[Identity],
+        identity_hash_keys: typing.Sequence[str],
+    ) -> None:
+        self.hide_disabled_flags = environment.get_hide_disabled_flags()
+        self.identity_hash_keys = identity_hash_keys
+        self._unique_identity_hash_keys = list(dict.fromkeys(identity_hash_keys))
+        self._multivariate_values: dict[int, dict[str, typing.Any]] = {}
+        self.default_flags: list[FeatureState] = []
+        self.segment_flags: dict[int, list[FeatureState]] = defaultdict(list)
+        self.identity_flags: dict[int, list[FeatureState]] = defaultdict(list)
+
+        for feature_state in get_environment_flags_list(
+            environment=environment,
+            additional_filters=Q(identity__isnull=True) | Q(identity__in=identities),
+            additional_prefetch_related_args=[
+                Prefetch(
+                    "multivariate_feature_state_values",
+                    queryset=MultivariateFeatureStateValue.objects.select_related(
+                        "multivariate_feature_option"
+                    ),
+                )
+            ],
+        ):
+            if feature_state.identity_id:
+                self.identity_flags[feature_state.identity_id].append(feature_state)
+            elif feature_state.feature_segment:
+                self.segment_flags[feature_state.feature_segment.segment_id].append(
+                    feature_state
+                )
+            else:
+                self.default_flags.append(feature_state)
+
+    def has_identity_overrides(self, identity: Identity) -> bool:
+        return bool(identity.id and identity.id in self.identity_flags)
+
+    def get_flags(
+        self,
+        identity: Identity,
+        segment_ids: typing.Iterable[int],
+    ) -> list[FeatureState]:
+        """
+        Get the highest priority flag for each feature, in the same way as
+        `Identity.get_all_feature_states`.
+        """
+        flags: dict[int, FeatureState] = {}
+        for feature_state in chain(
+            self.default_flags,
+            *(self.segment_flags[segment_id] for segment_id in segment_ids),
+            self.identity_flags[identity.id] if identity.id else [],
+        ):
+            current_feature_state = flags.get(feature_state.feature_id)
+            if not current_feature_state or feature_state > current_feature_state:
+                flags[feature_state.feature_id] = feature_state
+
+        if self.hide_disabled_flags is True:
+            return [flag for flag in flags.values() if flag.enabled]
+        return list(flags.values())
+
+    def get_multivariate_values(
+        self,
+        flags: typing.Iterable[FeatureState],
+        identity_hash_key: str,
+    ) -> dict[int, typing.Any]:
+        """
+        Get the value of each of the identity's multivariate flags, by feature
+        state id. The first time a flag is needed, the values for all of the
+        identities are evaluated at once. Identity overrides are left to be
+        evaluated by the serializer, since they only apply to one identity.
+        """
+        values = {}
+        for feature_state in flags:
+            if feature_state.feature.type != MULTIVARIATE or feature_state.identity_id:
+                continue
+            if (
+                values_by_hash_key := self._multivariate_values.get(feature_state.id)
+            ) is None:
+                values_by_hash_key = self._multivariate_values[feature_state.id] = {
+                    hash_key: value and value.value
+                    for hash_key, value in zip(
+                        self._unique_identity_hash_keys,
+                        feature_state.get_multivariate_feature_state_values(
+                            self._unique_identity_hash_keys
+                        ),
+                    )
+                }
+            values[feature_state.id] = values_by_hash_key[identity_hash_key]
+        return values
+
+
+def _evaluate_bulk_identities(
+    environment: Environment,
+    identities_and_traits: list[IdentityAndTraits],
+    bulk_flags: _BulkFlags,
+) -> typing.Iterator[IdentityTraitsAndFlags]:
+    contexts = (
+        map_environment_identity_to_context(
+            environment=environment,
+            identity=map_identity_to_engine(
+                identity, with_overrides=False, with_traits=False
+            ),
+            override_traits=map_traits_to_engine(traits),
+        )
+        for identity, traits in identities_and_traits
+    )
+    segment_index = get_environment_segment_index(environment, overrides_only=True)
+
+    # Identities without overrides in the same segments get the same flags.
+    flags_by_segment_ids: dict[tuple[int, ...], list[FeatureState]] = {}
+
+    for (identity, traits), identity_hash_key, segments in zip(
+        identities_and_traits,
+        bulk_flags.identity_hash_keys,
+        segment_index.get_matching_segments_for_contexts(contexts),
+    ):
+        segment_ids = tuple(segment.id for segment in segments)
+        if bulk_flags.has_identity_overrides(identity):
+            flags = bulk_flags.get_flags(identity, segment_ids)
+        elif segment_ids in flags_by_segment_ids:
+            flags = flags_by_segment_ids[segment_ids]
+        else:
+            flags = flags_by_segment_ids[segment_ids] = bulk_flags.get_flags(
+                identity, segment_ids
+            )
+        yield (
+            identity,
+            traits,
+            flags,
+            bulk_flags.get_multivariate_values(flags, identity_hash_key),
+        )
+
+
 def get_transient_identifier(sdk_trait_data: list[SDKTraitData]) -> str:
     if sdk_trait_data:
         return hashlib.sha256(
@@ -115,6 +315,30 @@ def _get_transient_identity(
     )
 
 
+def _get_bulk_identity_and_traits(
+    environment: Environment,
+    identity: Identity | None,
+    sdk_identity_data: SDKIdentityData,
+) -> IdentityAndTraits:
+    if not identity:
+        identity = _get_transient_identity(
+            environment=environment,
+            identifier=sdk_identity_data["identifier"],
+        )
+
+    traits = {
+        trait.trait_key: trait
+        for trait in (identity.identity_traits.all() if identity.id else [])
+    }
+    for sdk_trait_data in sdk_identity_data.get("traits", []):
+        traits.pop(sdk_trait_data["trait_key"], None)
+    sdk_trait_data_items = _ensure_transient(sdk_identity_data.get("traits", []))
+    for trait in identity.generate_traits(sdk_trait_data_items, persist=False):
+        traits[trait.trait_key] = trait
+
+    return identity, list(traits.values())
+
+
 def _ensure_transient(sdk_trait_data: list[SDKTraitData]) -> list[SDKTraitData]:
     for sdk_trait_data_item in sdk_trait_data:
         sdk_trait_data_item["transient"] = True
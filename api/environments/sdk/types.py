@@ -12,3 +12,8 @@ class SDKTraitData(typing.TypedDict):
     trait_key: str
     trait_value: SDKTraitValueData | None
     transient: NotRequired[bool]
+
+
+class SDKIdentityData(typing.TypedDict):
+    identifier: str
+    traits: NotRequired[list[SDKTraitData]]
@@ -1,7 +1,11 @@
+import re
 from datetime import datetime
 from typing import Optional
 
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
 from django.utils.decorators import method_decorator
+from django.utils.http import parse_etags
 from django.views.decorators.http import condition
 from drf_yasg.utils import swagger_auto_schema  # type: ignore[import-untyped]
 from rest_framework.request import Request
@@ -12,10 +16,13 @@ from core.constants import FLAGSMITH_UPDATED_AT_HEADER
 from environments.authentication import (
     EnvironmentKeyAuthentication,
 )
+from environments.enums import EnvironmentDocumentCacheMode
 from environments.models import Environment
 from environments.permissions.permissions import EnvironmentKeyPermissions
 from environments.sdk.schemas import SDKEnvironmentDocumentModel
 
+accepts_gzip_re = re.compile(r"\bgzip\b")
+
 
 def get_last_modified(request: Request) -> datetime | None:
     updated_at: Optional[datetime] = request.environment.updated_at
@@ -31,7 +38,14 @@ class SDKEnvironmentAPIView(APIView):
 
     @swagger_auto_schema(responses={200: SDKEnvironmentDocumentModel})  # type: ignore[misc]
     @method_decorator(condition(last_modified_func=get_last_modified))
-    def get(self, request: Request) -> Response:
+    def get(self, request: Request) -> Response | HttpResponse:
+        if (
+            settings.CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED
+            and settings.CACHE_ENVIRONMENT_DOCUMENT_MODE
+            == EnvironmentDocumentCacheMode.PERSISTENT
+        ):
+            return self._get_prerendered_response(request)
+
         environment_document = Environment.get_environment_document(
             request.environment.api_key,
         )
@@ -40,3 +54,40 @@ class SDKEnvironmentAPIView(APIView):
             environment_document,
             headers={FLAGSMITH_UPDATED_AT_HEADER: updated_at.timestamp()},
         )
+
+    def _get_prerendered_response(self, request: Request) -> HttpResponse:
+        api_key = request.environment.api_key
+        headers = {
+            "Vary": "Accept-Encoding",
+            FLAGSMITH_UPDATED_AT_HEADER: str(
+                request.environment.updated_at.timestamp()
+            ),
+        }
+
+        # The ETag is stored under its own key, so that conditional requests
+        # can be answered without retrieving the whole document.
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if if_none_match and (
+            etag := Environment.get_rendered_environment_document_etag(api_key)
+        ):
+            if etag in if_none_match or "*" in if_none_match:
+                return HttpResponseNotModified(headers={**headers, "ETag": etag})
+
+        rendered_environment_document = Environment.get_rendered_environment_document(
+            api_key,
+        )
+        headers["ETag"] = rendered_environment_document.etag
+        if rendered_environment_document.etag in if_none_match or "*" in if_none_match:
+            return HttpResponseNotModified(headers=headers)
+
+        if accepts_gzip_re.search(request.headers.get("Accept-Encoding", "")):
+            return HttpResponse(
+                rendered_environment_document.gzip_content,
+                content_type="application/json",
+                headers={**headers, "Content-Encoding": "gzip"},
+            )
+        return HttpResponse(
+            rendered_environment_document.content,
+            content_type="application/json",
+            headers=headers,
+        )
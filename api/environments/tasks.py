@@ -1,3 +1,5 @@
+import logging
+
 from django.db.models import Prefetch, Q
 from django.utils import timezone
 from task_processor.decorators import (
@@ -7,6 +9,7 @@ from task_processor.models import TaskPriority
 
 from audit.models import AuditLog
 from environments.dynamodb import DynamoIdentityWrapper
+from environments.invalidation import publish_environment_invalidation
 from environments.models import (
     Environment,
     environment_v2_wrapper,
@@ -22,6 +25,8 @@ from sse import (  # type: ignore[attr-defined]
     send_environment_update_message_for_project,
 )
 
+logger = logging.getLogger(__name__)
+
 
 @register_task_handler(priority=TaskPriority.HIGH)
 def rebuild_environment_document(environment_id: int) -> None:
@@ -37,6 +42,17 @@ def process_environment_update(audit_log_id: int):  # type: ignore[no-untyped-de
         environment_id=audit_log.environment_id, project_id=audit_log.project_id
     )
 
+    # drop cached copies of the environment(s) in every API process
+    try:
+        publish_environment_invalidation(
+            project_id=audit_log.project_id,
+            environment_id=audit_log.environment_id,
+        )
+    except Exception:
+        logger.exception(
+            "Failed to publish invalidation for audit log %d.", audit_log_id
+        )
+
     # send environment update message
     if audit_log.environment_id:
         send_environment_update_message_for_environment(audit_log.environment)
@@ -1,10 +1,14 @@
 import typing
 from concurrent.futures import ThreadPoolExecutor
 
+from django.conf import settings
+from django.core.cache import caches
+
 from edge_api.identities.edge_identity_service import (
     get_edge_identity_overrides_for_feature_ids,
 )
 from features.dataclasses import EnvironmentFeatureOverridesData
+from features.models import FeatureState
 from features.versioning.versioning_service import get_environment_flags_list
 
 if typing.TYPE_CHECKING:
@@ -13,6 +17,38 @@ if typing.TYPE_CHECKING:
 
 OverridesData = dict[int, EnvironmentFeatureOverridesData]
 
+environment_feature_names_cache = caches[
+    settings.ENVIRONMENT_FEATURE_NAMES_CACHE_LOCATION
+]
+
+
+def get_environment_feature_names(environment_id: int) -> frozenset[str]:
+    feature_names: frozenset[str] | None = environment_feature_names_cache.get(
+        environment_id
+    )
+    if feature_names is None:
+        feature_names = frozenset(
+            FeatureState.objects.filter(
+                environment_id=environment_id,
+                feature_segment=None,
+                identity=None,
+            ).values_list("feature__name", flat=True)
+        )
+        environment_feature_names_cache.set(environment_id, feature_names)
+    return feature_names
+
+
+def clear_environment_feature_names_cache(project_id: int) -> None:
+    from environments.models import Environment
+
+    environment_feature_names_cache.delete_many(
+        list(
+            Environment.objects.filter(project_id=project_id).values_list(
+                "id", flat=True
+            )
+        )
+    )
+
 
 def get_overrides_data(
     environment: "Environment",
@@ -2,6 +2,7 @@ from __future__ import unicode_literals
 
 import typing
 
+from django.conf import settings
 from django.db.models import Q, QuerySet
 from django.utils import timezone
 from ordered_model.models import OrderedModelManager  # type: ignore[import-untyped]
@@ -32,18 +33,40 @@ class FeatureStateManager(UUIDNaturalKeyManagerMixin, SoftDeleteManager):  # typ
     ) -> QuerySet["FeatureState"]:
         # TODO: replace additional_filters with just using kwargs in calling locations
 
+        if not settings.USE_LIVE_FEATURE_STATES:
+            return self.resolve_live_feature_states(
+                environment, additional_filters, **kwargs
+            )
+
+        qs_filter = Q(
+            environment=environment,
+            deleted_at__isnull=True,
+            live_feature_states__environment=environment,
+        )
+        if additional_filters:
+            qs_filter &= additional_filters
+
+        return self.filter(qs_filter, **kwargs)  # type: ignore[no-any-return]
+
+    def resolve_live_feature_states(  # type: ignore[no-untyped-def]
+        self,
+        environment: "Environment",
+        additional_filters: Q = None,  # type: ignore[assignment]
+        **kwargs,
+    ) -> QuerySet["FeatureState"]:
+        """
+        Get the feature states which are live in the environment, according to
+        their versions, rather than the maintained `LiveFeatureState` objects.
+        Note that this can include several versions of each feature state.
+        """
         now = timezone.now()
 
         qs_filter = Q(environment=environment, deleted_at__isnull=True)
         if environment.use_v2_feature_versioning:
-            latest_versions = (
-                EnvironmentFeatureVersion.objects.get_latest_versions_by_environment_id(
-                    environment.id
-                )
+            latest_version_uuids = (
+                EnvironmentFeatureVersion.objects.get_latest_version_uuids(environment)
             )
 
-            latest_version_uuids = [efv.uuid for efv in latest_versions]
-
             # Note that since identity overrides aren't part of the versioning system,
             # we need to make sure we also return them here. We can still then subsequently
             # filter them out with the `additional_filters` if needed.
@@ -51,6 +51,7 @@ from core.models import (
 )
 from environments.identities.helpers import (
     get_hashed_percentage_for_object_ids,
+    get_hashed_percentages_for_object_ids,
 )
 from features.constants import ENVIRONMENT, FEATURE_SEGMENT, IDENTITY
 from features.custom_lifecycle import CustomLifecycleModelMixin
@@ -177,6 +178,15 @@ class Feature(  # type: ignore[django-manager-missing]
                 kwargs={"feature_id": self.id}
             )
 
+    @hook(AFTER_SAVE)  # type: ignore[misc]
+    @hook(AFTER_DELETE)  # type: ignore[misc]
+    def clear_environment_feature_names_cache(self) -> None:
+        from features.features_service import (
+            clear_environment_feature_names_cache,
+        )
+
+        clear_environment_feature_names_cache(project_id=self.project_id)
+
     def validate_unique(self, *args, **kwargs):  # type: ignore[no-untyped-def]
         """
         Checks unique constraints on the model and raises ``ValidationError``
@@ -740,16 +750,39 @@ class FeatureState(
 
     def get_multivariate_feature_state_value(
         self, identity_hash_key: str
+    ) -> AbstractBaseFeatureValueModel:
+        percentage_value = (
+            get_hashed_percentage_for_object_ids([self.id, identity_hash_key]) * 100
+        )
+        return self._get_multivariate_feature_state_value_for_percentage(
+            percentage_value
+        )
+
+    def get_multivariate_feature_state_values(
+        self, identity_hash_keys: typing.Sequence[str]
+    ) -> list[AbstractBaseFeatureValueModel]:
+        """
+        Get the multivariate value for each of the given identities, hashing all
+        of the identity keys against this feature state in a single pass.
+        """
+        [percentage_values] = get_hashed_percentages_for_object_ids(
+            [self.id], identity_hash_keys
+        )
+        return [
+            self._get_multivariate_feature_state_value_for_percentage(
+                percentage_value * 100
+            )
+            for percentage_value in percentage_values
+        ]
+
+    def _get_multivariate_feature_state_value_for_percentage(
+        self, percentage_value: float
     ) -> AbstractBaseFeatureValueModel:
         # the multivariate_feature_state_values should be prefetched at this point
         # so we just convert them to a list and use python operations from here to
         # avoid further queries to the DB
         mv_options = list(self.multivariate_feature_state_values.all())
 
-        percentage_value = (
-            get_hashed_percentage_for_object_ids([self.id, identity_hash_key]) * 100
-        )
-
         # Iterate over the mv options in order of id (so we get the same value each
         # time) to determine the correct value to return to the identity based on
         # the percentage allocations of the multivariate options. This gives us a
@@ -835,6 +868,30 @@ class FeatureState(
             ]
             MultivariateFeatureStateValue.objects.bulk_create(mv_feature_state_values)
 
+    @hook(AFTER_SAVE)  # type: ignore[misc]
+    @hook(AFTER_DELETE)  # type: ignore[misc]
+    def refresh_live_feature_states(self) -> None:
+        from features.versioning.versioning_service import (
+            refresh_live_feature_states,
+        )
+
+        if not (settings.MAINTAIN_LIVE_FEATURE_STATES and self.environment_id):
+            return
+
+        # Drafts, i.e. feature states in uncommitted change requests, or
+        # unpublished versions, can't change which feature states are live.
+        if self.environment_feature_version_id:
+            if not self.environment_feature_version.published:  # type: ignore[union-attr]
+                return
+        elif self.version is None:
+            return
+
+        refresh_live_feature_states(
+            self.environment,  # type: ignore[arg-type]
+            self.feature_id,
+            self.identity_id,
+        )
+
     @staticmethod
     def get_feature_state_key_name(fsv_type) -> str:  # type: ignore[no-untyped-def]
         return {  # type: ignore[return-value]
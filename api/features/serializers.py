@@ -413,6 +413,10 @@ class FeatureStateSerializerFull(serializers.ModelSerializer):  # type: ignore[t
         )
 
     def get_feature_state_value(self, obj):  # type: ignore[no-untyped-def]
+        # Values which were already evaluated, e.g. for many identities at once.
+        feature_state_values = self.context.get("feature_state_values", {})
+        if obj.id in feature_state_values:
+            return feature_state_values[obj.id]
         return obj.get_feature_state_value(identity=self.context.get("identity"))
 
 
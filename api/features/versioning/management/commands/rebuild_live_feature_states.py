@@ -0,0 +1,38 @@
+import argparse
+from typing import Any
+
+from django.core.management import BaseCommand
+
+from environments.models import Environment
+from features.versioning.versioning_service import rebuild_live_feature_states
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the live feature states of each environment. Run once "
+        "MAINTAIN_LIVE_FEATURE_STATES is enabled, before enabling "
+        "USE_LIVE_FEATURE_STATES."
+    )
+
+    def add_arguments(self, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--environment-id",
+            type=int,
+            dest="environment_ids",
+            action="append",
+            help="Only rebuild the given environment. Can be repeated.",
+        )
+
+    def handle(
+        self,
+        *args: Any,
+        environment_ids: list[int] | None,
+        **options: Any,
+    ) -> None:
+        environments = Environment.objects.all()
+        if environment_ids:
+            environments = environments.filter(id__in=environment_ids)
+
+        for environment in environments.iterator():
+            rebuild_live_feature_states(environment)
+            self.stdout.write(f"Rebuilt live feature states for {environment.id}.")
@@ -1,17 +1,30 @@
 import typing
+import uuid
+from datetime import datetime
 from pathlib import Path
 
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, router
 from django.db.models.query import QuerySet, RawQuerySet
 from django.utils import timezone
 from softdelete.models import SoftDeleteManager  # type: ignore[import-untyped]
 
 if typing.TYPE_CHECKING:
+    from environments.models import Environment
     from features.versioning.models import EnvironmentFeatureVersion
 
 
 with open(Path(__file__).parent.resolve() / "sql/get_latest_versions.sql") as f:
     get_latest_versions_sql = f.read()
 
+with open(Path(__file__).parent.resolve() / "sql/get_latest_version_uuids.sql") as f:
+    get_latest_version_uuids_sql = f.read()
+
+environment_latest_versions_cache = caches[
+    settings.ENVIRONMENT_LATEST_VERSIONS_CACHE_LOCATION
+]
+
 
 class EnvironmentFeatureVersionManager(SoftDeleteManager):  # type: ignore[misc]
     def get_latest_versions_by_environment_id(self, environment_id: int) -> RawQuerySet:  # type: ignore[type-arg]
@@ -28,6 +41,54 @@ class EnvironmentFeatureVersionManager(SoftDeleteManager):  # type: ignore[misc]
         """
         return self._get_latest_versions(environment_api_key=environment_api_key)
 
+    def get_latest_version_uuids(
+        self, environment: "Environment"
+    ) -> frozenset[uuid.UUID]:
+        """
+        Get the uuids of the latest EnvironmentFeatureVersion objects for a given
+        environment.
+
+        These are cached, so that they're only queried once for all of the feature
+        states read in a request, until the next scheduled version goes live. The
+        cached uuids are versioned by the environment's `updated_at`, which is
+        stamped whenever a version is published, so that processes which didn't
+        publish the version (e.g. the task processor writing the environment
+        document) don't reuse the uuids from before it.
+        """
+        cached: tuple[datetime, frozenset[uuid.UUID]] | None = (
+            environment_latest_versions_cache.get(environment.id)
+        )
+        if cached is not None and cached[0] == environment.updated_at:
+            return cached[1]
+
+        now = timezone.now()
+        with connections[router.db_for_read(self.model)].cursor() as cursor:
+            cursor.execute(
+                get_latest_version_uuids_sql,
+                {"environment_id": environment.id, "live_from_before": now},
+            )
+            rows = cursor.fetchall()
+
+        latest_version_uuids = frozenset(
+            version_uuid for version_uuid, _ in rows if version_uuid is not None
+        )
+        next_live_from = next(
+            (live_from for version_uuid, live_from in rows if version_uuid is None),
+            None,
+        )
+
+        timeout = settings.ENVIRONMENT_LATEST_VERSIONS_CACHE_SECONDS
+        if next_live_from:
+            timeout = min(timeout, int((next_live_from - now).total_seconds()))
+        if timeout > 0:
+            environment_latest_versions_cache.set(
+                environment.id,
+                (environment.updated_at, latest_version_uuids),
+                timeout,
+            )
+
+        return latest_version_uuids
+
     def get_latest_versions_as_queryset(
         self, environment_id: int
     ) -> QuerySet["EnvironmentFeatureVersion"]:
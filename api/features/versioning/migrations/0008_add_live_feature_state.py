@@ -0,0 +1,107 @@
+# Generated by Django 4.2.22 on 2026-10-18 20:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("environments", "0037_add_uuid_field"),
+        ("identities", "0002_alter_identity_index_together"),
+        ("features", "0065_make_feature_value_size_configurable"),
+        ("feature_versioning", "0007_add_phased_rollout"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LiveFeatureState",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("promote_at", models.DateTimeField(null=True)),
+                (
+                    "environment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="environments.environment",
+                    ),
+                ),
+                (
+                    "feature",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="features.feature",
+                    ),
+                ),
+                (
+                    "feature_segment",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="features.featuresegment",
+                    ),
+                ),
+                (
+                    "feature_state",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="live_feature_states",
+                        to="features.featurestate",
+                    ),
+                ),
+                (
+                    "identity",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="identities.identity",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["environment", "feature", "identity"],
+                        name="feature_ver_environ_5c32bd_idx",
+                    ),
+                    models.Index(
+                        condition=models.Q(("promote_at__isnull", False)),
+                        fields=["promote_at"],
+                        name="live_feature_state_promote_at",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(
+                            ("feature_segment__isnull", True),
+                            ("identity__isnull", True),
+                        ),
+                        fields=("environment", "feature"),
+                        name="unique_environment_live_feature_state",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("feature_segment__isnull", False)),
+                        fields=("environment", "feature", "feature_segment"),
+                        name="unique_segment_live_feature_state",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("identity__isnull", False)),
+                        fields=("environment", "feature", "identity"),
+                        name="unique_identity_live_feature_state",
+                    ),
+                ],
+            },
+        ),
+    ]
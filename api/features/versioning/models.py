@@ -387,3 +387,75 @@ class VersionChangeSet(LifecycleModelMixin, SoftDeleteObject):  # type: ignore[m
                     )
 
         return _conflicts
+
+
+class LiveFeatureState(models.Model):
+    """
+    The feature states which are live in an environment, one for each feature,
+    segment and identity, maintained as feature states and versions are
+    published, so that reading them doesn't need to resolve versions.
+
+    `promote_at` is set when a scheduled feature state, or version, will change
+    the live feature states of the feature (and identity), which are refreshed
+    by the `promote_live_feature_states` task once it's due. Until then, the
+    previous feature states remain live, so scheduled changes go live up to
+    the task's interval later than scheduled. Rows without a feature state
+    record scheduled changes to features with nothing live yet.
+    """
+
+    environment = models.ForeignKey(
+        "environments.Environment",
+        related_name="+",
+        on_delete=models.CASCADE,
+    )
+    feature = models.ForeignKey(
+        "features.Feature",
+        related_name="+",
+        on_delete=models.CASCADE,
+    )
+    identity = models.ForeignKey(
+        "identities.Identity",
+        related_name="+",
+        null=True,
+        on_delete=models.CASCADE,
+    )
+    feature_segment = models.ForeignKey(
+        "features.FeatureSegment",
+        related_name="+",
+        null=True,
+        on_delete=models.CASCADE,
+    )
+    feature_state = models.ForeignKey(
+        "features.FeatureState",
+        related_name="live_feature_states",
+        null=True,
+        on_delete=models.CASCADE,
+    )
+    promote_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            Index(fields=("environment", "feature", "identity")),
+            Index(
+                fields=("promote_at",),
+                condition=Q(promote_at__isnull=False),
+                name="live_feature_state_promote_at",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=("environment", "feature"),
+                condition=Q(feature_segment__isnull=True, identity__isnull=True),
+                name="unique_environment_live_feature_state",
+            ),
+            models.UniqueConstraint(
+                fields=("environment", "feature", "feature_segment"),
+                condition=Q(feature_segment__isnull=False),
+                name="unique_segment_live_feature_state",
+            ),
+            models.UniqueConstraint(
+                fields=("environment", "feature", "identity"),
+                condition=Q(identity__isnull=False),
+                name="unique_identity_live_feature_state",
+            ),
+        ]
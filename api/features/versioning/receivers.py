@@ -1,14 +1,17 @@
+from django.conf import settings
 from django.db.models.signals import post_init, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
 from environments.tasks import rebuild_environment_document
+from features.versioning.managers import environment_latest_versions_cache
 from features.versioning.models import EnvironmentFeatureVersion
 from features.versioning.signals import environment_feature_version_published
 from features.versioning.tasks import (
     create_environment_feature_version_published_audit_log_task,
     trigger_update_version_webhooks,
 )
+from features.versioning.versioning_service import refresh_live_feature_states
 
 
 @receiver(post_save, sender=EnvironmentFeatureVersion)
@@ -39,6 +42,20 @@ def cache_fields(instance: EnvironmentFeatureVersion, **kwargs):  # type: ignore
     instance._init_fields = {"published": instance.published}
 
 
+@receiver(environment_feature_version_published, sender=EnvironmentFeatureVersion)
+def clear_latest_versions_cache(instance: EnvironmentFeatureVersion, **kwargs) -> None:  # type: ignore[no-untyped-def]
+    environment_latest_versions_cache.delete(instance.environment_id)
+
+
+@receiver(environment_feature_version_published, sender=EnvironmentFeatureVersion)
+def update_live_feature_states(instance: EnvironmentFeatureVersion, **kwargs) -> None:  # type: ignore[no-untyped-def]
+    # Receivers are called in the order they're connected, so this needs to be
+    # after the latest versions cache is cleared, and before the other receivers
+    # read the live feature states, e.g. the webhooks.
+    if settings.MAINTAIN_LIVE_FEATURE_STATES:
+        refresh_live_feature_states(instance.environment, instance.feature_id)
+
+
 @receiver(environment_feature_version_published, sender=EnvironmentFeatureVersion)
 def update_environment_document(instance: EnvironmentFeatureVersion, **kwargs):  # type: ignore[no-untyped-def]
     rebuild_environment_document.delay(
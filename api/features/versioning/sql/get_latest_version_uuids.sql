@@ -0,0 +1,34 @@
+select
+	efv1."uuid",
+	null as "next_live_from"
+from
+	feature_versioning_environmentfeatureversion efv1
+join (
+	select
+		efv2."feature_id",
+		MAX(efv2."live_from") as "latest_release"
+	from
+		feature_versioning_environmentfeatureversion efv2
+	where
+		efv2."environment_id" = %(environment_id)s
+		and efv2."deleted_at" is null
+		and efv2."published_at" is not null
+		and efv2."live_from" <= %(live_from_before)s
+	group by
+		efv2."feature_id"
+) latest_release_dates on
+	efv1."feature_id" = latest_release_dates."feature_id"
+	and efv1."live_from" = latest_release_dates."latest_release"
+where
+	efv1."environment_id" = %(environment_id)s
+union all
+select
+	null,
+	MIN(efv3."live_from")
+from
+	feature_versioning_environmentfeatureversion efv3
+where
+	efv3."environment_id" = %(environment_id)s
+	and efv3."deleted_at" is null
+	and efv3."published_at" is not null
+	and efv3."live_from" > %(live_from_before)s;
@@ -1,11 +1,13 @@
 import logging
 import typing
+from datetime import timedelta
 
 from django.conf import settings
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.utils import timezone
 from task_processor.decorators import (
+    register_recurring_task,
     register_task_handler,
 )
 
@@ -23,6 +25,8 @@ from features.versioning.schemas import (
 )
 from features.versioning.versioning_service import (
     get_environment_flags_queryset,
+    promote_live_feature_states,
+    rebuild_live_feature_states,
 )
 from users.models import FFAdminUser
 from webhooks.webhooks import WebhookEventType, call_environment_webhooks
@@ -36,6 +40,14 @@ environment_feature_version_webhook_schema = (
     EnvironmentFeatureVersionWebhookDataSerializer()
 )
 
+if settings.MAINTAIN_LIVE_FEATURE_STATES:  # pragma: no cover
+
+    @register_recurring_task(
+        run_every=timedelta(minutes=1),
+    )
+    def promote_scheduled_live_feature_states() -> None:
+        promote_live_feature_states()
+
 
 @register_task_handler()
 def enable_v2_versioning(environment_id: int) -> None:
@@ -48,6 +60,9 @@ def enable_v2_versioning(environment_id: int) -> None:
     environment.use_v2_feature_versioning = True
     environment.save()
 
+    if settings.MAINTAIN_LIVE_FEATURE_STATES:
+        rebuild_live_feature_states(environment)
+
 
 @register_task_handler()
 def disable_v2_versioning(environment_id: int) -> None:
@@ -82,6 +97,9 @@ def disable_v2_versioning(environment_id: int) -> None:
     environment.use_v2_feature_versioning = False
     environment.save()
 
+    if settings.MAINTAIN_LIVE_FEATURE_STATES:
+        rebuild_live_feature_states(environment)
+
 
 def _create_initial_feature_versions(environment: "Environment"):  # type: ignore[no-untyped-def]
     from features.models import Feature, FeatureSegment
@@ -1,11 +1,14 @@
 import typing
+from datetime import datetime
 
-from django.db.models import Prefetch, Q, QuerySet
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Case, F, Min, Prefetch, Q, QuerySet, Value, When
 from django.utils import timezone
 
 from environments.models import Environment
 from features.models import FeatureState
-from features.versioning.models import EnvironmentFeatureVersion
+from features.versioning.models import EnvironmentFeatureVersion, LiveFeatureState
 
 
 def get_environment_flags_queryset(
@@ -58,8 +61,6 @@ def get_environment_flags_dict(
     ] = None,  # type: ignore[assignment]
     key_function: typing.Callable[[FeatureState], tuple] = None,  # type: ignore[type-arg,assignment]
 ) -> dict[tuple | str | int, FeatureState]:  # type: ignore[type-arg]
-    key_function = key_function or _get_distinct_key  # type: ignore[truthy-function]
-
     feature_states = _get_feature_states_queryset(
         environment,
         feature_name,
@@ -68,17 +69,61 @@ def get_environment_flags_dict(
         additional_prefetch_related_args,
     )
 
-    # Build up a dictionary keyed off the relevant unique attributes as defined
-    # by the provided key function and only keep the highest priority feature state
-    # for each feature.
-    feature_states_dict = {}  # type: ignore[var-annotated]
-    for feature_state in feature_states:
-        key = key_function(feature_state)
-        current_feature_state = feature_states_dict.get(key)
-        if not current_feature_state or feature_state > current_feature_state:
-            feature_states_dict[key] = feature_state
+    if settings.USE_LIVE_FEATURE_STATES and key_function is None:
+        # There's only one live feature state for each feature, segment and identity.
+        return {
+            _get_distinct_key(feature_state): feature_state
+            for feature_state in feature_states
+        }
 
-    return feature_states_dict  # type: ignore[return-value]
+    return _get_highest_priority_feature_states_dict(
+        environment, feature_states, key_function
+    )
+
+
+def refresh_live_feature_states(
+    environment: Environment,
+    feature_id: int,
+    identity_id: int | None = None,
+) -> None:
+    """
+    Replace the live feature states of the feature in the given environment
+    with those which are live now. Refreshes the feature states for the given
+    identity or, if no identity is given, the environment default and segment
+    overrides.
+    """
+    _replace_live_feature_states(
+        environment,
+        Q(feature_id=feature_id)
+        & (Q(identity_id=identity_id) if identity_id else Q(identity__isnull=True)),
+    )
+
+
+def rebuild_live_feature_states(environment: Environment) -> None:
+    """
+    Replace all of the live feature states of the given environment with those
+    which are live now.
+    """
+    _replace_live_feature_states(environment, Q())
+
+
+def promote_live_feature_states() -> None:
+    """
+    Refresh the live feature states which are due to change, because a
+    scheduled feature state, or version, has gone live.
+    """
+    due_keys = list(
+        LiveFeatureState.objects.filter(promote_at__lte=timezone.now())
+        .values_list("environment_id", "feature_id", "identity_id")
+        .distinct()
+    )
+    environments = Environment.objects.in_bulk(
+        {environment_id for environment_id, _, _ in due_keys}
+    )
+    for environment_id, feature_id, identity_id in due_keys:
+        refresh_live_feature_states(
+            environments[environment_id], feature_id, identity_id
+        )
 
 
 def get_current_live_environment_feature_version(
@@ -129,6 +174,207 @@ def _get_feature_states_queryset(
     return queryset
 
 
+def _get_highest_priority_feature_states_dict(
+    environment: Environment,
+    feature_states: QuerySet[FeatureState],
+    key_function: typing.Callable[[FeatureState], tuple] = None,  # type: ignore[type-arg,assignment]
+) -> dict[tuple | str | int, FeatureState]:  # type: ignore[type-arg]
+    if key_function is None and _can_resolve_priority_in_database(environment):
+        return {
+            _get_distinct_key(feature_state): feature_state
+            for feature_state in _get_highest_priority_feature_states(feature_states)
+        }
+
+    key_function = key_function or _get_distinct_key  # type: ignore[truthy-function]
+
+    # Build up a dictionary keyed off the relevant unique attributes as defined
+    # by the provided key function and only keep the highest priority feature state
+    # for each feature.
+    feature_states_dict = {}  # type: ignore[var-annotated]
+    for feature_state in feature_states:
+        key = key_function(feature_state)
+        current_feature_state = feature_states_dict.get(key)
+        if not current_feature_state or feature_state > current_feature_state:
+            feature_states_dict[key] = feature_state
+
+    return feature_states_dict  # type: ignore[return-value]
+
+
+def _replace_live_feature_states(environment: Environment, filters: Q) -> None:
+    with transaction.atomic():
+        # Lock the environment so that concurrent refreshes of its live feature
+        # states are serialised, and each one reads the feature states which
+        # were committed by the previous one.
+        Environment.objects.select_for_update().filter(id=environment.id).first()
+
+        feature_states = _get_highest_priority_feature_states_dict(
+            environment,
+            FeatureState.objects.resolve_live_feature_states(
+                environment=environment, additional_filters=filters
+            ).select_related("environment_feature_version", "feature_segment"),
+        ).values()
+        next_live_froms = _get_next_live_froms(environment, filters)
+
+        live_feature_states = [
+            LiveFeatureState(
+                environment=environment,
+                feature_id=feature_state.feature_id,
+                feature_segment_id=feature_state.feature_segment_id,
+                identity_id=feature_state.identity_id,
+                feature_state=feature_state,
+                promote_at=next_live_froms.get(
+                    (feature_state.feature_id, feature_state.identity_id)
+                ),
+            )
+            for feature_state in feature_states
+        ]
+        # Record scheduled changes to features which don't have a live feature
+        # state yet, so that they're still promoted.
+        live_keys = {
+            (feature_state.feature_id, feature_state.identity_id)
+            for feature_state in feature_states
+        }
+        live_feature_states.extend(
+            LiveFeatureState(
+                environment=environment,
+                feature_id=feature_id,
+                identity_id=identity_id,
+                promote_at=next_live_from,
+            )
+            for (feature_id, identity_id), next_live_from in next_live_froms.items()
+            if (feature_id, identity_id) not in live_keys
+        )
+
+        _upsert_live_feature_states(
+            live_feature_states,
+            LiveFeatureState.objects.filter(filters, environment=environment),
+        )
+
+
+def _upsert_live_feature_states(
+    live_feature_states: list[LiveFeatureState],
+    current_live_feature_states: QuerySet[LiveFeatureState],
+) -> None:
+    """
+    Replace the current live feature states with the given ones, only writing
+    those which have changed.
+    """
+    current = {
+        (
+            live_feature_state.feature_id,
+            live_feature_state.feature_segment_id,
+            live_feature_state.identity_id,
+        ): live_feature_state
+        for live_feature_state in current_live_feature_states
+    }
+
+    to_create, to_update = [], []
+    for live_feature_state in live_feature_states:
+        current_live_feature_state = current.pop(
+            (
+                live_feature_state.feature_id,
+                live_feature_state.feature_segment_id,
+                live_feature_state.identity_id,
+            ),
+            None,
+        )
+        if current_live_feature_state is None:
+            to_create.append(live_feature_state)
+        elif (
+            current_live_feature_state.feature_state_id,
+            current_live_feature_state.promote_at,
+        ) != (live_feature_state.feature_state_id, live_feature_state.promote_at):
+            current_live_feature_state.feature_state_id = (
+                live_feature_state.feature_state_id
+            )
+            current_live_feature_state.promote_at = live_feature_state.promote_at
+            to_update.append(current_live_feature_state)
+
+    LiveFeatureState.objects.filter(
+        id__in=[live_feature_state.id for live_feature_state in current.values()]
+    ).delete()
+    LiveFeatureState.objects.bulk_update(
+        to_update, fields=["feature_state", "promote_at"], batch_size=1000
+    )
+    LiveFeatureState.objects.bulk_create(to_create, batch_size=1000)
+
+
+def _get_next_live_froms(
+    environment: Environment, filters: Q
+) -> dict[tuple[int, int | None], datetime]:
+    """
+    Get the time at which the next scheduled feature state, or version, goes
+    live for each feature and identity.
+    """
+    now = timezone.now()
+
+    if environment.use_v2_feature_versioning:
+        live_from_field = "environment_feature_version__live_from"
+        scheduled_filter = Q(
+            environment_feature_version__published_at__isnull=False,
+            environment_feature_version__live_from__gt=now,
+        )
+    else:
+        live_from_field = "live_from"
+        scheduled_filter = Q(version__isnull=False, live_from__gt=now)
+
+    return {
+        (row["feature_id"], row["identity_id"]): row["next_live_from"]
+        for row in FeatureState.objects.filter(
+            filters,
+            scheduled_filter,
+            environment=environment,
+            deleted_at__isnull=True,
+        )
+        .values("feature_id", "identity_id")
+        .annotate(next_live_from=Min(live_from_field))
+    }
+
+
+def _can_resolve_priority_in_database(environment: Environment) -> bool:
+    # Versions of feature states in environments using v2 versioning are
+    # resolved using their environment feature version, so are still
+    # resolved in python.
+    return (
+        settings.RESOLVE_FEATURE_STATE_PRIORITY_IN_DATABASE
+        and not environment.use_v2_feature_versioning
+        and connections[router.db_for_read(FeatureState)].vendor == "postgresql"
+    )
+
+
+def _get_highest_priority_feature_states(
+    queryset: QuerySet[FeatureState],
+) -> list[FeatureState]:
+    """
+    Return the highest priority feature state for each feature, segment and
+    identity, as `FeatureState.__gt__` would, selecting them in the database
+    with `DISTINCT ON` rather than loading all of their versions.
+
+    Only valid for environments which don't use v2 versioning, whose feature
+    states are all live.
+    """
+    distinct_fields = ("feature_id", "feature_segment__segment_id", "identity_id")
+    highest_priority_feature_states = list(
+        queryset.order_by(
+            *distinct_fields,
+            # The most recently created identity override has priority,
+            # regardless of its live_from.
+            Case(
+                When(identity__isnull=False, then=-F("id")),
+                default=Value(0),
+            ),
+            "feature_segment__priority",
+            F("live_from").desc(),
+            F("version").desc(),
+            "id",
+        ).distinct(*distinct_fields)
+    )
+    # Keep the order of `FeatureState.Meta.ordering`.
+    return sorted(
+        highest_priority_feature_states, key=lambda feature_state: feature_state.id
+    )
+
+
 def _get_distinct_key(
     feature_state: FeatureState,
 ) -> tuple[int, int | None, int | None]:
@@ -1,7 +1,7 @@
 import logging
 import typing
 from datetime import timedelta
-from functools import reduce
+from functools import partial, reduce
 
 from common.projects.permissions import VIEW_PROJECT
 from django.conf import settings
@@ -9,7 +9,7 @@ from django.core.cache import caches
 from django.db.models import Max, Q, QuerySet
 from django.utils import timezone
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from django.views.decorators.http import condition
 from django.views.decorators.vary import vary_on_headers
 from drf_yasg import openapi  # type: ignore[import-untyped]
 from drf_yasg.utils import swagger_auto_schema  # type: ignore[import-untyped]
@@ -25,6 +25,7 @@ from rest_framework.response import Response
 from app.pagination import CustomPagination
 from app_analytics.analytics_db_service import get_feature_evaluation_data
 from app_analytics.influxdb_wrapper import get_multiple_event_list_for_feature
+from core.cache import SingleFlight, coalesce_cache_rebuild
 from core.constants import FLAGSMITH_UPDATED_AT_HEADER, SDK_ENVIRONMENT_KEY_HEADER
 from core.request_origin import RequestOrigin
 from environments.authentication import EnvironmentKeyAuthentication
@@ -38,6 +39,8 @@ from environments.permissions.permissions import (
     EnvironmentKeyPermissions,
     NestedEnvironmentPermissions,
 )
+from environments.sdk.cache import cache_page_per_environment
+from environments.sdk.etags import get_environment_flags_etag
 from features.value_types import BOOLEAN, INTEGER, STRING
 from projects.models import Project
 from users.models import FFAdminUser, UserPermissionGroup
@@ -85,6 +88,7 @@ logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 flags_cache = caches[settings.FLAGS_CACHE_LOCATION]
+flags_cache_single_flight: SingleFlight[str, typing.Any] = SingleFlight()
 
 
 @swagger_auto_schema(responses={200: CreateFeatureSerializer()}, method="get")
@@ -783,9 +787,10 @@ class SDKFeatureStates(GenericAPIView):  # type: ignore[type-arg]
         query_serializer=SDKFeatureStatesQuerySerializer(),
         responses={200: FeatureStateSerializerFull(many=True)},
     )
+    @method_decorator(condition(etag_func=get_environment_flags_etag))
     @method_decorator(vary_on_headers(SDK_ENVIRONMENT_KEY_HEADER))
     @method_decorator(
-        cache_page(
+        cache_page_per_environment(
             timeout=settings.GET_FLAGS_ENDPOINT_CACHE_SECONDS,
             cache=settings.GET_FLAGS_ENDPOINT_CACHE_NAME,
         )
@@ -848,18 +853,27 @@ class SDKFeatureStates(GenericAPIView):  # type: ignore[type-arg]
 
     def _get_flags_from_cache(self, environment):  # type: ignore[no-untyped-def]
         data = flags_cache.get(environment.api_key)
-        if not data:
-            data = self.get_serializer(
-                get_environment_flags_list(
-                    environment=environment,
-                    additional_filters=self._additional_filters,
-                ),
-                many=True,
-            ).data
-            flags_cache.set(environment.api_key, data, settings.CACHE_FLAGS_SECONDS)
+        if data is None:
+            data = coalesce_cache_rebuild(
+                flags_cache,
+                environment.api_key,
+                partial(self._rebuild_flags_cache, environment),
+                flags_cache_single_flight,
+            )
 
         return data
 
+    def _rebuild_flags_cache(self, environment: Environment) -> typing.Any:
+        data = self.get_serializer(
+            get_environment_flags_list(
+                environment=environment,
+                additional_filters=self._additional_filters,
+            ),
+            many=True,
+        ).data
+        flags_cache.set(environment.api_key, data, settings.CACHE_FLAGS_SECONDS)
+        return data
+
     def _get_flags_response_with_identifier(self, request, identifier):  # type: ignore[no-untyped-def]
         identity, _ = Identity.objects.get_or_create(
             identifier=identifier, environment=request.environment
@@ -7,7 +7,7 @@ from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.utils import timezone
 
-from app_analytics.influxdb_wrapper import get_current_api_usage
+from app_analytics.analytics_db_service import get_current_api_usage
 from core.helpers import get_current_site_url
 from organisations.models import (
     Organisation,
@@ -12,7 +12,7 @@ from task_processor.decorators import (
     register_task_handler,
 )
 
-from app_analytics.influxdb_wrapper import get_current_api_usage
+from app_analytics.analytics_db_service import get_current_api_usage
 from integrations.flagsmith.client import get_client
 from organisations import subscription_info_cache
 from organisations.chargebee import (  # type: ignore[attr-defined]
@@ -2,6 +2,7 @@
 from __future__ import unicode_literals
 
 import re
+from datetime import datetime
 
 from django.conf import settings
 from django.core.cache import caches
@@ -25,12 +26,16 @@ from permissions.models import (
     PermissionModel,
 )
 from projects.managers import ProjectManager
-from projects.services import get_project_segments_from_cache
+from projects.services import (
+    get_project_segment_definitions_from_cache,
+    get_project_segments_from_cache,
+)
 from projects.tasks import (
     handle_cascade_delete,
     migrate_project_environments_to_v2,
     write_environments_to_dynamodb,
 )
+from segments.definitions import SegmentDefinition
 
 environment_cache = caches[settings.ENVIRONMENT_CACHE_NAME]
 
@@ -145,6 +150,11 @@ class Project(LifecycleModelMixin, SoftDeleteExportableModel):  # type: ignore[d
     def get_segments_from_cache(self):  # type: ignore[no-untyped-def]
         return get_project_segments_from_cache(self.id)
 
+    def get_segment_definitions_from_cache(
+        self, updated_at: datetime
+    ) -> list[SegmentDefinition]:
+        return get_project_segment_definitions_from_cache(self.id, updated_at)
+
     @hook(BEFORE_CREATE)
     def set_enable_dynamo_db(self):  # type: ignore[no-untyped-def]
         self.enable_dynamo_db = self.enable_dynamo_db or settings.EDGE_ENABLED
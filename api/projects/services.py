@@ -1,9 +1,16 @@
 import typing
+from datetime import datetime
 
 from django.apps import apps
 from django.conf import settings
 from django.core.cache import caches
 
+from segments.definitions import (
+    SegmentDefinition,
+    get_segment_definitions,
+    get_segment_definitions_cache_key,
+)
+
 if typing.TYPE_CHECKING:
     from django.db.models import QuerySet
 
@@ -33,3 +40,31 @@ def get_project_segments_from_cache(project_id: int) -> "QuerySet[Segment]":
         )
 
     return segments  # type: ignore[no-any-return]
+
+
+def get_project_segment_definitions_from_cache(
+    project_id: int,
+    updated_at: datetime,
+) -> list[SegmentDefinition]:
+    """
+    Get the definitions of the project's segments, as of the given `updated_at`
+    of one of its environments, which is stamped whenever its segments change.
+    """
+    Segment = apps.get_model("segments", "Segment")
+
+    cache_key = get_segment_definitions_cache_key(project_id)
+    cached: tuple[datetime, list[SegmentDefinition]] | None = (
+        project_segments_cache.get(cache_key)
+    )
+    if cached is not None and cached[0] >= updated_at:
+        return cached[1]
+
+    segment_definitions = get_segment_definitions(
+        Segment.live_objects.filter(project_id=project_id)
+    )
+    project_segments_cache.set(
+        cache_key,
+        (updated_at, segment_definitions),
+        timeout=settings.CACHE_PROJECT_SEGMENTS_SECONDS,
+    )
+    return segment_definitions
@@ -0,0 +1,93 @@
+"""
+Microbenchmark of the counters used by the analytics caches on the request
+path, comparing a single lock around a dict (as the caches used previously)
+with `StripedCounter`.
+
+Usage (from the `api` directory):
+
+    python scripts/benchmark_analytics_counters.py [--threads 32 64] [--increments 20000]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+import typing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_analytics.counters import DEFAULT_STRIPES, StripedCounter  # noqa: E402
+
+# Roughly the number of distinct keys a busy worker sees between flushes.
+KEY_COUNT = 50
+
+
+class LockedDictCounter:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: dict[typing.Hashable, int] = {}
+
+    def increment(self, key: typing.Hashable, value: int = 1) -> None:
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + value
+
+    def drain(self) -> dict[typing.Hashable, int]:
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        return counts
+
+
+def run(
+    counter: LockedDictCounter | StripedCounter[typing.Hashable],
+    threads: int,
+    increments: int,
+) -> float:
+    keys = [("flags", "host", f"environment-{i}") for i in range(KEY_COUNT)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker() -> None:
+        barrier.wait()
+        for i in range(increments):
+            counter.increment(keys[i % KEY_COUNT])
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    assert sum(counter.drain().values()) == threads * increments
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, nargs="+", default=[32, 64])
+    parser.add_argument("--increments", type=int, default=20_000)
+    parser.add_argument("--stripes", type=int, default=DEFAULT_STRIPES)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL enabled: {gil_enabled}")
+    print(f"{'threads':>8} {'counter':>16} {'best (s)':>10} {'increments/s':>14}")
+
+    for threads in args.threads:
+        counters: dict[str, typing.Callable[[], typing.Any]] = {
+            "locked dict": LockedDictCounter,
+            "striped": lambda: StripedCounter(stripes=args.stripes),
+        }
+        for name, factory in counters.items():
+            best = min(
+                run(factory(), threads, args.increments) for _ in range(args.repeat)
+            )
+            rate = threads * args.increments / best
+            print(f"{threads:>8} {name:>16} {best:>10.3f} {rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
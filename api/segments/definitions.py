@@ -0,0 +1,111 @@
+"""
+Compact definitions of segments, for caching.
+
+Rather than caching segment model instances with their rules and conditions
+prefetched, which are slow to pickle and unpickle and only prefetched to a fixed
+depth, segments are cached as trees of tuples built from flattened rows.
+"""
+
+import typing
+from collections import defaultdict
+from pathlib import Path
+
+from django.apps import apps
+from django.db import connections, router
+
+if typing.TYPE_CHECKING:
+    from django.db.models import QuerySet
+
+    from segments.models import Segment
+
+with open(Path(__file__).parent.resolve() / "sql/get_segment_rules.sql") as f:
+    get_segment_rules_sql = f.read()
+
+
+class ConditionDefinition(typing.NamedTuple):
+    operator: str
+    property: str | None
+    value: str | None
+
+
+class SegmentRuleDefinition(typing.NamedTuple):
+    type: str
+    rules: tuple["SegmentRuleDefinition", ...]
+    conditions: tuple[ConditionDefinition, ...]
+
+
+class SegmentDefinition(typing.NamedTuple):
+    id: int
+    name: str
+    description: str | None
+    rules: tuple[SegmentRuleDefinition, ...]
+
+
+def get_segment_definitions_cache_key(owner_id: int) -> str:
+    return f"segment-definitions:{owner_id}"
+
+
+def get_segment_definitions(
+    segments: "QuerySet[Segment]",
+) -> list[SegmentDefinition]:
+    """
+    Get the definitions of the given segments, with their rules nested to any
+    depth, in at most three queries.
+    """
+    Condition = apps.get_model("segments", "Condition")
+    SegmentRule = apps.get_model("segments", "SegmentRule")
+
+    segment_rows = list(
+        segments.order_by("id").distinct().values_list("id", "name", "description")
+    )
+    if not segment_rows:
+        return []
+
+    with connections[router.db_for_read(SegmentRule)].cursor() as cursor:
+        cursor.execute(
+            get_segment_rules_sql,
+            params={"segment_ids": [segment_id for segment_id, *_ in segment_rows]},
+        )
+        rule_rows: list[tuple[int, int | None, int | None, str]] = cursor.fetchall()
+
+    conditions_by_rule_id: dict[int, list[ConditionDefinition]] = defaultdict(list)
+    if rule_rows:
+        for rule_id, operator, property_, value in (
+            Condition.objects.filter(rule_id__in=[row[0] for row in rule_rows])
+            .order_by("id")
+            .values_list("rule_id", "operator", "property", "value")
+        ):
+            conditions_by_rule_id[rule_id].append(
+                ConditionDefinition(operator=operator, property=property_, value=value)
+            )
+
+    # Rules are keyed by their parent, i.e. a segment id or a rule id.
+    segment_rule_rows: dict[int, list[tuple[int, str]]] = defaultdict(list)
+    child_rule_rows: dict[int, list[tuple[int, str]]] = defaultdict(list)
+    for rule_id, segment_id, parent_rule_id, rule_type in rule_rows:
+        if segment_id is not None:
+            segment_rule_rows[segment_id].append((rule_id, rule_type))
+        else:
+            child_rule_rows[parent_rule_id].append((rule_id, rule_type))  # type: ignore[index]
+
+    def _build_rule(rule_id: int, rule_type: str) -> SegmentRuleDefinition:
+        return SegmentRuleDefinition(
+            type=rule_type,
+            rules=tuple(
+                _build_rule(*child_rule_row)
+                for child_rule_row in child_rule_rows[rule_id]
+            ),
+            conditions=tuple(conditions_by_rule_id[rule_id]),
+        )
+
+    return [
+        SegmentDefinition(
+            id=segment_id,
+            name=name,
+            description=description,
+            rules=tuple(
+                _build_rule(*rule_row) for rule_row in segment_rule_rows[segment_id]
+            ),
+        )
+        for segment_id, name, description in segment_rows
+    ]
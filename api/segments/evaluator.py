@@ -0,0 +1,442 @@
+"""
+Precompiled segment evaluation.
+
+Rather than mapping every segment to the engine model and walking its rules
+for each identity request, segments are compiled once into a tree of plain
+callables which can be evaluated against any number of evaluation contexts.
+The semantics mirror those of `flag_engine.segments.evaluator`.
+"""
+
+import re
+import typing
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from flag_engine.context.types import EvaluationContext
+from flag_engine.identities.traits.types import ContextValue
+from flag_engine.segments import constants
+from flag_engine.segments.evaluator import (
+    CONTEXT_VALUE_GETTERS_BY_PROPERTY,
+    MATCHERS_BY_OPERATOR,
+    context_matches_condition,
+    get_context_value,
+)
+from flag_engine.segments.models import (
+    SegmentConditionModel,
+    SegmentModel,
+    SegmentRuleModel,
+)
+from flag_engine.utils.hashing import get_hashed_percentage_for_object_ids
+
+from core.cache import VersionedLRUCache
+from util.mappers.engine import (
+    map_segment_definition_to_engine,
+    map_segment_to_engine,
+)
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from environments.models import Environment
+    from segments.definitions import SegmentDefinition
+    from segments.models import Segment
+
+SegmentT = typing.TypeVar("SegmentT")
+
+ContextMatcher = typing.Callable[[EvaluationContext], bool]
+ContextValueGetter = typing.Callable[[EvaluationContext], ContextValue]
+
+_RULE_MATCHING_FUNCTIONS: dict[str, typing.Callable[[typing.Iterable[bool]], bool]] = {
+    constants.ANY_RULE: any,
+    constants.ALL_RULE: all,
+    constants.NONE_RULE: lambda results: not any(results),
+}
+
+
+class CompiledSegment(typing.Generic[SegmentT]):
+    __slots__ = (
+        "segment",
+        "id",
+        "required_trait_keys",
+        "is_identity_dependent",
+        "_rules",
+    )
+
+    def __init__(
+        self,
+        segment: SegmentT,
+        segment_model: SegmentModel,
+    ) -> None:
+        self.segment = segment
+        self.id = segment_model.id
+        self.required_trait_keys = _get_segment_required_trait_keys(segment_model)
+        self.is_identity_dependent = any(
+            _is_rule_identity_dependent(rule) for rule in segment_model.rules
+        )
+        self._rules = tuple(
+            _compile_rule(rule, segment_key=segment_model.id)
+            for rule in segment_model.rules
+        )
+
+    def matches(self, context: EvaluationContext) -> bool:
+        return bool(self._rules) and all(rule(context) for rule in self._rules)
+
+
+class SegmentIndex(typing.Generic[SegmentT]):
+    """
+    A set of compiled segments that can be evaluated repeatedly against
+    evaluation contexts without touching the ORM or the engine models.
+
+    Segments are indexed by the trait keys they require so that only those
+    segments which could possibly match a given context are evaluated.
+    """
+
+    def __init__(self, compiled_segments: typing.Iterable[CompiledSegment[SegmentT]]):
+        self.compiled_segments = list(compiled_segments)
+
+        self._traitless_positions: list[int] = []
+        self._positions_by_trait_key: dict[str, list[int]] = defaultdict(list)
+        for position, compiled_segment in enumerate(self.compiled_segments):
+            if (required_trait_keys := compiled_segment.required_trait_keys) is None:
+                self._traitless_positions.append(position)
+                continue
+            for trait_key in required_trait_keys:
+                self._positions_by_trait_key[trait_key].append(position)
+
+    @classmethod
+    def from_segments(
+        cls,
+        segments: typing.Iterable["Segment"],
+    ) -> "SegmentIndex[Segment]":
+        return SegmentIndex(
+            CompiledSegment(segment, map_segment_to_engine(segment))
+            for segment in segments
+        )
+
+    @classmethod
+    def from_segment_definitions(
+        cls,
+        segment_definitions: typing.Iterable["SegmentDefinition"],
+    ) -> "SegmentIndex[SegmentDefinition]":
+        return SegmentIndex(
+            CompiledSegment(
+                segment_definition,
+                map_segment_definition_to_engine(segment_definition),
+            )
+            for segment_definition in segment_definitions
+        )
+
+    @classmethod
+    def from_segment_models(
+        cls,
+        segment_models: typing.Iterable[SegmentModel],
+    ) -> "SegmentIndex[SegmentModel]":
+        return SegmentIndex(
+            CompiledSegment(segment_model, segment_model)
+            for segment_model in segment_models
+        )
+
+    def get_candidates(
+        self,
+        context: EvaluationContext,
+    ) -> list[CompiledSegment[SegmentT]]:
+        """
+        Get the compiled segments, in their original order, which can match the
+        given context based on the trait keys present in it.
+        """
+        return [
+            self.compiled_segments[position]
+            for position in sorted(self._get_candidate_positions(context))
+        ]
+
+    def get_matching_segments(self, context: EvaluationContext) -> list[SegmentT]:
+        return [
+            compiled_segment.segment
+            for compiled_segment in self.get_candidates(context)
+            if compiled_segment.matches(context)
+        ]
+
+    def get_matching_segments_for_contexts(
+        self,
+        contexts: typing.Iterable[EvaluationContext],
+    ) -> typing.Iterator[list[SegmentT]]:
+        """
+        Get the matching segments for each of the given contexts.
+
+        Segments which only depend on traits are evaluated once per distinct
+        set of traits, so only segments which depend on the identity itself
+        (e.g. percentage splits) are evaluated for every context.
+        """
+        trait_matches: dict[frozenset[tuple[str, str, ContextValue]], set[int]] = {}
+
+        for context in contexts:
+            candidate_positions = self._get_candidate_positions(context)
+
+            traits_key = _get_traits_key(context)
+            if (matching_positions := trait_matches.get(traits_key)) is None:
+                matching_positions = trait_matches[traits_key] = {
+                    position
+                    for position in candidate_positions
+                    if not self.compiled_segments[position].is_identity_dependent
+                    and self.compiled_segments[position].matches(context)
+                }
+
+            yield [
+                self.compiled_segments[position].segment
+                for position in sorted(candidate_positions)
+                if position in matching_positions
+                or (
+                    self.compiled_segments[position].is_identity_dependent
+                    and self.compiled_segments[position].matches(context)
+                )
+            ]
+
+    def _get_candidate_positions(self, context: EvaluationContext) -> set[int]:
+        identity_context = context.get("identity")
+        traits = (identity_context and identity_context.get("traits")) or {}
+
+        positions = set(self._traitless_positions)
+        for trait_key in traits:
+            if trait_key in self._positions_by_trait_key:
+                positions.update(self._positions_by_trait_key[trait_key])
+
+        return positions
+
+
+_segment_indexes: VersionedLRUCache[
+    tuple[int, bool], "SegmentIndex[SegmentDefinition]"
+] = VersionedLRUCache(max_entries=settings.SEGMENT_INDEX_CACHE_MAX_ENTRIES)
+
+
+def get_environment_segment_index(
+    environment: "Environment",
+    overrides_only: bool = False,
+) -> "SegmentIndex[SegmentDefinition]":
+    """
+    Get the compiled segment index for an environment, building it from the
+    segment definitions cache if the environment has changed since it was last
+    built.
+
+    :param environment: the environment to build the index for
+    :param overrides_only: only include segments overridden in the environment,
+        otherwise include all the segments in the environment's project
+    """
+
+    def _build() -> "SegmentIndex[SegmentDefinition]":
+        segment_definitions = (
+            environment.get_segments_from_cache()
+            if overrides_only
+            else environment.project.get_segment_definitions_from_cache(
+                environment.updated_at
+            )
+        )
+        return SegmentIndex.from_segment_definitions(segment_definitions)
+
+    return _segment_indexes.get_or_set(
+        (environment.id, overrides_only),
+        environment.updated_at,
+        _build,
+    )
+
+
+def delete_environment_segment_indexes(environment_ids: typing.Iterable[int]) -> None:
+    for environment_id in environment_ids:
+        for overrides_only in (False, True):
+            _segment_indexes.delete((environment_id, overrides_only))
+
+
+def _compile_rule(rule: SegmentRuleModel, segment_key: int) -> ContextMatcher:
+    matching_function = _RULE_MATCHING_FUNCTIONS[rule.type]
+    conditions = tuple(
+        _compile_condition(condition, segment_key) for condition in rule.conditions
+    )
+    sub_rules = tuple(_compile_rule(sub_rule, segment_key) for sub_rule in rule.rules)
+
+    def match(context: EvaluationContext) -> bool:
+        if conditions and not matching_function(
+            condition(context) for condition in conditions
+        ):
+            return False
+        return all(sub_rule(context) for sub_rule in sub_rules)
+
+    return match
+
+
+def _compile_condition(
+    condition: SegmentConditionModel,
+    segment_key: int,
+) -> ContextMatcher:
+    get_value = _compile_context_value_getter(condition.property_)
+    operator = condition.operator
+    segment_value = condition.value
+
+    if operator == constants.PERCENTAGE_SPLIT:
+        return _compile_percentage_split_condition(condition, segment_key, get_value)
+
+    if operator == constants.IS_NOT_SET:
+        return lambda context: get_value(context) is None
+
+    if operator == constants.IS_SET:
+        return lambda context: get_value(context) is not None
+
+    if operator == constants.REGEX:
+        return _compile_regex_condition(condition, segment_key, get_value)
+
+    if not (matcher := MATCHERS_BY_OPERATOR.get(operator)):
+        return lambda context: False
+
+    def match_value(context: EvaluationContext) -> bool:
+        context_value = get_value(context)
+        return context_value is not None and matcher(segment_value, context_value)
+
+    return match_value
+
+
+def _compile_percentage_split_condition(
+    condition: SegmentConditionModel,
+    segment_key: int,
+    get_value: ContextValueGetter,
+) -> ContextMatcher:
+    try:
+        threshold = float(condition.value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        # Defer to the engine so that invalid values behave identically.
+        return partial(_match_with_engine, condition, segment_key)
+
+    def match_percentage_split(context: EvaluationContext) -> bool:
+        if (context_value := get_value(context)) is None:
+            context_value = get_context_value(context, "$.identity.key")
+        return (
+            get_hashed_percentage_for_object_ids([segment_key, context_value])
+            <= threshold
+        )
+
+    return match_percentage_split
+
+
+def _compile_regex_condition(
+    condition: SegmentConditionModel,
+    segment_key: int,
+    get_value: ContextValueGetter,
+) -> ContextMatcher:
+    try:
+        pattern = re.compile(str(condition.value))
+    except re.error:
+        return partial(_match_with_engine, condition, segment_key)
+
+    def match_regex(context: EvaluationContext) -> bool:
+        context_value = get_value(context)
+        return (
+            context_value is not None and pattern.match(str(context_value)) is not None
+        )
+
+    return match_regex
+
+
+def _compile_context_value_getter(property_: str | None) -> ContextValueGetter:
+    if not property_:
+        return lambda context: None
+
+    if getter := CONTEXT_VALUE_GETTERS_BY_PROPERTY.get(property_):
+
+        def get_property(context: EvaluationContext) -> ContextValue:
+            try:
+                return getter(context)  # type: ignore[no-any-return,no-untyped-call]
+            except KeyError:
+                return None
+
+        return get_property
+
+    def get_trait(context: EvaluationContext) -> ContextValue:
+        try:
+            identity_context = context["identity"]
+            return identity_context["traits"][property_] if identity_context else None
+        except KeyError:
+            return None
+
+    return get_trait
+
+
+def _match_with_engine(
+    condition: SegmentConditionModel,
+    segment_key: int,
+    context: EvaluationContext,
+) -> bool:
+    return context_matches_condition(
+        context=context,
+        condition=condition,
+        segment_key=segment_key,
+    )
+
+
+def _get_traits_key(
+    context: EvaluationContext,
+) -> frozenset[tuple[str, str, ContextValue]]:
+    identity_context = context.get("identity")
+    traits = (identity_context and identity_context.get("traits")) or {}
+    # include the type so that e.g. `True` and `1` are not treated as equal
+    return frozenset(
+        (trait_key, type(trait_value).__name__, trait_value)
+        for trait_key, trait_value in traits.items()
+    )
+
+
+def _is_rule_identity_dependent(rule: SegmentRuleModel) -> bool:
+    return any(
+        condition.operator == constants.PERCENTAGE_SPLIT
+        or condition.property_ in CONTEXT_VALUE_GETTERS_BY_PROPERTY
+        for condition in rule.conditions
+    ) or any(_is_rule_identity_dependent(sub_rule) for sub_rule in rule.rules)
+
+
+def _get_segment_required_trait_keys(
+    segment_model: SegmentModel,
+) -> frozenset[str] | None:
+    """
+    Get a set of trait keys, at least one of which must be present in a context
+    for the segment to match it, or None if the segment can match a context
+    without any traits (e.g. percentage split or IS_NOT_SET conditions).
+    """
+    if not segment_model.rules:
+        # segments without rules never match
+        return frozenset()
+    return _get_most_selective(
+        _get_rule_required_trait_keys(rule) for rule in segment_model.rules
+    )
+
+
+def _get_rule_required_trait_keys(rule: SegmentRuleModel) -> frozenset[str] | None:
+    # all sub rules must match, so any of their requirements apply to the rule
+    candidates = [_get_rule_required_trait_keys(sub_rule) for sub_rule in rule.rules]
+
+    if rule.conditions:
+        condition_requirements = [
+            _get_condition_required_trait_keys(condition)
+            for condition in rule.conditions
+        ]
+        if rule.type == constants.ALL_RULE:
+            candidates.extend(condition_requirements)
+        elif rule.type == constants.ANY_RULE and None not in condition_requirements:
+            candidates.append(frozenset().union(*condition_requirements))  # type: ignore[arg-type]
+
+    return _get_most_selective(candidates)
+
+
+def _get_condition_required_trait_keys(
+    condition: SegmentConditionModel,
+) -> frozenset[str] | None:
+    if (
+        not condition.property_
+        or condition.property_ in CONTEXT_VALUE_GETTERS_BY_PROPERTY
+        or condition.operator in (constants.IS_NOT_SET, constants.PERCENTAGE_SPLIT)
+    ):
+        return None
+    return frozenset((condition.property_,))
+
+
+def _get_most_selective(
+    requirements: typing.Iterable[frozenset[str] | None],
+) -> frozenset[str] | None:
+    trait_requirements = [
+        requirement for requirement in requirements if requirement is not None
+    ]
+    return min(trait_requirements, key=len) if trait_requirements else None
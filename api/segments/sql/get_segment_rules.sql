@@ -0,0 +1,33 @@
+with recursive segment_rules as (
+	select
+		sr."id",
+		sr."segment_id",
+		sr."rule_id",
+		sr."type"
+	from
+		segments_segmentrule sr
+	where
+		sr."deleted_at" is null
+		and sr."segment_id" = any(%(segment_ids)s)
+	union all
+	select
+		sr."id",
+		sr."segment_id",
+		sr."rule_id",
+		sr."type"
+	from
+		segments_segmentrule sr
+	inner join segment_rules parent_rule on
+		sr."rule_id" = parent_rule."id"
+	where
+		sr."deleted_at" is null
+)
+select
+	"id",
+	"segment_id",
+	"rule_id",
+	"type"
+from
+	segment_rules
+order by
+	"id";
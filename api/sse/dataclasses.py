@@ -5,3 +5,9 @@ from dataclasses import dataclass
 class SSEAccessLogs:
     generated_at: str  # ISO 8601
     api_key: str
+
+
+@dataclass(eq=True)
+class SSEUsage:
+    request_count: int = 0
+    last_event_generated_at: str = ""  # ISO 8601
@@ -4,3 +4,7 @@ class SSEAuthTokenNotSet(Exception):
 
 class ViewResponseDoesNotHaveStatus(Exception):
     pass
+
+
+class SSEAccessLogDecryptionError(Exception):
+    pass
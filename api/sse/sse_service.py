@@ -1,20 +1,26 @@
 import csv
 import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import wraps
-from io import StringIO
-from typing import Generator
+from typing import Any, Callable, Generator, Iterable
 
 import boto3
 import gnupg  # type: ignore[import-untyped]
 from django.conf import settings
 
 from sse import tasks
-from sse.dataclasses import SSEAccessLogs
+from sse.dataclasses import SSEAccessLogs, SSEUsage
+from sse.exceptions import SSEAccessLogDecryptionError
 
 logger = logging.getLogger(__name__)
 
 GNUPG_HOME = "/app/.gnupg"
 
+# Maximum number of objects S3 deletes in a single request.
+S3_DELETE_OBJECTS_MAX_KEYS = 1000
+
 
 def _sse_enabled(get_project_from_first_arg=lambda obj: obj.project):  # type: ignore[no-untyped-def]
     """
@@ -56,22 +62,113 @@ def send_environment_update_message_for_environment(environment):  # type: ignor
     )
 
 
-def stream_access_logs() -> Generator[SSEAccessLogs, None, None]:
-    gpg = gnupg.GPG(gnupghome=GNUPG_HOME)
-    bucket = boto3.resource("s3").Bucket(settings.AWS_SSE_LOGS_BUCKET_NAME)
-
-    for log_file in bucket.objects.all():
-        encrypted_body = log_file.get()["Body"].read()
-        decrypted_body = gpg.decrypt(encrypted_body)
-
-        reader = csv.reader(StringIO(decrypted_body.data.decode()))
+def process_access_logs(write_usage: Callable[[dict[str, SSEUsage]], None]) -> None:
+    """
+    Aggregate the usage, by environment key, in the SSE access log files, and
+    pass it to `write_usage`.
 
-        for row in reader:
+    The files are downloaded, decrypted and aggregated in parallel, and are
+    only deleted once `write_usage` has returned, so that they're processed
+    again if writing the usage fails. Files which can't be processed are left
+    in the bucket, and are retried the next time.
+    """
+    if not (bucket_name := settings.AWS_SSE_LOGS_BUCKET_NAME):
+        return
+
+    s3_client = boto3.client("s3")
+
+    keys = [
+        log_file["Key"]
+        for page in s3_client.get_paginator("list_objects_v2").paginate(
+            Bucket=bucket_name
+        )
+        for log_file in page.get("Contents", [])
+    ]
+    if not keys:
+        return
+
+    usage: dict[str, SSEUsage] = {}
+    processed_keys = []
+    with ThreadPoolExecutor(
+        max_workers=settings.SSE_ACCESS_LOGS_MAX_WORKERS
+    ) as executor:
+        futures = {
+            executor.submit(
+                _aggregate_access_log_file, s3_client, bucket_name, key
+            ): key
+            for key in keys
+        }
+        for future in as_completed(futures):
             try:
-                log = SSEAccessLogs(*row)
-            except TypeError:
-                logger.warning("Invalid row in SSE access log file: %s", row)
+                file_usage = future.result()
+            except Exception:
+                logger.exception(
+                    "Failed to process SSE access log file %s.", futures[future]
+                )
                 continue
-            yield log
-
-        log_file.delete()
+            for api_key, environment_usage in file_usage.items():
+                _add_usage(usage.setdefault(api_key, SSEUsage()), environment_usage)
+            processed_keys.append(futures[future])
+
+    if not processed_keys:
+        return
+
+    write_usage(usage)
+
+    for i in range(0, len(processed_keys), S3_DELETE_OBJECTS_MAX_KEYS):
+        s3_client.delete_objects(
+            Bucket=bucket_name,
+            Delete={
+                "Objects": [
+                    {"Key": key}
+                    for key in processed_keys[i : i + S3_DELETE_OBJECTS_MAX_KEYS]
+                ],
+                "Quiet": True,
+            },
+        )
+
+
+def _aggregate_access_log_file(
+    s3_client: Any,
+    bucket_name: str,
+    key: str,
+) -> dict[str, SSEUsage]:
+    gpg = gnupg.GPG(gnupghome=GNUPG_HOME)
+    encrypted_body = s3_client.get_object(Bucket=bucket_name, Key=key)["Body"]
+
+    # Stream the file through gpg to a temporary file, rather than holding the
+    # encrypted and decrypted files in memory.
+    with tempfile.TemporaryDirectory() as directory:
+        decrypted_path = os.path.join(directory, "access_logs.csv")
+        result = gpg.decrypt_file(encrypted_body, output=decrypted_path)
+        if not result.ok:
+            raise SSEAccessLogDecryptionError(result.status)
+
+        usage: dict[str, SSEUsage] = {}
+        with open(decrypted_path, newline="") as decrypted_file:
+            for log in _read_access_logs(decrypted_file):
+                environment_usage = usage.setdefault(log.api_key, SSEUsage())
+                environment_usage.request_count += 1
+                environment_usage.last_event_generated_at = max(
+                    environment_usage.last_event_generated_at, log.generated_at
+                )
+        return usage
+
+
+def _read_access_logs(
+    lines: Iterable[str],
+) -> Generator[SSEAccessLogs, None, None]:
+    for row in csv.reader(lines):
+        try:
+            log = SSEAccessLogs(*row)
+        except TypeError:
+            logger.warning("Invalid row in SSE access log file: %s", row)
+            continue
+        yield log
+
+
+def _add_usage(usage: SSEUsage, other: SSEUsage) -> None:
+    usage.request_count += other.request_count
+    usage.last_event_generated_at = max(
+        usage.last_event_generated_at, other.last_event_generated_at
+    )
@@ -3,16 +3,17 @@ from datetime import timedelta
 
 import requests
 from django.conf import settings
-from influxdb_client import Point, WriteOptions
+from influxdb_client import Point
 from task_processor.decorators import (
     register_recurring_task,
     register_task_handler,
 )
 
-from app_analytics.influxdb_wrapper import influxdb_client
+from app_analytics.influxdb_wrapper import get_influxdb_writer
 from environments.models import Environment
 from projects.models import Project
 from sse import sse_service
+from sse.dataclasses import SSEUsage
 
 from .exceptions import SSEAuthTokenNotSet
 
@@ -44,43 +45,36 @@ if settings.AWS_SSE_LOGS_BUCKET_NAME:
     @register_recurring_task(
         run_every=timedelta(minutes=5),
     )
-    def update_sse_usage():  # type: ignore[no-untyped-def]
-        agg_request_count: dict[str, int] = {}
-        agg_last_event_generated_at: dict[str, str] = {}
-
-        for log in sse_service.stream_access_logs():
-            agg_request_count[log.api_key] = agg_request_count.get(log.api_key, 0) + 1
-            agg_last_event_generated_at[log.api_key] = log.generated_at
-
-        with influxdb_client.write_api(
-            write_options=WriteOptions(batch_size=100, flush_interval=1000)
-        ) as write_api:
-            environments = Environment.objects.filter(
-                api_key__in=agg_request_count.keys()
-            ).values(
-                "api_key",
-                "id",
-                "project_id",
-                "project__name",
-                "project__organisation_id",
-                "project__organisation__name",
-            )
-
-            for environment in environments:
-                time = agg_last_event_generated_at[environment["api_key"]]
-                count = agg_request_count[environment["api_key"]]
-                record = (
-                    Point("sse_call")
-                    .field("request_count", count)
-                    .tag("environment_id", environment["id"])
-                    .tag("project_id", environment["project_id"])
-                    .tag("project", environment["project__name"])
-                    .tag("organisation_id", environment["project__organisation_id"])
-                    .tag("organisation", environment["project__organisation__name"])
-                    .time(time)
-                )
-
-                write_api.write(bucket=settings.INFLUXDB_BUCKET, record=record)
+    def update_sse_usage() -> None:
+        sse_service.process_access_logs(write_usage=_write_sse_usage)
+
+
+def _write_sse_usage(usage: dict[str, SSEUsage]) -> None:
+    environments = Environment.objects.filter(api_key__in=usage.keys()).values(
+        "api_key",
+        "id",
+        "project_id",
+        "project__name",
+        "project__organisation_id",
+        "project__organisation__name",
+    )
+
+    records = []
+    for environment in environments:
+        environment_usage = usage[environment["api_key"]]
+        records.append(
+            Point("sse_call")
+            .field("request_count", environment_usage.request_count)
+            .tag("environment_id", environment["id"])
+            .tag("project_id", environment["project_id"])
+            .tag("project", environment["project__name"])
+            .tag("organisation_id", environment["project__organisation_id"])
+            .tag("organisation", environment["project__organisation__name"])
+            .time(environment_usage.last_event_generated_at)
+        )
+
+    # Written synchronously, as the access logs are deleted once written.
+    get_influxdb_writer().write_synchronously(records)
 
 
 def get_auth_header():  # type: ignore[no-untyped-def]
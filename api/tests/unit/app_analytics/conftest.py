@@ -1,6 +1,8 @@
 import pytest
 from django.conf import settings
 
+from app_analytics.influxdb_wrapper import influxdb_query_cache
+
 
 @pytest.fixture
 def use_analytics_db(request: pytest.FixtureRequest) -> None:
@@ -24,3 +26,8 @@ def use_analytics_db_marked(request: pytest.FixtureRequest) -> None:
     """
     if request.node.get_closest_marker("use_analytics_db"):
         request.getfixturevalue("use_analytics_db")
+
+
+@pytest.fixture(autouse=True)
+def clear_influxdb_query_cache() -> None:
+    influxdb_query_cache.clear()
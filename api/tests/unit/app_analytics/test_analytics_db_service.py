@@ -1,4 +1,4 @@
-from datetime import UTC, date, datetime, timedelta
+from datetime import UTC, date, datetime, time, timedelta
 
 import pytest
 from django.utils import timezone
@@ -7,6 +7,7 @@ from pytest_mock import MockerFixture
 from rest_framework.exceptions import NotFound
 
 from app_analytics.analytics_db_service import (
+    get_current_api_usage,
     get_feature_evaluation_data,
     get_feature_evaluation_data_from_local_db,
     get_total_events_count,
@@ -20,7 +21,8 @@ from app_analytics.models import (
     FeatureEvaluationBucket,
     Resource,
 )
-from app_analytics.types import PeriodType
+from app_analytics.tasks import populate_api_usage_daily_rollups
+from app_analytics.types import Labels, PeriodType
 from environments.models import Environment
 from features.models import Feature
 from organisations.models import (
@@ -720,3 +722,162 @@ def test_get_usage_data_calls_get_usage_data_from_local_db_with_set_period_start
         date_stop=datetime(2022, 12, 30, 9, 9, 47, 325132, tzinfo=UTC),
         labels_filter=None,
     )
+
+
+@pytest.fixture
+def api_usage_buckets_for_rollups(
+    environment: Environment,
+) -> list[date]:
+    another_environment = Environment.objects.create(
+        name="another", project=environment.project
+    )
+    now = timezone.now()
+    read_bucket_size = 15
+    days = []
+    for i in range(35):
+        bucket_created_at = now - timedelta(days=i)
+        days.append(timezone.localdate(bucket_created_at))
+        for resource in Resource:
+            for environment_id, labels in (
+                (environment.id, {}),
+                (environment.id, {"client_application_name": "test-app"}),
+                (another_environment.id, {}),
+                # not in the organisation
+                (999999, {}),
+            ):
+                APIUsageBucket.objects.create(
+                    environment_id=environment_id,
+                    resource=resource,
+                    total_count=10 + i,
+                    bucket_size=read_bucket_size,
+                    created_at=bucket_created_at,
+                    labels=labels,
+                )
+            # a bucket of a different size
+            APIUsageBucket.objects.create(
+                environment_id=environment.id,
+                resource=resource,
+                total_count=10,
+                bucket_size=read_bucket_size - 1,
+                created_at=bucket_created_at,
+            )
+    return days
+
+
+@pytest.mark.use_analytics_db
+@pytest.mark.parametrize(
+    "labels_filter",
+    [None, {"client_application_name": "test-app"}],
+)
+def test_get_usage_data_from_local_db__daily_rollups__returns_same_as_buckets(
+    organisation: Organisation,
+    api_usage_buckets_for_rollups: list[date],
+    settings: SettingsWrapper,
+    labels_filter: Labels | None,
+) -> None:
+    # Given
+    settings.USE_API_USAGE_DAILY_ROLLUPS = False
+    expected_usage_data = get_usage_data_from_local_db(
+        organisation, labels_filter=labels_filter
+    )
+    populate_api_usage_daily_rollups(api_usage_buckets_for_rollups)
+    settings.USE_API_USAGE_DAILY_ROLLUPS = True
+
+    # When
+    usage_data = get_usage_data_from_local_db(organisation, labels_filter=labels_filter)
+
+    # Then
+    assert usage_data == expected_usage_data
+
+
+@pytest.mark.use_analytics_db
+def test_get_total_events_count__daily_rollups__returns_same_as_buckets(
+    organisation: Organisation,
+    api_usage_buckets_for_rollups: list[date],
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.USE_POSTGRES_FOR_ANALYTICS = True
+    settings.USE_API_USAGE_DAILY_ROLLUPS = False
+    expected_total_events_count = get_total_events_count(organisation)
+    populate_api_usage_daily_rollups(api_usage_buckets_for_rollups)
+    settings.USE_API_USAGE_DAILY_ROLLUPS = True
+
+    # When
+    total_events_count = get_total_events_count(organisation)
+
+    # Then
+    assert total_events_count == expected_total_events_count
+
+
+@pytest.mark.use_analytics_db
+def test_get_current_api_usage__daily_rollups__returns_whole_days_since_start(
+    organisation: Organisation,
+    api_usage_buckets_for_rollups: list[date],
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    settings.USE_POSTGRES_FOR_ANALYTICS = True
+    settings.USE_API_USAGE_DAILY_ROLLUPS = True
+    populate_api_usage_daily_rollups(api_usage_buckets_for_rollups)
+    influxdb_mock = mocker.patch(
+        "app_analytics.analytics_db_service.get_current_api_usage_from_influxdb"
+    )
+
+    # When
+    api_usage = get_current_api_usage(
+        organisation.id,
+        date_start=timezone.make_aware(
+            datetime.combine(timezone.localdate() - timedelta(days=2), time.min)
+        ),
+    )
+
+    # Then
+    # 3 environment and labels combinations, for each resource, for 3 days
+    assert api_usage == 3 * len(Resource) * (10 + 11 + 12)
+    influxdb_mock.assert_not_called()
+
+
+@pytest.mark.use_analytics_db
+def test_get_current_api_usage__daily_rollups_partial_first_day__excludes_usage_before_start(
+    organisation: Organisation,
+    api_usage_buckets_for_rollups: list[date],
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.USE_POSTGRES_FOR_ANALYTICS = True
+    settings.USE_API_USAGE_DAILY_ROLLUPS = True
+    populate_api_usage_daily_rollups(api_usage_buckets_for_rollups)
+
+    # When
+    # the first day starts after its bucket
+    api_usage = get_current_api_usage(
+        organisation.id,
+        date_start=timezone.now() - timedelta(days=2, microseconds=-1),
+    )
+
+    # Then
+    assert api_usage == 3 * len(Resource) * (10 + 11)
+
+
+def test_get_current_api_usage__daily_rollups_disabled__calls_influxdb(
+    organisation: Organisation,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    settings.USE_POSTGRES_FOR_ANALYTICS = True
+    settings.USE_API_USAGE_DAILY_ROLLUPS = False
+    influxdb_mock = mocker.patch(
+        "app_analytics.analytics_db_service.get_current_api_usage_from_influxdb",
+        return_value=100,
+    )
+    date_start = timezone.now() - timedelta(days=2)
+
+    # When
+    api_usage = get_current_api_usage(organisation.id, date_start=date_start)
+
+    # Then
+    assert api_usage == 100
+    influxdb_mock.assert_called_once_with(organisation.id, date_start)
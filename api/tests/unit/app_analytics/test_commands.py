@@ -5,6 +5,8 @@ from django.core.management import call_command
 from pytest_django.fixtures import SettingsWrapper
 from pytest_mock import MockerFixture
 
+from app_analytics.partitions import PARTITIONED_TABLES, is_partitioned
+
 
 def test_populate_buckets__postgres_analytics_disabled__noop(
     settings: SettingsWrapper,
@@ -69,3 +71,40 @@ def test_populate_buckets__postgres_analytics_enabled__calls_expected(
         expected_bucket_size,
         expected_call_every,
     )
+
+
+@pytest.mark.use_analytics_db
+def test_manage_analytics_partitions__convert__partitions_tables(
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.USE_POSTGRES_FOR_ANALYTICS = True
+
+    # When
+    call_command("manage_analytics_partitions", convert=True)
+    # converting again is a no-op
+    call_command("manage_analytics_partitions", convert=True)
+
+    # Then
+    assert all(is_partitioned(table) for table in PARTITIONED_TABLES)
+
+
+def test_manage_analytics_partitions__without_convert__maintains_partitions(
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    settings.USE_POSTGRES_FOR_ANALYTICS = True
+    partition_table_mock = mocker.patch(
+        "app_analytics.management.commands.manage_analytics_partitions.partition_table"
+    )
+    maintain_partitions_mock = mocker.patch(
+        "app_analytics.management.commands.manage_analytics_partitions.maintain_partitions"
+    )
+
+    # When
+    call_command("manage_analytics_partitions")
+
+    # Then
+    partition_table_mock.assert_not_called()
+    maintain_partitions_mock.assert_called_once_with()
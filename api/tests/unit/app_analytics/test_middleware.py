@@ -1,10 +1,15 @@
 import pytest
 from django.test import RequestFactory
+from django.urls import reverse
 from pytest_django.fixtures import SettingsWrapper
 from pytest_mock import MockerFixture
+from rest_framework import status
+from rest_framework.test import APIClient
 
+from app_analytics import tasks
 from app_analytics.middleware import APIUsageMiddleware
-from app_analytics.models import Resource
+from app_analytics.models import APIUsageRaw, Resource
+from environments.models import Environment, EnvironmentAPIKey
 from tests.types import EnableFeaturesFixture
 
 
@@ -46,6 +51,7 @@ def test_api_usage_middleware__calls_expected(
         host="testserver",
         environment_key=environment_key,
         labels={},
+        count=1,
     )
 
 
@@ -106,6 +112,7 @@ def test_api_usage_middleware__no_cache__calls_expected(
             "resource": Resource.get_from_name(resource_name),
             "environment_key": environment_key,
             "host": "testserver",
+            "count": 1,
             "labels": expected_labels,
         }
     )
@@ -131,3 +138,75 @@ def test_api_usage_middleware__request_not_tracked__not_calls_expected(
 
     # Then
     mocked_track_request.delay.assert_not_called()
+
+
+@pytest.mark.use_analytics_db
+def test_bulk_identities__postgres_analytics__tracks_identities_usage_per_identity(
+    environment: Environment,
+    environment_api_key: EnvironmentAPIKey,
+    api_client: APIClient,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    settings.USE_CACHE_FOR_USAGE_DATA = False
+    settings.USE_POSTGRES_FOR_ANALYTICS = True
+    track_request_mock = mocker.patch("app_analytics.services.track_request")
+    track_request_mock.run_in_thread.side_effect = lambda kwargs: tasks.track_request(
+        **kwargs
+    )
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment_api_key.key)
+
+    # When
+    response = api_client.post(
+        reverse("api-v1:sdk-identities-bulk"),
+        data={"identities": [{"identifier": f"identity-{i}"} for i in range(3)]},
+        format="json",
+    )
+    b"".join(response.streaming_content)  # type: ignore[attr-defined]
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    api_usage = APIUsageRaw.objects.get(environment_id=environment.id)
+    assert api_usage.resource == Resource.IDENTITIES
+    assert api_usage.count == 3
+
+
+def test_bulk_identities__influx_analytics__tracks_identities_usage_per_identity(
+    environment: Environment,
+    environment_api_key: EnvironmentAPIKey,
+    api_client: APIClient,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    settings.USE_CACHE_FOR_USAGE_DATA = False
+    settings.USE_POSTGRES_FOR_ANALYTICS = False
+    settings.INFLUXDB_TOKEN = "test_token"
+    track_request_mock = mocker.patch("app_analytics.services.track_request")
+    track_request_mock.run_in_thread.side_effect = lambda kwargs: tasks.track_request(
+        **kwargs
+    )
+    track_request_influxdb_mock = mocker.patch(
+        "app_analytics.tasks.track_request_influxdb",
+        autospec=True,
+    )
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment_api_key.key)
+
+    # When
+    response = api_client.post(
+        reverse("api-v1:sdk-identities-bulk"),
+        data={"identities": [{"identifier": f"identity-{i}"} for i in range(3)]},
+        format="json",
+    )
+    b"".join(response.streaming_content)  # type: ignore[attr-defined]
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    track_request_influxdb_mock.assert_called_once_with(
+        resource=Resource.IDENTITIES,
+        host="testserver",
+        environment=environment,
+        count=3,
+        labels={},
+    )
@@ -1,13 +1,15 @@
 from datetime import datetime, timedelta
 
 import pytest
+from django.db import connections
 from django.utils import timezone
 from freezegun.api import FrozenDateTimeFactory
-from pytest_django.fixtures import SettingsWrapper
+from pytest_django.fixtures import DjangoAssertNumQueries, SettingsWrapper
 from pytest_mock import MockerFixture
 
 from app_analytics.models import (
     APIUsageBucket,
+    APIUsageDailyRollup,
     APIUsageRaw,
     FeatureEvaluationBucket,
     FeatureEvaluationRaw,
@@ -19,9 +21,10 @@ from app_analytics.tasks import (
     populate_feature_evaluation_bucket,
     track_feature_evaluations_by_environment,
     track_request,
+    track_requests,
 )
 from app_analytics.types import TrackFeatureEvaluationsByEnvironmentData
-from environments.models import Environment
+from environments.models import Environment, EnvironmentAPIKey
 
 pytestmark = pytest.mark.use_analytics_db
 
@@ -205,6 +208,91 @@ def test_track_request__influx__calls_expected(
     )
 
 
+@pytest.mark.use_analytics_db
+def test_track_requests__postgres__inserts_expected(
+    settings: SettingsWrapper,
+    environment: Environment,
+    environment_api_key: EnvironmentAPIKey,
+) -> None:
+    # Given
+    settings.USE_POSTGRES_FOR_ANALYTICS = True
+
+    # When
+    track_requests(
+        requests=[
+            {
+                "resource": Resource.FLAGS.value,
+                "host": "testserver",
+                "environment_key": environment.api_key,
+                "count": 2,
+                "labels": {},
+            },
+            {
+                "resource": Resource.IDENTITIES.value,
+                "host": "testserver",
+                "environment_key": environment_api_key.key,
+                "count": 3,
+                "labels": {"client_application_name": "test-app"},
+            },
+            {
+                "resource": Resource.FLAGS.value,
+                "host": "testserver",
+                "environment_key": "unknown",
+                "count": 4,
+                "labels": {},
+            },
+        ]
+    )
+
+    # Then
+    assert sorted(
+        APIUsageRaw.objects.values_list("resource", "environment_id", "count", "labels")
+    ) == [
+        (Resource.FLAGS, environment.id, 2, {}),
+        (
+            Resource.IDENTITIES,
+            environment.id,
+            3,
+            {"client_application_name": "test-app"},
+        ),
+    ]
+
+
+def test_track_requests__influx__calls_expected(
+    db: None,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+    environment: Environment,
+) -> None:
+    # Given
+    settings.INFLUXDB_TOKEN = "test_token"
+    track_requests_influxdb_mock = mocker.patch(
+        "app_analytics.tasks.track_requests_influxdb",
+        autospec=True,
+    )
+
+    # When
+    track_requests(
+        requests=[
+            {
+                "resource": resource.value,
+                "host": "testserver",
+                "environment_key": environment.api_key,
+                "count": 1,
+                "labels": {},
+            }
+            for resource in (Resource.FLAGS, Resource.TRAITS)
+        ]
+    )
+
+    # Then
+    track_requests_influxdb_mock.assert_called_once()
+    assert list(track_requests_influxdb_mock.call_args.args[0]) == [
+        (Resource.FLAGS, "testserver", environment, 1, {}),
+        (Resource.TRAITS, "testserver", environment, 1, {}),
+    ]
+
+
 @pytest.mark.use_analytics_db
 def test_track_feature_evaluation(settings: SettingsWrapper) -> None:
     # Given
@@ -414,6 +502,36 @@ def test_populate_feature_evaluation_bucket__upserts_buckets(
     assert buckets[0].total_count == 2
 
 
+@pytest.mark.freeze_time("2023-01-19T09:00:00+00:00")
+@pytest.mark.use_analytics_db
+def test_populate_feature_evaluation_bucket__many_features__single_write_per_bucket(
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    # Given
+    environment_id = 1
+    bucket_size = 15
+    for i in range(40):
+        _create_feature_evaluation_event(
+            environment_id, f"feature_{i}", 1, timezone.now() - timedelta(minutes=5)
+        )
+
+    # When
+    # one query to aggregate the raw data, and one to upsert the buckets
+    with django_assert_num_queries(2, connection=connections["analytics"]):
+        populate_feature_evaluation_bucket(bucket_size=bucket_size, run_every=15)
+
+    # Then
+    assert (
+        FeatureEvaluationBucket.objects.filter(
+            environment_id=environment_id,
+            bucket_size=bucket_size,
+            created_at=timezone.now() - timedelta(minutes=15),
+            total_count=1,
+        ).count()
+        == 40
+    )
+
+
 @pytest.mark.freeze_time("2023-01-19T09:00:00+00:00")
 @pytest.mark.use_analytics_db
 def test_populate_feature_evaluation_bucket__source_bucket_size__returns_expected(
@@ -651,3 +769,67 @@ def test_clean_up_old_analytics_data_removes_old_data(
         new_feature_evaluation_bucket
     ]
     assert list(APIUsageBucket.objects.all()) == [new_api_usage_bucket]
+
+
+@pytest.mark.freeze_time("2023-01-19T09:09:47.325132+00:00")
+@pytest.mark.use_analytics_db
+def test_populate_api_usage_bucket__read_bucket_size__populates_daily_rollups(
+    environment: Environment,
+) -> None:
+    # Given
+    now = timezone.now()
+    for i in range(60):
+        _create_api_usage_event(environment.id, now - timedelta(minutes=i))
+    # environments which no longer exist aren't rolled up
+    _create_api_usage_event(999, now - timedelta(minutes=30))
+
+    # When
+    populate_api_usage_bucket(bucket_size=15, run_every=60)
+    # populating again replaces the rollups
+    populate_api_usage_bucket(bucket_size=15, run_every=60)
+
+    # Then
+    # the current, open, bucket is not populated yet
+    assert list(
+        APIUsageDailyRollup.objects.values(
+            "organisation_id", "day", "resource", "labels", "total_count"
+        )
+    ) == [
+        {
+            "organisation_id": environment.project.organisation_id,
+            "day": now.date(),
+            "resource": Resource.FLAGS,
+            "labels": {},
+            "total_count": 50,
+        }
+    ]
+
+
+@pytest.mark.freeze_time("2023-01-19T09:09:47.325132+00:00")
+@pytest.mark.use_analytics_db
+def test_populate_api_usage_bucket__read_bucket_size__only_updates_changed_rollups(
+    environment: Environment,
+    organisation_two_project_one_environment_one: Environment,
+) -> None:
+    # Given
+    now = timezone.now()
+    _create_api_usage_event(environment.id, now - timedelta(minutes=30))
+    unchanged_rollup = APIUsageDailyRollup.objects.create(
+        organisation_id=organisation_two_project_one_environment_one.project.organisation_id,
+        day=now.date(),
+        resource=Resource.FLAGS,
+        total_count=10,
+    )
+
+    # When
+    populate_api_usage_bucket(bucket_size=15, run_every=60)
+
+    # Then
+    assert (
+        APIUsageDailyRollup.objects.get(
+            organisation_id=environment.project.organisation_id
+        ).total_count
+        == 1
+    )
+    unchanged_rollup.refresh_from_db()
+    assert unchanged_rollup.total_count == 10
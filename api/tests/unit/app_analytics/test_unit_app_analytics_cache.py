@@ -1,107 +1,89 @@
-from django.utils import timezone
-from freezegun import freeze_time
+import threading
+
 from pytest_django.fixtures import SettingsWrapper
 from pytest_mock import MockerFixture
 
-from app_analytics.cache import APIUsageCache, FeatureEvaluationCache
+from app_analytics.cache import (
+    APIUsageCache,
+    CacheFlusher,
+    FeatureEvaluationCache,
+)
 from app_analytics.models import Resource
 from app_analytics.types import TrackFeatureEvaluationsByEnvironmentData
 
 
 def test_api_usage_cache(
     mocker: MockerFixture,
-    settings: SettingsWrapper,
 ) -> None:
     # Given
-    settings.API_USAGE_CACHE_SECONDS = 60
-
     cache = APIUsageCache()
-    now = timezone.now()
-    mocked_track_request_task = mocker.patch("app_analytics.cache.track_request")
+    mocked_track_requests = mocker.patch("app_analytics.cache.track_requests")
     host = "host"
     environment_key_1 = "environment_key_1"
     environment_key_2 = "environment_key_2"
 
-    with freeze_time(now) as frozen_time:
-        # Make some tracking requests
-        for _ in range(10):
-            for resource in Resource:
-                cache.track_request(
-                    resource=resource,
-                    host=host,
-                    environment_key=environment_key_1,
-                    labels={},
-                )
-                cache.track_request(
-                    resource=resource,
-                    host=host,
-                    environment_key=environment_key_2,
-                    labels={},
-                )
-
-        # make sure track_request task was not called
-        assert not mocked_track_request_task.called
-
-        # Now, let's move the time forward
-        frozen_time.tick(settings.API_USAGE_CACHE_SECONDS + 1)  # type: ignore[arg-type]
-
-        # let's track another request(to trigger flush)
-        cache.track_request(
-            resource=Resource.FLAGS,
-            host=host,
-            environment_key=environment_key_1,
-            labels={},
-        )
-
-        # Then - track request lambda was called for every resource and environment_key combination
-        expected_calls = []
+    # Make some tracking requests
+    for _ in range(10):
         for resource in Resource:
-            expected_calls.append(
-                mocker.call(
-                    kwargs={
-                        "resource": resource.value,
-                        "host": host,
-                        "environment_key": environment_key_1,
-                        "count": 11 if resource == Resource.FLAGS else 10,
-                        "labels": {},
-                    }
-                )
+            cache.track_request(
+                resource=resource,
+                host=host,
+                environment_key=environment_key_1,
+                labels={},
             )
-            expected_calls.append(
-                mocker.call(
-                    kwargs={
-                        "resource": resource.value,
-                        "host": host,
-                        "environment_key": environment_key_2,
-                        "count": 10,
-                        "labels": {},
-                    }
-                )
+            cache.track_request(
+                resource=resource,
+                host=host,
+                environment_key=environment_key_2,
+                labels={},
             )
-        mocked_track_request_task.run_in_thread.assert_has_calls(expected_calls)
+    cache.track_request(
+        resource=Resource.FLAGS,
+        host=host,
+        environment_key=environment_key_1,
+        labels={},
+    )
 
-        # Next, let's reset the mock
-        mocked_track_request_task.reset_mock()
+    # make sure nothing was written on the request path
+    assert not mocked_track_requests.called
 
-        # and track another request
-        cache.track_request(
-            resource=Resource.FLAGS,
-            host=host,
-            environment_key=environment_key_1,
-            labels={},
+    # When
+    cache.flush()
+
+    # Then - the data for every resource and environment_key combination
+    # was written at once
+    expected_requests = []
+    for resource in Resource:
+        expected_requests.append(
+            {
+                "resource": resource.value,
+                "host": host,
+                "environment_key": environment_key_1,
+                "count": 11 if resource == Resource.FLAGS else 10,
+                "labels": {},
+            }
+        )
+        expected_requests.append(
+            {
+                "resource": resource.value,
+                "host": host,
+                "environment_key": environment_key_2,
+                "count": 10,
+                "labels": {},
+            }
         )
+    mocked_track_requests.assert_called_once_with(requests=expected_requests)
 
-        # finally, make sure track_request task was not called
-        assert not mocked_track_request_task.called
+    # and flushing again doesn't write anything
+    mocked_track_requests.reset_mock()
+    cache.flush()
+    assert not mocked_track_requests.called
 
 
 def test_feature_evaluation_cache(
     mocker: MockerFixture,
-    settings: SettingsWrapper,
 ) -> None:
     # Given
-    settings.FEATURE_EVALUATION_CACHE_SECONDS = 60
-
     mocked_track_evaluation_task = mocker.patch(
         "app_analytics.cache.track_feature_evaluations_by_environment"
     )
@@ -111,105 +93,187 @@ def test_feature_evaluation_cache(
     feature_2_name = "feature_2_name"
 
     cache = FeatureEvaluationCache()
-    now = timezone.now()
-
-    with freeze_time(now) as frozen_time:
-        # Track some feature evaluations
-        for _ in range(10):
-            cache.track_feature_evaluation(
-                environment_id=environment_1_id,
-                feature_name=feature_1_name,
-                evaluation_count=1,
-                labels={},
-            )
-            cache.track_feature_evaluation(
-                environment_id=environment_1_id,
-                feature_name=feature_2_name,
-                evaluation_count=1,
-                labels={},
-            )
-            cache.track_feature_evaluation(
-                environment_id=environment_2_id,
-                feature_name=feature_2_name,
-                evaluation_count=1,
-                labels={},
-            )
 
-        # Now, let's move the time forward
-        frozen_time.tick(settings.FEATURE_EVALUATION_CACHE_SECONDS + 1)  # type: ignore[arg-type]
-
-        # track another evaluation(to trigger cache flush)
+    # Track some feature evaluations
+    for _ in range(10):
         cache.track_feature_evaluation(
             environment_id=environment_1_id,
             feature_name=feature_1_name,
             evaluation_count=1,
             labels={},
         )
-
         cache.track_feature_evaluation(
             environment_id=environment_1_id,
-            feature_name=feature_1_name,
+            feature_name=feature_2_name,
             evaluation_count=1,
-            labels={"client_application_name": "test-app"},
+            labels={},
         )
-
-        # move time forward again
-        frozen_time.tick(settings.FEATURE_EVALUATION_CACHE_SECONDS + 1)  # type: ignore[arg-type]
-
-        # track another one(to trigger cache flush)
         cache.track_feature_evaluation(
-            environment_id=environment_1_id,
-            feature_name=feature_1_name,
+            environment_id=environment_2_id,
+            feature_name=feature_2_name,
             evaluation_count=1,
             labels={},
         )
+    cache.track_feature_evaluation(
+        environment_id=environment_1_id,
+        feature_name=feature_1_name,
+        evaluation_count=1,
+        labels={},
+    )
+    assert not mocked_track_evaluation_task.delay.called
+
+    # When
+    cache.flush()
 
-        # Assert that the call was made with only the data tracked after the flush interval.
-        assert mocked_track_evaluation_task.delay.call_args_list == [
-            mocker.call(
-                kwargs={
-                    "environment_id": 1,
-                    "feature_evaluations": [
-                        TrackFeatureEvaluationsByEnvironmentData(
-                            feature_name="feature_1_name",
-                            labels={},
-                            evaluation_count=11,
-                        ),
-                        TrackFeatureEvaluationsByEnvironmentData(
-                            feature_name="feature_2_name",
-                            labels={},
-                            evaluation_count=10,
-                        ),
-                    ],
-                }
-            ),
-            mocker.call(
-                kwargs={
-                    "environment_id": 2,
-                    "feature_evaluations": [
-                        TrackFeatureEvaluationsByEnvironmentData(
-                            feature_name="feature_2_name",
-                            labels={},
-                            evaluation_count=10,
-                        )
-                    ],
-                }
-            ),
-            mocker.call(
-                kwargs={
-                    "environment_id": 1,
-                    "feature_evaluations": [
-                        TrackFeatureEvaluationsByEnvironmentData(
-                            feature_name="feature_1_name",
-                            labels={"client_application_name": "test-app"},
-                            evaluation_count=1,
-                        ),
-                        TrackFeatureEvaluationsByEnvironmentData(
-                            feature_name="feature_1_name",
-                            labels={},
-                            evaluation_count=1,
-                        ),
-                    ],
-                }
-            ),
-        ]
+    cache.track_feature_evaluation(
+        environment_id=environment_1_id,
+        feature_name=feature_1_name,
+        evaluation_count=1,
+        labels={"client_application_name": "test-app"},
+    )
+    cache.track_feature_evaluation(
+        environment_id=environment_1_id,
+        feature_name=feature_1_name,
+        evaluation_count=1,
+        labels={},
+    )
+    cache.flush()
+
+    # Then
+    # each flush only includes the data tracked since the previous one
+    assert mocked_track_evaluation_task.delay.call_args_list == [
+        mocker.call(
+            kwargs={
+                "environment_id": 1,
+                "feature_evaluations": [
+                    TrackFeatureEvaluationsByEnvironmentData(
+                        feature_name="feature_1_name",
+                        labels={},
+                        evaluation_count=11,
+                    ),
+                    TrackFeatureEvaluationsByEnvironmentData(
+                        feature_name="feature_2_name",
+                        labels={},
+                        evaluation_count=10,
+                    ),
+                ],
+            }
+        ),
+        mocker.call(
+            kwargs={
+                "environment_id": 2,
+                "feature_evaluations": [
+                    TrackFeatureEvaluationsByEnvironmentData(
+                        feature_name="feature_2_name",
+                        labels={},
+                        evaluation_count=10,
+                    )
+                ],
+            }
+        ),
+        mocker.call(
+            kwargs={
+                "environment_id": 1,
+                "feature_evaluations": [
+                    TrackFeatureEvaluationsByEnvironmentData(
+                        feature_name="feature_1_name",
+                        labels={"client_application_name": "test-app"},
+                        evaluation_count=1,
+                    ),
+                    TrackFeatureEvaluationsByEnvironmentData(
+                        feature_name="feature_1_name",
+                        labels={},
+                        evaluation_count=1,
+                    ),
+                ],
+            }
+        ),
+    ]
+
+
+def test_cache_flusher_ensure_running__flushes_periodically_and_at_exit(
+    db: None,
+    mocker: MockerFixture,
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.ANALYTICS_CACHE_FLUSH_IN_BACKGROUND = True
+    settings.ANALYTICS_CACHE_FLUSH_AT_EXIT = True
+    flushed_twice = threading.Event()
+
+    def flush() -> None:
+        if mocked_flush.call_count == 2:
+            flushed_twice.set()
+
+    def sleep(seconds: int) -> None:
+        # Park the (daemon) flusher thread once it's done its work.
+        if flushed_twice.is_set():
+            threading.Event().wait()
+
+    mocked_flush = mocker.Mock(side_effect=flush)
+    mocked_sleep = mocker.Mock(side_effect=sleep)
+    mocker.patch("app_analytics.cache.time", sleep=mocked_sleep)
+    mocked_atexit = mocker.patch("app_analytics.cache.atexit")
+    flusher = CacheFlusher(
+        name="test-flusher", flush=mocked_flush, get_interval_seconds=lambda: 30
+    )
+
+    # When
+    flusher.ensure_running()
+    flusher.ensure_running()
+
+    # Then
+    assert flushed_twice.wait(timeout=5)
+    mocked_sleep.assert_called_with(30)
+    mocked_atexit.register.assert_called_once_with(flusher.flush)
+
+
+def test_cache_flusher_ensure_running__background_flushing_disabled__flushes_inline(
+    db: None,
+    mocker: MockerFixture,
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.ANALYTICS_CACHE_FLUSH_IN_BACKGROUND = False
+    settings.ANALYTICS_CACHE_FLUSH_AT_EXIT = True
+    mocked_thread = mocker.patch("app_analytics.cache.Thread")
+    mocked_atexit = mocker.patch("app_analytics.cache.atexit")
+    mocked_time = mocker.patch("app_analytics.cache.time")
+    mocked_time.monotonic.return_value = 0
+    mocked_flush = mocker.Mock()
+    flusher = CacheFlusher(
+        name="test-flusher", flush=mocked_flush, get_interval_seconds=lambda: 30
+    )
+
+    # When
+    flusher.ensure_running()
+    mocked_time.monotonic.return_value = 30
+    flusher.ensure_running()
+    flusher.ensure_running()
+
+    # Then
+    # the cache is only flushed once its interval has elapsed
+    mocked_flush.assert_called_once_with()
+    mocked_thread.assert_not_called()
+    mocked_atexit.register.assert_called_once_with(flusher.flush)
+
+
+def test_cache_flusher_flush__error__logs_exception(
+    db: None,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mocked_logger = mocker.patch("app_analytics.cache.logger")
+    flusher = CacheFlusher(
+        name="test-flusher",
+        flush=mocker.Mock(side_effect=Exception("error")),
+        get_interval_seconds=lambda: 30,
+    )
+
+    # When
+    flusher.flush()
+
+    # Then
+    mocked_logger.exception.assert_called_once_with(
+        "Failed to flush %s.", "test-flusher"
+    )
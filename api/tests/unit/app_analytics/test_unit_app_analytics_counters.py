@@ -0,0 +1,47 @@
+import threading
+
+from app_analytics.counters import StripedCounter
+
+
+def test_striped_counter_drain__returns_merged_counts_and_resets() -> None:
+    # Given
+    counter = StripedCounter[str](stripes=4)
+    threads_count = 16
+    increments = 1000
+
+    def increment() -> None:
+        for _ in range(increments):
+            counter.increment("a")
+            counter.increment("b", 2)
+
+    threads = [threading.Thread(target=increment) for _ in range(threads_count)]
+
+    # When
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    drained = counter.drain()
+
+    # Then
+    assert drained == {
+        "a": threads_count * increments,
+        "b": 2 * threads_count * increments,
+    }
+    assert counter.drain() == {}
+
+
+def test_striped_counter_increment__spreads_threads_over_stripes() -> None:
+    # Given
+    counter = StripedCounter[str](stripes=4)
+
+    # When
+    threads = [
+        threading.Thread(target=counter.increment, args=("key",)) for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+        thread.join()
+
+    # Then
+    assert all(stripe.counts == {"key": 1} for stripe in counter._stripes)
@@ -1,5 +1,5 @@
-from datetime import date, datetime, timedelta
-from typing import Generator, Type
+from datetime import UTC, date, datetime, timedelta
+from typing import Generator
 from unittest import mock
 from unittest.mock import MagicMock
 
@@ -7,8 +7,6 @@ import pytest
 from _pytest.monkeypatch import MonkeyPatch
 from django.conf import settings
 from django.utils import timezone
-from influxdb_client.client.exceptions import InfluxDBError
-from influxdb_client.rest import ApiException
 from pytest_django.fixtures import SettingsWrapper
 from pytest_mock import MockerFixture
 from urllib3.exceptions import HTTPError
@@ -22,6 +20,7 @@ from app_analytics.influxdb_wrapper import (
     get_event_list_for_organisation,
     get_events_for_organisation,
     get_feature_evaluation_data,
+    get_influxdb_writer,
     get_multiple_event_list_for_feature,
     get_multiple_event_list_for_organisation,
     get_range_bucket_mappings,
@@ -48,15 +47,11 @@ def mock_influxdb_client(monkeypatch: Generator[MonkeyPatch, None, None]) -> Mag
     return mock_influxdb_client
 
 
-@pytest.fixture()
-def mock_write_api(mock_influxdb_client: MagicMock) -> MagicMock:
-    mock_write_api = mock.MagicMock()
-    mock_influxdb_client.write_api.return_value = mock_write_api
-    return mock_write_api
-
-
-def test_write(mock_write_api: MagicMock) -> None:
+def test_write__writes_records_with_influxdb_writer(mocker: MockerFixture) -> None:
     # Given
+    mocked_get_influxdb_writer = mocker.patch(
+        "app_analytics.influxdb_wrapper.get_influxdb_writer", autospec=True
+    )
     influxdb = InfluxDBWrapper("name")  # type: ignore[no-untyped-call]
     influxdb.add_data_point("field_name", "field_value")
 
@@ -64,27 +59,35 @@ def test_write(mock_write_api: MagicMock) -> None:
     influxdb.write()
 
     # Then
-    mock_write_api.write.assert_called()
+    mocked_get_influxdb_writer.return_value.write.assert_called_once_with(
+        influxdb.records
+    )
 
 
-@pytest.mark.parametrize("exception_class", [HTTPError, InfluxDBError, ApiException])
-def test_write_handles_errors(
-    mock_write_api: MagicMock,
-    exception_class: Type[Exception],
-    caplog: pytest.LogCaptureFixture,
+def test_get_influxdb_writer__returns_writer_per_process(
+    mocker: MockerFixture,
+    mock_influxdb_client: MagicMock,
 ) -> None:
     # Given
-    mock_write_api.write.side_effect = exception_class
-
-    influxdb = InfluxDBWrapper("name")  # type: ignore[no-untyped-call]
-    influxdb.add_data_point("field_name", "field_value")
+    mocker.patch("app_analytics.influxdb_wrapper._writer", None)
+    mocked_getpid = mocker.patch(
+        "app_analytics.influxdb_wrapper.os.getpid", return_value=1
+    )
+    mocked_atexit = mocker.patch("app_analytics.influxdb_wrapper.atexit")
 
     # When
-    influxdb.write()
+    writer = get_influxdb_writer()
+    same_process_writer = get_influxdb_writer()
+    mocked_getpid.return_value = 2
+    forked_process_writer = get_influxdb_writer()
 
     # Then
-    # The write API was called
-    mock_write_api.write.assert_called()
+    assert writer is same_process_writer
+    assert forked_process_writer is not writer
+    assert mock_influxdb_client.write_api.call_count == 2
+    mocked_atexit.register.assert_has_calls(
+        [mock.call(writer.close), mock.call(forked_process_writer.close)]
+    )
 
 
 def test_influx_db_wrapper_query__http_error__logs_expected(
@@ -688,3 +691,118 @@ def test_get_current_api_usage(mocker: MockerFixture) -> None:
 
     # Then
     assert result == 43
+
+
+def _get_flux_tables_for_days(
+    date_start: datetime, date_stop: datetime
+) -> list[MagicMock]:
+    # A record per day, with its value being the day of the month.
+    day_start = date_start
+    records = []
+    while day_start < date_stop:
+        records.append(
+            MagicMock(
+                values={
+                    "_time": day_start,
+                    "_value": day_start.day,
+                    "resource": "flags",
+                }
+            )
+        )
+        day_start = (day_start + timedelta(days=1)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+    return [MagicMock(records=records)]
+
+
+@pytest.mark.freeze_time("2023-01-19T09:09:47.325132+00:00")
+def test_get_multiple_event_list_for_organisation__overlapping_ranges__reads_closed_days_from_cache(
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mocked_query = mocker.patch(
+        "app_analytics.influxdb_wrapper.InfluxDBWrapper.query",
+        side_effect=lambda date_start, date_stop, **kwargs: _get_flux_tables_for_days(
+            date_start, date_stop
+        ),
+    )
+    now = timezone.now()
+    get_multiple_event_list_for_organisation(
+        org_id, date_start=now - timedelta(days=5), date_stop=now
+    )
+    mocked_query.reset_mock()
+
+    # When
+    result = get_multiple_event_list_for_organisation(
+        org_id, date_start=now - timedelta(days=7), date_stop=now
+    )
+
+    # Then
+    # only the days which weren't cached, and today, are queried
+    assert [
+        (call.kwargs["date_start"], call.kwargs["date_stop"])
+        for call in mocked_query.call_args_list
+    ] == [
+        (now - timedelta(days=7), datetime(2023, 1, 15, tzinfo=UTC)),
+        (datetime(2023, 1, 19, tzinfo=UTC), now),
+    ]
+    assert [(usage_data.day, usage_data.flags) for usage_data in result] == [
+        (date(2023, 1, day), day) for day in range(12, 20)
+    ]
+
+
+@pytest.mark.freeze_time("2023-01-19T09:09:47.325132+00:00")
+def test_get_multiple_event_list_for_feature__repeated__reads_closed_days_from_cache(
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mocked_query = mocker.patch(
+        "app_analytics.influxdb_wrapper.InfluxDBWrapper.query",
+        return_value=[],
+    )
+    get_multiple_event_list_for_feature(env_id, feature_name)
+    mocked_query.reset_mock()
+
+    # When
+    get_multiple_event_list_for_feature(env_id, feature_name)
+
+    # Then
+    # the start of the first day, which isn't over, and today are queried
+    assert [
+        (call.kwargs["date_start"], call.kwargs["date_stop"])
+        for call in mocked_query.call_args_list
+    ] == [
+        (
+            datetime.fromisoformat("2022-12-20T09:09:47.325132+00:00"),
+            datetime(2022, 12, 21, tzinfo=UTC),
+        ),
+        (
+            datetime(2023, 1, 19, tzinfo=UTC),
+            datetime.fromisoformat("2023-01-19T09:09:47.325132+00:00"),
+        ),
+    ]
+
+
+@pytest.mark.freeze_time("2023-01-19T09:09:47.325132+00:00")
+def test_get_multiple_event_list_for_organisation__http_error__does_not_cache(
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mocked_query = mocker.patch(
+        "app_analytics.influxdb_wrapper.InfluxDBWrapper.query",
+        side_effect=HTTPError("HTTP error occurred"),
+    )
+    capture_exception_mock = mocker.patch(
+        "app_analytics.influxdb_wrapper.capture_exception",
+        autospec=True,
+    )
+
+    # When
+    first_result = get_multiple_event_list_for_organisation(org_id)
+    second_result = get_multiple_event_list_for_organisation(org_id)
+
+    # Then
+    assert first_result == second_result == []
+    assert capture_exception_mock.call_count == 2
+    # the whole range is queried each time
+    assert mocked_query.call_count == 2
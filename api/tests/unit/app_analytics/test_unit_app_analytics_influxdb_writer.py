@@ -0,0 +1,164 @@
+from unittest.mock import MagicMock
+
+import pytest
+from common.test_tools import AssertMetricFixture
+from influxdb_client import Point
+from influxdb_client.client.exceptions import InfluxDBError
+from influxdb_client.client.write_api import SYNCHRONOUS
+from pytest_mock import MockerFixture
+
+from app_analytics.influxdb_writer import InfluxDBWriter
+
+
+@pytest.fixture()
+def influxdb_client() -> MagicMock:
+    return MagicMock()
+
+
+@pytest.fixture()
+def influxdb_writer(influxdb_client: MagicMock) -> InfluxDBWriter:
+    return InfluxDBWriter(
+        client=influxdb_client,
+        bucket="bucket",
+        batch_size=2,
+        flush_interval_ms=100,
+        max_queue_size=3,
+    )
+
+
+def _get_callback(influxdb_client: MagicMock, name: str) -> MagicMock:
+    return influxdb_client.write_api.call_args.kwargs[name]  # type: ignore[no-any-return]
+
+
+def test_influxdb_writer__creates_batching_write_api(
+    influxdb_writer: InfluxDBWriter,
+    influxdb_client: MagicMock,
+) -> None:
+    # Then
+    write_options = influxdb_client.write_api.call_args.kwargs["write_options"]
+    assert write_options.batch_size == 2
+    assert write_options.flush_interval == 100
+
+
+def test_influxdb_writer_write__queues_records_until_written(
+    influxdb_writer: InfluxDBWriter,
+    influxdb_client: MagicMock,
+    assert_metric: AssertMetricFixture,
+) -> None:
+    # Given
+    records = [Point("name").field("field", 1), Point("name").field("field", 2)]
+
+    # When
+    queued = influxdb_writer.write(records)
+
+    # Then
+    assert queued is True
+    influxdb_client.write_api.return_value.write.assert_called_once_with(
+        bucket="bucket", record=records
+    )
+    assert influxdb_writer.queued == 2
+    assert_metric(
+        name="flagsmith_influxdb_writer_queued_records",
+        labels={"bucket": "bucket"},
+        value=2.0,
+    )
+
+    # and once the batch is written, it's no longer queued
+    _get_callback(influxdb_client, "success_callback")(
+        ("bucket", "org", "ns"), b"name field=1i\nname field=2i"
+    )
+    assert influxdb_writer.queued == 0
+    assert_metric(
+        name="flagsmith_influxdb_writer_queued_records",
+        labels={"bucket": "bucket"},
+        value=0.0,
+    )
+
+
+def test_influxdb_writer_write__queue_full__drops_records(
+    mocker: MockerFixture,
+    influxdb_writer: InfluxDBWriter,
+    influxdb_client: MagicMock,
+) -> None:
+    # Given
+    mocked_logger = mocker.patch("app_analytics.influxdb_writer.logger")
+    influxdb_writer.write([Point("name").field("field", 1)] * 2)
+
+    # When
+    queued = influxdb_writer.write([Point("name").field("field", 1)] * 2)
+
+    # Then
+    assert queued is False
+    assert influxdb_client.write_api.return_value.write.call_count == 1
+    assert influxdb_writer.queued == 2
+    mocked_logger.warning.assert_called_once_with(
+        "InfluxDB writer queue is full. Dropped %d records.", 2
+    )
+
+
+def test_influxdb_writer__write_failed__logs_and_dequeues_records(
+    mocker: MockerFixture,
+    influxdb_writer: InfluxDBWriter,
+    influxdb_client: MagicMock,
+) -> None:
+    # Given
+    mocked_logger = mocker.patch("app_analytics.influxdb_writer.logger")
+    influxdb_writer.write([Point("name").field("field", 1)])
+    exception = InfluxDBError(message="Failed")
+
+    # When
+    _get_callback(influxdb_client, "error_callback")(
+        ("bucket", "org", "ns"), "name field=1i", exception
+    )
+
+    # Then
+    assert influxdb_writer.queued == 0
+    mocked_logger.warning.assert_called_once_with(
+        "Failed to write %d records to Influx: %s",
+        1,
+        "Failed",
+        exc_info=exception,
+    )
+
+
+def test_influxdb_writer_close__closes_write_api(
+    influxdb_writer: InfluxDBWriter,
+    influxdb_client: MagicMock,
+) -> None:
+    # When
+    influxdb_writer.close()
+
+    # Then
+    influxdb_client.write_api.return_value.close.assert_called_once_with()
+
+
+def test_influxdb_writer_write_synchronously__writes_records(
+    influxdb_writer: InfluxDBWriter,
+    influxdb_client: MagicMock,
+) -> None:
+    # Given
+    records = [Point("name").field("field", 1)]
+
+    # When
+    influxdb_writer.write_synchronously(records)
+
+    # Then
+    assert influxdb_client.write_api.call_args.kwargs["write_options"] is SYNCHRONOUS
+    influxdb_client.write_api.return_value.write.assert_called_once_with(
+        bucket="bucket", record=records
+    )
+    assert influxdb_writer.queued == 0
+
+
+def test_influxdb_writer_write_synchronously__write_failed__raises(
+    influxdb_writer: InfluxDBWriter,
+    influxdb_client: MagicMock,
+) -> None:
+    # Given
+    influxdb_client.write_api.return_value.write.side_effect = InfluxDBError(
+        message="Failed"
+    )
+
+    # When / Then
+    with pytest.raises(InfluxDBError):
+        influxdb_writer.write_synchronously([Point("name").field("field", 1)])
@@ -0,0 +1,195 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connections
+from django.utils import timezone
+from freezegun.api import FrozenDateTimeFactory
+from pytest_django.fixtures import SettingsWrapper
+
+from app_analytics.models import APIUsageBucket, APIUsageRaw, Resource
+from app_analytics.partitions import (
+    PARTITIONED_TABLES,
+    PartitionedTable,
+    is_partitioned,
+    maintain_partitions,
+    partition_table,
+)
+from app_analytics.tasks import (
+    clean_up_old_analytics_data,
+    populate_api_usage_bucket,
+)
+
+pytestmark = pytest.mark.use_analytics_db
+
+api_usage_raw_table, _, api_usage_bucket_table, _ = PARTITIONED_TABLES
+
+
+def _get_partition_names(table: PartitionedTable) -> list[str]:
+    with connections["analytics"].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+            ORDER BY c.relname
+            """,
+            [table.name],
+        )
+        return [name for (name,) in cursor.fetchall()]
+
+
+def _create_api_usage_raw(**kwargs: object) -> APIUsageRaw:
+    return APIUsageRaw.objects.create(
+        environment_id=1, host="host", resource=Resource.FLAGS, **kwargs
+    )
+
+
+@pytest.mark.freeze_time("2023-01-19T09:09:47+00:00")
+def test_partition_table__attaches_existing_rows_and_creates_partitions() -> None:
+    # Given
+    existing = _create_api_usage_raw()
+
+    # When
+    partition_table(api_usage_raw_table)
+
+    # Then
+    assert is_partitioned(api_usage_raw_table)
+    assert _get_partition_names(api_usage_raw_table) == [
+        "app_analytics_apiusageraw_default",
+        "app_analytics_apiusageraw_legacy",
+        # the legacy partition holds everything until the end of the day
+        *(f"app_analytics_apiusageraw_p202301{day}" for day in range(20, 27)),
+    ]
+
+    # and rows are read and written through the partitioned table
+    created = _create_api_usage_raw()
+    assert created.id > existing.id
+    assert list(APIUsageRaw.objects.order_by("id")) == [existing, created]
+
+
+def test_is_partitioned__not_partitioned__returns_false() -> None:
+    # When / Then
+    assert not is_partitioned(api_usage_raw_table)
+
+
+@pytest.mark.freeze_time("2023-01-19T09:09:47+00:00")
+def test_maintain_partitions__drops_expired_partitions(
+    freezer: FrozenDateTimeFactory,
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.RAW_ANALYTICS_DATA_RETENTION_DAYS = 5
+    old = _create_api_usage_raw()
+    partition_table(api_usage_raw_table)
+
+    freezer.move_to(timezone.now() + timedelta(days=3))
+    recent = _create_api_usage_raw()
+
+    # When
+    freezer.move_to(timezone.now() + timedelta(days=3))
+    maintain_partitions()
+
+    # Then
+    partition_names = _get_partition_names(api_usage_raw_table)
+    # the legacy partition only held rows from before 2023-01-20, which have
+    # all expired, while the partitions after it still hold unexpired rows
+    assert "app_analytics_apiusageraw_legacy" not in partition_names
+    assert partition_names[1] == "app_analytics_apiusageraw_p20230120"
+    assert partition_names[-1] == "app_analytics_apiusageraw_p20230201"
+    assert list(APIUsageRaw.objects.all()) == [recent]
+    assert not APIUsageRaw.objects.filter(id=old.id).exists()
+
+
+def test_maintain_partitions__not_partitioned__does_nothing() -> None:
+    # Given
+    _create_api_usage_raw(created_at=timezone.now() - timedelta(days=365))
+
+    # When
+    maintain_partitions()
+
+    # Then
+    assert APIUsageRaw.objects.count() == 1
+    assert not any(is_partitioned(table) for table in PARTITIONED_TABLES)
+
+
+@pytest.mark.freeze_time("2023-01-19T09:09:47+00:00")
+def test_partition_table__bucket_table__buckets_are_upserted() -> None:
+    # Given
+    partition_table(api_usage_raw_table)
+    partition_table(api_usage_bucket_table)
+    raw = _create_api_usage_raw()
+    APIUsageRaw.objects.filter(id=raw.id).update(
+        created_at=timezone.now() - timedelta(minutes=20)
+    )
+
+    # When
+    populate_api_usage_bucket(bucket_size=15, run_every=60)
+    populate_api_usage_bucket(bucket_size=15, run_every=60)
+
+    # Then
+    # weekly partitions start on Mondays
+    assert _get_partition_names(api_usage_bucket_table)[-1] == (
+        "app_analytics_apiusagebucket_p20230213"
+    )
+    bucket = APIUsageBucket.objects.get()
+    assert bucket.total_count == 1
+
+
+@pytest.mark.freeze_time("2023-01-19T09:09:47+00:00")
+def test_maintain_partitions__rows_in_default_partition__moved_or_expired(
+    freezer: FrozenDateTimeFactory,
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.RAW_ANALYTICS_DATA_RETENTION_DAYS = 5
+    partition_table(api_usage_raw_table)
+
+    # rows are written to the default partition once the partitions which were
+    # created ahead of time have run out
+    freezer.move_to(timezone.now() + timedelta(days=10))
+    expired = _create_api_usage_raw()
+    freezer.move_to(timezone.now() + timedelta(days=10))
+    recent = _create_api_usage_raw()
+
+    # When
+    maintain_partitions()
+
+    # Then
+    # the partition for the recent row was created, and the row moved to it
+    partition_names = _get_partition_names(api_usage_raw_table)
+    assert "app_analytics_apiusageraw_p20230208" in partition_names
+    with connections["analytics"].cursor() as cursor:
+        cursor.execute(
+            f'SELECT count(*) FROM "{api_usage_raw_table.default_partition_name}"'
+        )
+        assert cursor.fetchone()[0] == 0
+    # and the expired row was deleted from the default partition
+    assert list(APIUsageRaw.objects.all()) == [recent]
+    assert not APIUsageRaw.objects.filter(id=expired.id).exists()
+
+
+@pytest.mark.freeze_time("2023-01-19T09:09:47+00:00")
+def test_clean_up_old_analytics_data__partitioned_table__does_not_delete_rows(
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.RAW_ANALYTICS_DATA_RETENTION_DAYS = 5
+    settings.BUCKETED_ANALYTICS_DATA_RETENTION_DAYS = 5
+    old_raw = _create_api_usage_raw(created_at=timezone.now() - timedelta(days=10))
+    APIUsageBucket.objects.create(
+        environment_id=1,
+        resource=Resource.FLAGS,
+        total_count=1,
+        created_at=timezone.now() - timedelta(days=10),
+        bucket_size=15,
+    )
+    partition_table(api_usage_raw_table)
+
+    # When
+    clean_up_old_analytics_data()
+
+    # Then
+    # the partitioned table's rows are left to be dropped with their partition
+    assert list(APIUsageRaw.objects.all()) == [old_raw]
+    # while the rows of the tables which aren't partitioned are deleted
+    assert not APIUsageBucket.objects.exists()
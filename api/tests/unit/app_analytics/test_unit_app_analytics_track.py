@@ -8,6 +8,7 @@ from app_analytics.track import (
     track_feature_evaluation_influxdb,
     track_request_googleanalytics,
     track_request_influxdb,
+    track_requests_influxdb,
 )
 from app_analytics.types import TrackFeatureEvaluationsByEnvironmentData
 
@@ -171,3 +172,41 @@ def test_track_feature_evaluation_influxdb(mocker: MockerFixture) -> None:
         ),
     ]
     influx_db_wrapper_mock.write.assert_called_once()
+
+
+def test_track_requests_influxdb__writes_all_requests_in_single_write(
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mock_influxdb = mocker.patch("app_analytics.track.InfluxDBWrapper")
+    mock_environment = mocker.MagicMock()
+
+    # When
+    track_requests_influxdb(
+        [
+            (Resource.FLAGS, "testserver", mock_environment, 2, {}),
+            (Resource.IDENTITIES, "testserver", mock_environment, 3, {}),
+        ]
+    )
+
+    # Then
+    mock_influxdb.assert_called_once_with("api_call")
+    assert [
+        (call.args[1], call.kwargs["tags"]["resource"])
+        for call in mock_influxdb.return_value.add_data_point.call_args_list
+    ] == [(2, "flags"), (3, "identities")]
+    mock_influxdb.return_value.write.assert_called_once_with()
+
+
+def test_track_requests_influxdb__no_requests__does_not_write(
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mock_influxdb = mocker.patch("app_analytics.track.InfluxDBWrapper")
+    mock_influxdb.return_value.records = []
+
+    # When
+    track_requests_influxdb([])
+
+    # Then
+    mock_influxdb.return_value.write.assert_not_called()
@@ -59,6 +59,35 @@ def test_sdk_analytics_ignores_bad_data(
     )
 
 
+def test_sdk_analytics__invalid_count__tracks_nothing(
+    mocker: MockerFixture,
+    environment: Environment,
+    feature: Feature,
+    api_client: APIClient,
+) -> None:
+    # Given
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment.api_key)
+    another_feature = Feature.objects.create(
+        project=environment.project, name="another_feature"
+    )
+
+    data = {feature.name: 2, another_feature.name: "not-a-number"}
+    mocked_feature_eval_cache = mocker.patch(
+        "app_analytics.views.feature_evaluation_cache"
+    )
+
+    url = reverse("api-v1:analytics-flags")
+
+    # When
+    response = api_client.post(
+        url, data=json.dumps(data), content_type="application/json"
+    )
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    mocked_feature_eval_cache.track_feature_evaluation.assert_not_called()
+
+
 def test_get_usage_data(mocker, admin_client, organisation):  # type: ignore[no-untyped-def]
     # Given
     url = reverse("api-v1:organisations:usage-data", args=[organisation.id])
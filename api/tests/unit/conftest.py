@@ -1,6 +1,8 @@
+import typing
 from unittest.mock import MagicMock
 
 import pytest
+from django.conf import settings
 from django.core.cache import BaseCache, caches
 from django.core.cache.backends.locmem import LocMemCache
 from pytest_django.fixtures import SettingsWrapper
@@ -237,7 +239,9 @@ def populate_environment_document_cache(
 
 
 @pytest.fixture()
-def use_local_mem_cache_for_cache_middleware(mocker: MockerFixture) -> None:
+def use_local_mem_cache_for_cache_middleware(
+    mocker: MockerFixture,
+) -> typing.Generator[None, None, None]:
     # Ensure the default cache is LocMemCache
     default_cache = caches["default"]
     assert isinstance(default_cache, LocMemCache)
@@ -255,6 +259,17 @@ def use_local_mem_cache_for_cache_middleware(mocker: MockerFixture) -> None:
 
     mocker.patch.object(CacheMiddleware, "__init__", custom_init)
 
+    # Keep the environments' cache generations in the same cache
+    endpoint_cache_names = (
+        settings.GET_FLAGS_ENDPOINT_CACHE_NAME,
+        settings.GET_IDENTITIES_ENDPOINT_CACHE_NAME,
+    )
+    for cache_name in endpoint_cache_names:
+        caches[cache_name] = default_cache
+    yield
+    for cache_name in endpoint_cache_names:
+        del caches[cache_name]
+
 
 @pytest.fixture()
 def system_segment(project: Project) -> Segment:
@@ -0,0 +1,219 @@
+import threading
+import typing
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from pytest_django.fixtures import SettingsWrapper
+from pytest_mock import MockerFixture
+
+from core.cache import SingleFlight, VersionedLRUCache, coalesce_cache_rebuild
+
+
+def test_versioned_lru_cache__get__returns_value_for_matching_version() -> None:
+    # Given
+    cache: VersionedLRUCache[str, str] = VersionedLRUCache(max_entries=10)
+    cache.set("key", 1, "value")
+
+    # When
+    result = cache.get("key", 1)
+
+    # Then
+    assert result == "value"
+
+
+def test_versioned_lru_cache__get__evicts_entry_for_different_version() -> None:
+    # Given
+    cache: VersionedLRUCache[str, str] = VersionedLRUCache(max_entries=10)
+    cache.set("key", 1, "value")
+
+    # When
+    result = cache.get("key", 2)
+
+    # Then
+    assert result is None
+    assert len(cache) == 0
+
+
+def test_versioned_lru_cache__set__evicts_least_recently_used_entry() -> None:
+    # Given
+    cache: VersionedLRUCache[str, str] = VersionedLRUCache(max_entries=2)
+    cache.set("a", 1, "a")
+    cache.set("b", 1, "b")
+    cache.get("a", 1)
+
+    # When
+    cache.set("c", 1, "c")
+
+    # Then
+    assert cache.get("a", 1) == "a"
+    assert cache.get("b", 1) is None
+    assert cache.get("c", 1) == "c"
+
+
+def test_versioned_lru_cache__set__does_nothing_when_disabled() -> None:
+    # Given
+    cache: VersionedLRUCache[str, str] = VersionedLRUCache(max_entries=0)
+
+    # When
+    cache.set("key", 1, "value")
+
+    # Then
+    assert cache.get("key", 1) is None
+
+
+def test_versioned_lru_cache__get_or_set__only_calls_default_on_miss() -> None:
+    # Given
+    cache: VersionedLRUCache[str, str] = VersionedLRUCache(max_entries=10)
+    calls = []
+
+    def default() -> str:
+        calls.append(1)
+        return "value"
+
+    # When
+    results = [
+        cache.get_or_set("key", 1, default),
+        cache.get_or_set("key", 1, default),
+        cache.get_or_set("key", 2, default),
+    ]
+
+    # Then
+    assert results == ["value"] * 3
+    assert len(calls) == 2
+
+
+def test_single_flight_do__concurrent_calls__only_calls_function_once() -> None:
+    # Given
+    single_flight: SingleFlight[str, str] = SingleFlight()
+    leader_started = threading.Event()
+    release_leader = threading.Event()
+    calls = []
+
+    def build() -> str:
+        calls.append(1)
+        leader_started.set()
+        release_leader.wait(timeout=5)
+        return "value"
+
+    results: list[str] = []
+    leader = threading.Thread(
+        target=lambda: results.append(single_flight.do("key", build))
+    )
+    leader.start()
+    leader_started.wait(timeout=5)
+
+    followers = [
+        threading.Thread(target=lambda: results.append(single_flight.do("key", build)))
+        for _ in range(3)
+    ]
+    for follower in followers:
+        follower.start()
+
+    # When
+    release_leader.set()
+    for thread in (leader, *followers):
+        thread.join(timeout=5)
+
+    # Then
+    assert results == ["value"] * 4
+    assert len(calls) == 1
+
+
+def test_single_flight_do__function_raises__raises_for_every_caller() -> None:
+    # Given
+    single_flight: SingleFlight[str, str] = SingleFlight()
+
+    def build() -> str:
+        raise ValueError("failed")
+
+    # When
+    with pytest.raises(ValueError):
+        single_flight.do("key", build)
+
+    # Then
+    # the failed call is not remembered
+    assert single_flight.do("key", lambda: "value") == "value"
+
+
+@pytest.fixture()
+def cache() -> typing.Generator[LocMemCache, None, None]:
+    cache = LocMemCache(name="test-coalesce-cache-rebuild", params={})
+    yield cache
+    cache.clear()
+
+
+def test_coalesce_cache_rebuild__value_written_since_miss__does_not_rebuild(
+    cache: LocMemCache,
+) -> None:
+    # Given
+    cache.set("key", "cached")
+
+    # When
+    result: str = coalesce_cache_rebuild(
+        cache, "key", lambda: pytest.fail("rebuilt"), SingleFlight()
+    )
+
+    # Then
+    assert result == "cached"
+
+
+def test_coalesce_cache_rebuild__lock_held_elsewhere__waits_for_value(
+    cache: LocMemCache,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    settings.CACHE_REBUILD_LOCK_SECONDS = 5
+    cache.add("rebuild-lock:key", True)
+
+    # another worker writes the value while we are waiting for it
+    sleep = mocker.patch("core.cache.time.sleep")
+    sleep.side_effect = lambda _: cache.set("key", "rebuilt elsewhere")
+
+    # When
+    result: str = coalesce_cache_rebuild(
+        cache, "key", lambda: pytest.fail("rebuilt"), SingleFlight()
+    )
+
+    # Then
+    assert result == "rebuilt elsewhere"
+    sleep.assert_called_once()
+
+
+def test_coalesce_cache_rebuild__lock_not_released__rebuilds_after_timeout(
+    cache: LocMemCache,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    settings.CACHE_REBUILD_LOCK_SECONDS = 1
+    cache.add("rebuild-lock:key", True)
+
+    mocker.patch("core.cache.time.sleep")
+    mocker.patch("core.cache.time.monotonic", side_effect=[0, 0.5, 2])
+
+    # When
+    result = coalesce_cache_rebuild(cache, "key", lambda: "rebuilt", SingleFlight())
+
+    # Then
+    assert result == "rebuilt"
+
+
+def test_coalesce_cache_rebuild__lock_acquired__rebuilds_and_releases_lock(
+    cache: LocMemCache,
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.CACHE_REBUILD_LOCK_SECONDS = 5
+
+    def rebuild() -> str:
+        assert cache.get("rebuild-lock:key") is True
+        cache.set("key", "rebuilt")
+        return "rebuilt"
+
+    # When
+    result = coalesce_cache_rebuild(cache, "key", rebuild, SingleFlight())
+
+    # Then
+    assert result == "rebuilt"
+    assert cache.get("rebuild-lock:key") is None
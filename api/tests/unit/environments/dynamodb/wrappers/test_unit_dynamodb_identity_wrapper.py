@@ -1,9 +1,11 @@
 import typing
+from datetime import timedelta
 from decimal import Decimal
 
 import pytest
 from boto3.dynamodb.conditions import Key
 from django.core.exceptions import ObjectDoesNotExist
+from django.utils import timezone
 from flag_engine.identities.models import IdentityModel
 from flag_engine.segments.constants import IN
 from mypy_boto3_dynamodb.service_resource import Table
@@ -436,6 +438,101 @@ def test_get_segment_ids_with_identity_model(identity, environment, mocker):  #
     assert segment_ids == []
 
 
+def test_get_segment_ids__called_twice__retrieves_environment_document_once(
+    environment: "Environment",
+    identity: Identity,
+    identity_matching_segment: Segment,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    identity_model = IdentityModel.model_validate(
+        map_identity_to_identity_document(identity)
+    )
+    dynamo_identity_wrapper = DynamoIdentityWrapper()
+
+    mocked_environment_wrapper = mocker.patch(
+        "environments.dynamodb.wrappers.identity_wrapper.DynamoEnvironmentWrapper"
+    )
+    mocked_environment_wrapper.return_value.get_item.return_value = (
+        map_environment_to_environment_document(environment)
+    )
+
+    # When
+    dynamo_identity_wrapper.get_segment_ids(identity_model=identity_model)
+    segment_ids = dynamo_identity_wrapper.get_segment_ids(identity_model=identity_model)
+
+    # Then
+    assert segment_ids == [identity_matching_segment.id]
+    mocked_environment_wrapper.return_value.get_item.assert_called_once_with(
+        environment.api_key
+    )
+
+
+def test_get_segment_ids__environment_updated__retrieves_environment_document_again(
+    environment: "Environment",
+    identity: Identity,
+    identity_matching_segment: Segment,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    identity_model = IdentityModel.model_validate(
+        map_identity_to_identity_document(identity)
+    )
+    dynamo_identity_wrapper = DynamoIdentityWrapper()
+
+    mocked_environment_wrapper = mocker.patch(
+        "environments.dynamodb.wrappers.identity_wrapper.DynamoEnvironmentWrapper"
+    )
+    mocked_environment_wrapper.return_value.get_item.return_value = (
+        map_environment_to_environment_document(environment)
+    )
+    dynamo_identity_wrapper.get_segment_ids(identity_model=identity_model)
+
+    # the environment's segment is updated so that the identity no longer matches
+    Condition.objects.filter(rule__segment=identity_matching_segment).update(
+        value="other value"
+    )
+    environment.updated_at = timezone.now()
+    environment.save()
+    mocked_environment_wrapper.return_value.get_item.return_value = (
+        map_environment_to_environment_document(environment)
+    )
+
+    # When
+    segment_ids = dynamo_identity_wrapper.get_segment_ids(identity_model=identity_model)
+
+    # Then
+    assert segment_ids == []
+    assert mocked_environment_wrapper.return_value.get_item.call_count == 2
+
+
+def test_get_segment_ids__environment_document_outdated__retrieves_it_again(
+    environment: "Environment",
+    identity: Identity,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    identity_model = IdentityModel.model_validate(
+        map_identity_to_identity_document(identity)
+    )
+    dynamo_identity_wrapper = DynamoIdentityWrapper()
+
+    # the environment document hasn't been rewritten since the environment changed
+    environment_document = map_environment_to_environment_document(environment)
+    environment_document["updated_at"] = environment.updated_at - timedelta(minutes=1)
+    mocked_environment_wrapper = mocker.patch(
+        "environments.dynamodb.wrappers.identity_wrapper.DynamoEnvironmentWrapper"
+    )
+    mocked_environment_wrapper.return_value.get_item.return_value = environment_document
+
+    # When
+    dynamo_identity_wrapper.get_segment_ids(identity_model=identity_model)
+    dynamo_identity_wrapper.get_segment_ids(identity_model=identity_model)
+
+    # Then
+    assert mocked_environment_wrapper.return_value.get_item.call_count == 2
+
+
 def test_identity_wrapper__iter_all_items_paginated__returns_expected(
     identity: "Identity",
     mocker: "MockerFixture",
@@ -3,6 +3,7 @@ from unittest import mock
 
 from environments.identities.helpers import (
     get_hashed_percentage_for_object_ids,
+    get_hashed_percentages_for_object_ids,
 )
 
 
@@ -97,6 +98,7 @@ def test_get_hashed_percentage_does_not_return_1(mock_hashlib):  # type: ignore[
 
     mock_hash = mock.MagicMock()
     mock_hashlib.md5.return_value = mock_hash
+    mock_hash.copy.return_value = mock_hash
 
     mock_hash.hexdigest.side_effect = hexdigest_side_effect
 
@@ -114,11 +116,56 @@ def test_get_hashed_percentage_does_not_return_1(mock_hashlib):  # type: ignore[
     # (i.e. the get_hashed_percentage_for_object_ids function was also called twice)
     call_list = mock_hashlib.md5.call_args_list
     assert len(call_list) == 2
+    # each hash is of the string up to the last object id, updated with the last
+    hashed_bytes = [
+        md5_call[0][0] + update_call[0][0]
+        for md5_call, update_call in zip(call_list, mock_hash.update.call_args_list)
+    ]
 
     # the first call, with a string (in bytes) that contains each object id once
     expected_bytes_1 = ",".join(str(id_) for id_ in object_ids).encode("utf-8")
-    assert call_list[0][0][0] == expected_bytes_1
+    assert hashed_bytes[0] == expected_bytes_1
 
     # the second call, with a string (in bytes) that contains each object id twice
     expected_bytes_2 = ",".join(str(id_) for id_ in object_ids * 2).encode("utf-8")
-    assert call_list[1][0][0] == expected_bytes_2
+    assert hashed_bytes[1] == expected_bytes_2
+
+
+def test_get_hashed_percentages_for_object_ids_returns_same_values_as_single_pair() -> (
+    None
+):
+    # Given
+    object_ids = [12, 93, 1004]
+    identity_keys: list[str | int] = ["identity-1", "identity-2", 3, "🎉"]
+
+    # When
+    values = get_hashed_percentages_for_object_ids(object_ids, identity_keys)
+
+    # Then
+    assert values == [
+        [
+            get_hashed_percentage_for_object_ids([object_id, identity_key])
+            for identity_key in identity_keys
+        ]
+        for object_id in object_ids
+    ]
+
+
+@mock.patch("environments.identities.helpers.get_hashed_percentage_for_object_ids")
+@mock.patch("environments.identities.helpers._get_hashed_percentage")
+def test_get_hashed_percentages_for_object_ids_does_not_return_1(
+    mock_get_hashed_percentage: mock.MagicMock,
+    mock_get_hashed_percentage_for_object_ids: mock.MagicMock,
+) -> None:
+    # Given
+    mock_get_hashed_percentage.side_effect = [0.5, 1]
+    mock_get_hashed_percentage_for_object_ids.return_value = 0.25
+
+    # When
+    values = get_hashed_percentages_for_object_ids([1], ["first", "second"])
+
+    # Then
+    assert values == [[0.5, 0.25]]
+    mock_get_hashed_percentage_for_object_ids.assert_called_once_with(
+        [1, "second"], iterations=2
+    )
@@ -792,13 +792,13 @@ def test_get_identity_segments(
 
     # When
     # we get the matching segments for an identity
-    with django_assert_num_queries(7):
+    with django_assert_num_queries(4):
         segments = identity.get_segments()
 
     # Then
     # the number of queries are what we expect (see above context manager) and
     # the segment is returned
-    assert len(segments) == 1 and segments[0] == segment
+    assert len(segments) == 1 and segments[0].id == segment.id
 
 
 def test_get_segments_with_overrides_only_only_returns_segments_overridden_in_environment(
@@ -843,7 +843,7 @@ def test_get_segments_with_overrides_only_only_returns_segments_overridden_in_en
 
     # Then
     assert len(identity_segments) == 1
-    assert identity_segments[0] == segment_1
+    assert identity_segments[0].id == segment_1.id
 
 
 def test_get_all_feature_states_does_not_return_null_versions(
@@ -8,11 +8,15 @@ from common.environments.permissions import (
     MANAGE_IDENTITIES,
     VIEW_IDENTITIES,
 )
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from flag_engine.segments.constants import PERCENTAGE_SPLIT
 from pytest_django import DjangoAssertNumQueries
+from pytest_django.fixtures import SettingsWrapper
+from pytest_mock import MockerFixture
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.test import APIClient
@@ -344,6 +348,67 @@ def test_identities_endpoint_returns_all_feature_states_for_identity_if_feature_
     assert len(response.data["flags"]) == 2
 
 
+def test_get_identities__etags_enabled__returns_304_until_traits_change(
+    identity: Identity,
+    environment: Environment,
+    feature: Feature,
+    api_client: APIClient,
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.ENABLE_SDK_ETAGS = True
+    url = reverse("api-v1:sdk-identities") + "?identifier=" + identity.identifier
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment.api_key)
+
+    etag = api_client.get(url).headers["ETag"]
+
+    # When
+    not_modified_response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    Trait.objects.create(
+        identity=identity,
+        trait_key="foo",
+        value_type=STRING,
+        string_value="bar",
+    )
+    modified_response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    # Then
+    assert not_modified_response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not_modified_response.content == b""
+
+    assert modified_response.status_code == status.HTTP_200_OK
+    assert modified_response.headers["ETag"] != etag
+    assert modified_response.json()["traits"][0]["trait_key"] == "foo"
+
+
+def test_get_identities__etags_enabled__returns_200_when_identity_override_changes(
+    identity: Identity,
+    environment: Environment,
+    feature: Feature,
+    api_client: APIClient,
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.ENABLE_SDK_ETAGS = True
+    url = reverse("api-v1:sdk-identities") + "?identifier=" + identity.identifier
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment.api_key)
+
+    identity_override = FeatureState.objects.create(
+        identity=identity, environment=environment, feature=feature, enabled=False
+    )
+    etag = api_client.get(url).headers["ETag"]
+
+    # When
+    FeatureState.objects.filter(id=identity_override.id).update(enabled=True)
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert response.json()["flags"][0]["enabled"] is True
+
+
 def test_get_flags_for_identities_with_cache(
     environment: Environment,
     feature: Feature,
@@ -1021,8 +1086,8 @@ def test_get_identities_nplus1(
     for i in range(2, 13):
         v1_flag.clone(env=environment, version=i, live_from=now)
 
-    # Now it is lower.
-    with django_assert_num_queries(5):
+    # Now it is lower, since the environment and its compiled segments are cached.
+    with django_assert_num_queries(4):
         api_client.get(url)
 
 
@@ -1410,3 +1475,229 @@ def test_identity_view_set_get_permissions():  # type: ignore[no-untyped-def]
         "partial_update": MANAGE_IDENTITIES,
         "destroy": MANAGE_IDENTITIES,
     }
+
+
+def test_bulk_identities__returns_same_flags_as_identities_endpoint(
+    environment: Environment,
+    environment_api_key: EnvironmentAPIKey,
+    feature: Feature,
+    identity: Identity,
+    segment: Segment,
+    api_client: APIClient,
+) -> None:
+    # Given
+    rule = SegmentRule.objects.create(segment=segment, type=SegmentRule.ALL_RULE)
+    Condition.objects.create(
+        rule=rule, operator="EQUAL", property="plan", value="premium"
+    )
+    FeatureState.objects.create(
+        feature=feature,
+        environment=environment,
+        feature_segment=FeatureSegment.objects.create(
+            feature=feature, segment=segment, environment=environment
+        ),
+        enabled=True,
+    )
+    Trait.objects.create(
+        identity=identity, trait_key="plan", value_type=STRING, string_value="premium"
+    )
+    overridden_identity = Identity.objects.create(
+        identifier="overridden", environment=environment
+    )
+    FeatureState.objects.create(
+        feature=feature, environment=environment, identity=overridden_identity
+    )
+
+    identities_data: list[dict[str, Any]] = [
+        {"identifier": identity.identifier},
+        {
+            "identifier": identity.identifier,
+            "traits": [{"trait_key": "plan", "trait_value": "free"}],
+        },
+        {
+            "identifier": "new-identity",
+            "traits": [{"trait_key": "plan", "trait_value": "premium"}],
+        },
+        {"identifier": "another-new-identity"},
+        {
+            "identifier": overridden_identity.identifier,
+            "traits": [{"trait_key": "plan", "trait_value": "premium"}],
+        },
+    ]
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment_api_key.key)
+
+    # When
+    response = api_client.post(
+        reverse("api-v1:sdk-identities-bulk"),
+        data={"identities": identities_data},
+        format="json",
+    )
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "application/x-ndjson"
+    results = [
+        json.loads(line)
+        for line in b"".join(response.streaming_content).splitlines()  # type: ignore[attr-defined]
+    ]
+    assert len(results) == len(identities_data)
+
+    for identity_data, result in zip(identities_data, results):
+        identities_response = api_client.post(
+            reverse("api-v1:sdk-identities"),
+            data={**identity_data, "transient": True},
+            format="json",
+        )
+        assert result["identifier"] == identity_data["identifier"]
+        assert result["flags"] == identities_response.json()["flags"]
+        assert sorted(trait["trait_key"] for trait in result["traits"]) == sorted(
+            trait["trait_key"] for trait in identities_response.json()["traits"]
+        )
+
+    assert [result["flags"][0]["enabled"] for result in results] == [
+        True,
+        False,
+        True,
+        False,
+        False,
+    ]
+    assert Identity.objects.filter(environment=environment).count() == 2
+
+
+def test_bulk_identities__multivariate_feature__evaluates_identities_in_batch(
+    environment: Environment,
+    environment_api_key: EnvironmentAPIKey,
+    multivariate_feature: Feature,
+    api_client: APIClient,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    identifiers = [f"identity-{i}" for i in range(20)]
+    Identity.objects.create(identifier=identifiers[0], environment=environment)
+    get_multivariate_feature_state_value_spy = mocker.spy(
+        FeatureState, "get_multivariate_feature_state_value"
+    )
+    get_multivariate_feature_state_values_spy = mocker.spy(
+        FeatureState, "get_multivariate_feature_state_values"
+    )
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment_api_key.key)
+
+    # When
+    response = api_client.post(
+        reverse("api-v1:sdk-identities-bulk"),
+        data={"identities": [{"identifier": i} for i in identifiers]},
+        format="json",
+    )
+    results = [
+        json.loads(line)
+        for line in b"".join(response.streaming_content).splitlines()  # type: ignore[attr-defined]
+    ]
+
+    # Then
+    # the identities are hashed against the multivariate flag at once
+    get_multivariate_feature_state_values_spy.assert_called_once()
+    get_multivariate_feature_state_value_spy.assert_not_called()
+
+    # and they get the same values as from the identities endpoint
+    for identifier, result in zip(identifiers, results):
+        identities_response = api_client.post(
+            reverse("api-v1:sdk-identities"),
+            data={"identifier": identifier, "transient": True},
+            format="json",
+        )
+        assert result["flags"] == identities_response.json()["flags"]
+    assert len({result["flags"][0]["feature_state_value"] for result in results}) > 1
+
+
+def test_bulk_identities__query_count_does_not_depend_on_number_of_identities(
+    environment: Environment,
+    environment_api_key: EnvironmentAPIKey,
+    feature: Feature,
+    segment: Segment,
+    identity: Identity,
+    api_client: APIClient,
+) -> None:
+    # Given
+    rule = SegmentRule.objects.create(segment=segment, type=SegmentRule.ALL_RULE)
+    Condition.objects.create(rule=rule, operator="EQUAL", property="foo", value="bar")
+    FeatureState.objects.create(
+        feature=feature,
+        environment=environment,
+        feature_segment=FeatureSegment.objects.create(
+            feature=feature, segment=segment, environment=environment
+        ),
+    )
+    for i in range(10):
+        Identity.objects.create(identifier=f"identity-{i}", environment=environment)
+
+    url = reverse("api-v1:sdk-identities-bulk")
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment_api_key.key)
+
+    def _get_num_queries(identifiers: list[str]) -> int:
+        with CaptureQueriesContext(connection) as captured_queries:
+            response = api_client.post(
+                url,
+                data={
+                    "identities": [
+                        {
+                            "identifier": identifier,
+                            "traits": [{"trait_key": "foo", "trait_value": "bar"}],
+                        }
+                        for identifier in identifiers
+                    ]
+                },
+                format="json",
+            )
+            b"".join(response.streaming_content)  # type: ignore[attr-defined]
+        return len(captured_queries)
+
+    # warm the caches
+    _get_num_queries([identity.identifier])
+
+    # When
+    single_identity_num_queries = _get_num_queries([identity.identifier])
+    many_identities_num_queries = _get_num_queries(
+        [f"identity-{i}" for i in range(10)] + ["new-identity"]
+    )
+
+    # Then
+    assert many_identities_num_queries == single_identity_num_queries
+
+
+def test_bulk_identities__client_key__returns_403(
+    environment: Environment,
+    api_client: APIClient,
+) -> None:
+    # Given
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment.api_key)
+
+    # When
+    response = api_client.post(
+        reverse("api-v1:sdk-identities-bulk"),
+        data={"identities": [{"identifier": "identity"}]},
+        format="json",
+    )
+
+    # Then
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_bulk_identities__too_many_identities__returns_400(
+    environment_api_key: EnvironmentAPIKey,
+    api_client: APIClient,
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.SDK_BULK_IDENTITIES_MAX_ITEMS = 2
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment_api_key.key)
+
+    # When
+    response = api_client.post(
+        reverse("api-v1:sdk-identities-bulk"),
+        data={"identities": [{"identifier": f"identity-{i}"} for i in range(3)]},
+        format="json",
+    )
+
+    # Then
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "identities" in response.json()
@@ -0,0 +1,250 @@
+import json
+import typing
+from unittest.mock import MagicMock
+
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from pytest_mock import MockerFixture
+
+from environments.invalidation import (
+    EnvironmentInvalidationEvent,
+    LocalInvalidationBus,
+    RedisInvalidationBus,
+    invalidate_environment_caches,
+    publish_environment_invalidation,
+)
+from environments.models import (
+    Environment,
+    EnvironmentAPIKey,
+    environment_document_local_cache,
+)
+from environments.sdk.cache import get_endpoint_cache_key_prefix
+from segments.definitions import get_segment_definitions_cache_key
+from segments.evaluator import get_environment_segment_index
+
+
+@pytest.fixture()
+def invalidation_event(environment: Environment) -> EnvironmentInvalidationEvent:
+    return {
+        "project_id": environment.project_id,
+        "environment_ids": [environment.id],
+        "api_keys": [environment.api_key],
+    }
+
+
+def test_local_invalidation_bus_publish__calls_all_handlers(
+    invalidation_event: EnvironmentInvalidationEvent,
+) -> None:
+    # Given
+    bus = LocalInvalidationBus()
+    failing_handler = MagicMock(side_effect=ValueError("failed"))
+    handler = MagicMock()
+    bus.subscribe(failing_handler)
+    bus.subscribe(handler)
+
+    # When
+    bus.publish(invalidation_event)
+
+    # Then
+    failing_handler.assert_called_once_with(invalidation_event)
+    handler.assert_called_once_with(invalidation_event)
+
+
+def test_redis_invalidation_bus_publish__publishes_event_to_channel(
+    invalidation_event: EnvironmentInvalidationEvent,
+) -> None:
+    # Given
+    client = MagicMock()
+    bus = RedisInvalidationBus(client=client, channel="invalidation")
+    handler = MagicMock()
+    bus.subscribe(handler)
+
+    # When
+    bus.publish(invalidation_event)
+
+    # Then
+    client.publish.assert_called_once_with(
+        "invalidation", json.dumps(invalidation_event)
+    )
+    # events are only handled once received from the channel
+    handler.assert_not_called()
+
+
+def test_redis_invalidation_bus_listen__dispatches_received_events(
+    invalidation_event: EnvironmentInvalidationEvent,
+) -> None:
+    # Given
+    class StopListening(Exception):
+        pass
+
+    def listen() -> typing.Iterator[dict[str, typing.Any]]:
+        yield {"type": "message", "data": json.dumps(invalidation_event).encode()}
+        raise StopListening()
+
+    client = MagicMock()
+    client.pubsub.return_value.listen.side_effect = listen
+    bus = RedisInvalidationBus(client=client, channel="invalidation")
+    handler = MagicMock()
+    bus.subscribe(handler)
+
+    # When
+    with pytest.raises(StopListening):
+        bus._listen()
+
+    # Then
+    client.pubsub.return_value.subscribe.assert_called_once_with("invalidation")
+    handler.assert_called_once_with(invalidation_event)
+
+
+def test_redis_invalidation_bus_ensure_listening__starts_single_listener(
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    thread_class = mocker.patch("environments.invalidation.threading.Thread")
+    thread_class.return_value.is_alive.return_value = True
+    bus = RedisInvalidationBus(client=MagicMock(), channel="invalidation")
+
+    # When
+    bus.ensure_listening()
+    bus.ensure_listening()
+
+    # Then
+    thread_class.assert_called_once()
+    thread_class.return_value.start.assert_called_once_with()
+
+
+def test_publish_environment_invalidation__publishes_all_environment_api_keys(
+    environment: Environment,
+    environment_api_key: EnvironmentAPIKey,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    publish = mocker.patch("environments.invalidation.invalidation_bus.publish")
+
+    # When
+    publish_environment_invalidation(project_id=environment.project_id)
+
+    # Then
+    publish.assert_called_once_with(
+        {
+            "project_id": environment.project_id,
+            "environment_ids": [environment.id],
+            "api_keys": [environment.api_key, environment_api_key.key],
+        }
+    )
+
+
+def test_invalidate_environment_caches__deletes_cached_environment_data(
+    environment: Environment,
+    invalidation_event: EnvironmentInvalidationEvent,
+) -> None:
+    # Given
+    environment_cache = caches[settings.ENVIRONMENT_CACHE_NAME]
+    flags_cache = caches[settings.FLAGS_CACHE_LOCATION]
+    environment_segments_cache = caches[settings.ENVIRONMENT_SEGMENTS_CACHE_NAME]
+    project_segments_cache = caches[settings.PROJECT_SEGMENTS_CACHE_LOCATION]
+    latest_versions_cache = caches[settings.ENVIRONMENT_LATEST_VERSIONS_CACHE_LOCATION]
+
+    environment_cache.set(environment.api_key, environment)
+    flags_cache.set(environment.api_key, [])
+    environment_segments_cache.set(
+        get_segment_definitions_cache_key(environment.id), []
+    )
+    project_segments_cache.set(environment.project_id, [])
+    project_segments_cache.set(
+        get_segment_definitions_cache_key(environment.project_id), []
+    )
+    latest_versions_cache.set(environment.id, frozenset())
+
+    # When
+    invalidate_environment_caches(invalidation_event)
+
+    # Then
+    assert environment_cache.get(environment.api_key) is None
+    assert flags_cache.get(environment.api_key) is None
+    assert (
+        environment_segments_cache.get(
+            get_segment_definitions_cache_key(environment.id)
+        )
+        is None
+    )
+    assert project_segments_cache.get(environment.project_id) is None
+    assert (
+        project_segments_cache.get(
+            get_segment_definitions_cache_key(environment.project_id)
+        )
+        is None
+    )
+    assert latest_versions_cache.get(environment.id) is None
+
+
+def test_invalidate_environment_caches__deletes_segment_indexes(
+    environment: Environment,
+    invalidation_event: EnvironmentInvalidationEvent,
+) -> None:
+    # Given
+    segment_index = get_environment_segment_index(environment)
+
+    # When
+    invalidate_environment_caches(invalidation_event)
+
+    # Then
+    assert get_environment_segment_index(environment) is not segment_index
+
+
+def test_invalidate_environment_caches__deletes_local_environment_data(
+    environment: Environment,
+    invalidation_event: EnvironmentInvalidationEvent,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    mock_delete_engine_environments = mocker.patch(
+        "environments.dynamodb.wrappers.identity_wrapper.delete_engine_environments",
+        autospec=True,
+    )
+    environment_document_local_cache.set(
+        environment.api_key, environment.updated_at, {}
+    )
+
+    # When
+    invalidate_environment_caches(invalidation_event)
+
+    # Then
+    assert (
+        environment_document_local_cache.get(
+            environment.api_key, environment.updated_at
+        )
+        is None
+    )
+    mock_delete_engine_environments.assert_called_once_with([environment.api_key])
+
+
+@pytest.mark.parametrize(
+    "cache_name",
+    [
+        settings.GET_FLAGS_ENDPOINT_CACHE_NAME,
+        settings.GET_IDENTITIES_ENDPOINT_CACHE_NAME,
+    ],
+)
+def test_invalidate_environment_caches__changes_endpoint_cache_key_prefix_of_environment_only(
+    environment: Environment,
+    invalidation_event: EnvironmentInvalidationEvent,
+    cache_name: str,
+    use_local_mem_cache_for_cache_middleware: None,
+) -> None:
+    # Given
+    key_prefix = get_endpoint_cache_key_prefix(cache_name, environment.api_key)
+    other_key_prefix = get_endpoint_cache_key_prefix(cache_name, "other-api-key")
+
+    # When
+    invalidate_environment_caches(invalidation_event)
+
+    # Then
+    assert get_endpoint_cache_key_prefix(cache_name, environment.api_key) not in (
+        key_prefix,
+        other_key_prefix,
+    )
+    assert get_endpoint_cache_key_prefix(cache_name, "other-api-key") == (
+        other_key_prefix
+    )
@@ -7,25 +7,36 @@ from unittest.mock import MagicMock, Mock
 
 import pytest
 from common.test_tools import AssertMetricFixture
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DatabaseError
 from django.db.models import Count, Q
 from django.test import override_settings
 from django.utils import timezone
 from mypy_boto3_dynamodb.service_resource import Table
 from pytest_django import DjangoAssertNumQueries
 from pytest_django.asserts import assertQuerysetEqual as assert_queryset_equal
+from pytest_django.fixtures import SettingsWrapper
 from pytest_mock import MockerFixture
 
 from audit.models import AuditLog
 from audit.related_object_type import RelatedObjectType
+from core.cache import VersionedLRUCache
 from core.constants import STRING
 from core.request_origin import RequestOrigin
 from environments.identities.models import Identity
-from environments.metrics import CACHE_HIT, CACHE_MISS
+from environments.metrics import (
+    CACHE_HIT,
+    CACHE_MISS,
+    CACHE_TIER_LOCAL,
+    CACHE_TIER_SHARED,
+)
 from environments.models import (
     Environment,
     EnvironmentAPIKey,
     Webhook,
     environment_cache,
+    get_environment_cache_fresh_key,
+    get_environment_document_version_key,
 )
 from features.feature_types import MULTIVARIATE
 from features.models import Feature, FeatureSegment, FeatureState
@@ -38,6 +49,10 @@ from features.versioning.versioning_service import (
 from features.workflows.core.models import ChangeRequest
 from organisations.models import Organisation, OrganisationRole
 from projects.models import EdgeV2MigrationStatus, Project
+from segments.definitions import (
+    get_segment_definitions,
+    get_segment_definitions_cache_key,
+)
 from segments.models import Segment
 from tests.types import EnableFeaturesFixture
 from users.models import FFAdminUser
@@ -215,6 +230,84 @@ def test_environment_get_from_cache_stores_environment_in_cache_on_success(
     mock_cache.set.assert_called_with(environment.api_key, environment, timeout=60)
 
 
+@mock.patch("environments.models.environment_cache")
+def test_environment_get_from_cache__stale_seconds_set__stores_environment_and_fresh_marker(
+    mock_cache: MagicMock,
+    environment: Environment,
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.ENVIRONMENT_CACHE_SECONDS = 60
+    settings.ENVIRONMENT_CACHE_STALE_SECONDS = 30
+    mock_cache.get.return_value = None
+
+    # When
+    cached_environment = Environment.get_from_cache(environment.api_key)
+
+    # Then
+    assert cached_environment == environment
+    assert mock_cache.set.call_args_list == [
+        mock.call(
+            get_environment_cache_fresh_key(environment.api_key), True, timeout=60
+        ),
+        mock.call(environment.api_key, environment, timeout=90),
+    ]
+
+
+def test_environment_get_from_cache__stale_environment__returns_it_and_refreshes_cache(
+    environment: Environment,
+    settings: SettingsWrapper,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    # Given
+    settings.ENVIRONMENT_CACHE_STALE_SECONDS = 30
+    Environment.get_from_cache(environment.api_key)
+
+    # the environment is updated and its fresh period has expired
+    Environment.objects.filter(id=environment.id).update(name="Updated environment")
+    environment_cache.delete(get_environment_cache_fresh_key(environment.api_key))
+
+    # When
+    # the refresh query runs in the request thread since the postpone
+    # decorator is disabled in tests
+    with django_assert_num_queries(1):
+        stale_environment = Environment.get_from_cache(environment.api_key)
+
+    with django_assert_num_queries(0):
+        refreshed_environment = Environment.get_from_cache(environment.api_key)
+
+    # Then
+    assert stale_environment.name == environment.name  # type: ignore[union-attr]
+    assert refreshed_environment.name == "Updated environment"  # type: ignore[union-attr]
+
+
+def test_environment_get_from_cache__stale_environment_refresh_fails__keeps_it_stale(
+    environment: Environment,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    settings.ENVIRONMENT_CACHE_STALE_SECONDS = 30
+    Environment.get_from_cache(environment.api_key)
+    environment_cache.delete(get_environment_cache_fresh_key(environment.api_key))
+
+    mocker.patch.object(
+        Environment,
+        "_get_environment_for_cache",
+        side_effect=DatabaseError("Database is unavailable"),
+    )
+
+    # When
+    stale_environment = Environment.get_from_cache(environment.api_key)
+
+    # Then
+    assert stale_environment == environment
+    assert (
+        environment_cache.get(get_environment_cache_fresh_key(environment.api_key))
+        is None
+    )
+
+
 def test_environment_get_from_cache_returns_None_if_no_matching_environment(
     environment: Environment,
 ) -> None:
@@ -705,9 +798,10 @@ def test_environment_get_environment_document_with_caching_when_document_not_in_
     assert environment_document
     assert environment_document["api_key"] == environment.api_key
 
-    mocked_environment_document_cache.set.assert_called_once_with(
-        environment.api_key, environment_document
-    )
+    assert mocked_environment_document_cache.set.call_args_list == [
+        mock.call(environment.api_key, environment_document),
+        mock.call(get_environment_document_version_key(environment.api_key), mock.ANY),
+    ]
 
 
 def test_creating_a_feature_with_defaults_does_not_set_defaults_if_disabled(project):  # type: ignore[no-untyped-def]
@@ -757,10 +851,11 @@ def test_get_segments_returns_only_segments_that_have_an_override(  # type: igno
     segments = environment.get_segments_from_cache()
 
     # Then
-    assert segments == [segment]
+    assert [segment_definition.id for segment_definition in segments] == [segment.id]
 
     mock_environment_segments_cache.set.assert_called_once_with(
-        environment.id, segments
+        get_segment_definitions_cache_key(environment.id),
+        (environment.updated_at, segments),
     )
 
 
@@ -773,8 +868,13 @@ def test_get_segments_from_cache_does_not_hit_db_if_cache_hit(  # type: ignore[n
     django_assert_num_queries,
 ):
     # Given
+    segment_definitions = get_segment_definitions(Segment.objects.filter(id=segment.id))
+
     mock_environment_segments_cache = mocker.MagicMock()
-    mock_environment_segments_cache.get.return_value = [segment]
+    mock_environment_segments_cache.get.return_value = (
+        environment.updated_at,
+        segment_definitions,
+    )
 
     monkeypatch.setattr(
         "environments.models.environment_segments_cache",
@@ -786,11 +886,38 @@ def test_get_segments_from_cache_does_not_hit_db_if_cache_hit(  # type: ignore[n
         segments = environment.get_segments_from_cache()
 
     # Then
-    assert segments == [segment_featurestate.feature_segment.segment]
+    assert segments == segment_definitions
 
     mock_environment_segments_cache.set.assert_not_called()
 
 
+def test_get_segments_from_cache__cached_before_environment_updated__rebuilds(
+    environment: Environment,
+    segment: Segment,
+    segment_featurestate: FeatureState,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    # definitions cached before the segment's override was added
+    mock_environment_segments_cache = mocker.patch(
+        "environments.models.environment_segments_cache"
+    )
+    mock_environment_segments_cache.get.return_value = (
+        environment.updated_at - timedelta(seconds=1),
+        [],
+    )
+
+    # When
+    segments = environment.get_segments_from_cache()
+
+    # Then
+    assert [segment_definition.id for segment_definition in segments] == [segment.id]
+    mock_environment_segments_cache.set.assert_called_once_with(
+        get_segment_definitions_cache_key(environment.id),
+        (environment.updated_at, segments),
+    )
+
+
 @pytest.mark.parametrize(
     "environment_value, project_value, expected_result",
     (
@@ -1055,9 +1182,10 @@ def test_change_api_key_updates_environment_document_cache(
 
     # Then
     persistent_environment_document_cache.delete.assert_called_once_with(old_api_key)
-    persistent_environment_document_cache.set_many.assert_called_once_with(
-        {new_api_key: map_environment_to_environment_document(environment)}
-    )
+    assert persistent_environment_document_cache.set_many.call_args_list == [
+        mock.call({new_api_key: map_environment_to_environment_document(environment)}),
+        mock.call({get_environment_document_version_key(new_api_key): mock.ANY}),
+    ]
 
 
 def test_get_environment_document_from_cache_triggers_correct_metrics__cache_hit(
@@ -1074,6 +1202,7 @@ def test_get_environment_document_from_cache_triggers_correct_metrics__cache_hit
         name="flagsmith_environment_document_cache_queries_total",
         labels={
             "result": CACHE_HIT,
+            "tier": CACHE_TIER_SHARED,
         },
         value=1.0,
     )
@@ -1092,11 +1221,121 @@ def test_get_environment_document_from_cache_triggers_correct_metrics__cache_mis
         name="flagsmith_environment_document_cache_queries_total",
         labels={
             "result": CACHE_MISS,
+            "tier": CACHE_TIER_SHARED,
         },
         value=1.0,
     )
 
 
+@pytest.fixture()
+def local_environment_document_cache(
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> VersionedLRUCache[str, dict[str, typing.Any]]:
+    settings.CACHE_ENVIRONMENT_DOCUMENT_LOCAL_MAX_ENTRIES = 10
+    local_cache: VersionedLRUCache[str, dict[str, typing.Any]] = VersionedLRUCache(
+        max_entries=10
+    )
+    mocker.patch("environments.models.environment_document_local_cache", local_cache)
+    return local_cache
+
+
+def test_get_environment_document_from_cache__local_cache_hit__skips_shared_document(
+    environment: Environment,
+    settings: SettingsWrapper,
+    local_environment_document_cache: VersionedLRUCache[str, dict[str, typing.Any]],
+    django_assert_num_queries: DjangoAssertNumQueries,
+    assert_metric: AssertMetricFixture,
+) -> None:
+    # Given
+    settings.CACHE_ENVIRONMENT_DOCUMENT_SECONDS = 60
+    shared_cache = LocMemCache(name="environment_document", params={})
+    with mock.patch("environments.models.environment_document_cache", shared_cache):
+        environment_document = Environment.get_environment_document(environment.api_key)
+
+        # When
+        with (
+            mock.patch.object(shared_cache, "get", wraps=shared_cache.get) as get,
+            django_assert_num_queries(0),
+        ):
+            cached_environment_document = Environment.get_environment_document(
+                environment.api_key
+            )
+
+    # Then
+    assert cached_environment_document is environment_document
+    get.assert_called_once_with(
+        get_environment_document_version_key(environment.api_key)
+    )
+    assert_metric(
+        name="flagsmith_environment_document_cache_queries_total",
+        labels={"result": CACHE_HIT, "tier": CACHE_TIER_LOCAL},
+        value=1.0,
+    )
+    assert_metric(
+        name="flagsmith_environment_document_cache_queries_total",
+        labels={"result": CACHE_MISS, "tier": CACHE_TIER_SHARED},
+        value=1.0,
+    )
+
+
+def test_get_environment_document_from_cache__version_changed__reads_shared_document(
+    environment: Environment,
+    persistent_environment_document_cache: MagicMock,
+    local_environment_document_cache: VersionedLRUCache[str, dict[str, typing.Any]],
+    assert_metric: AssertMetricFixture,
+) -> None:
+    # Given
+    stale_environment_document = {"api_key": environment.api_key, "stale": True}
+    local_environment_document_cache.set(
+        environment.api_key, "old-version", stale_environment_document
+    )
+    shared_environment_document = map_environment_to_environment_document(environment)
+    persistent_environment_document_cache.get.side_effect = {
+        get_environment_document_version_key(environment.api_key): "new-version",
+        environment.api_key: shared_environment_document,
+    }.get
+
+    # When
+    environment_document = Environment.get_environment_document(environment.api_key)
+
+    # Then
+    assert environment_document == shared_environment_document
+    assert (
+        local_environment_document_cache.get(environment.api_key, "new-version")
+        == shared_environment_document
+    )
+    assert_metric(
+        name="flagsmith_environment_document_cache_queries_total",
+        labels={"result": CACHE_MISS, "tier": CACHE_TIER_LOCAL},
+        value=1.0,
+    )
+    assert_metric(
+        name="flagsmith_environment_document_cache_queries_total",
+        labels={"result": CACHE_HIT, "tier": CACHE_TIER_SHARED},
+        value=1.0,
+    )
+
+
+def test_get_environment_document_from_cache__no_version__does_not_cache_locally(
+    environment: Environment,
+    persistent_environment_document_cache: MagicMock,
+    local_environment_document_cache: VersionedLRUCache[str, dict[str, typing.Any]],
+) -> None:
+    # Given
+    shared_environment_document = map_environment_to_environment_document(environment)
+    persistent_environment_document_cache.get.side_effect = {
+        environment.api_key: shared_environment_document,
+    }.get
+
+    # When
+    environment_document = Environment.get_environment_document(environment.api_key)
+
+    # Then
+    assert environment_document == shared_environment_document
+    assert len(local_environment_document_cache) == 0
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize(
     "total_features, feature_enabled_count, segment_overrides_count, change_request_count, scheduled_change_count",
@@ -1280,3 +1519,30 @@ def test_environment_clone_from_non_versioned_environment_with_use_v2_feature_ve
     latest_feature_states = get_environment_flags_queryset(new_environment)
     assert latest_feature_states.count() == 2
     assert {fs.environment_feature_version for fs in latest_feature_states} == {efv}
+
+
+def test_environment_get_many_from_cache__returns_environments_by_api_key(
+    environment: Environment,
+    environment_api_key: EnvironmentAPIKey,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    # Given
+    api_keys = [environment.api_key, environment_api_key.key, "unknown"]
+
+    # When
+    with django_assert_num_queries(2):
+        environments = Environment.get_many_from_cache(api_keys)
+
+    with django_assert_num_queries(0):
+        cached_environments = Environment.get_many_from_cache(api_keys[:2])
+
+    # Then
+    assert (
+        environments
+        == cached_environments
+        == {
+            environment.api_key: environment,
+            environment_api_key.key: environment,
+        }
+    )
+    assert Environment.get_from_cache(environment_api_key.key) == environment
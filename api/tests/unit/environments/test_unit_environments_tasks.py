@@ -43,6 +43,9 @@ def test_process_environment_update_with_environment_audit_log(environment, mock
         "environments.tasks.send_environment_update_message_for_project",
         autospec=True,
     )
+    mock_publish_environment_invalidation = mocker.patch(
+        "environments.tasks.publish_environment_invalidation", autospec=True
+    )
 
     # When
     process_environment_update(audit_log_id=audit_log.id)
@@ -55,6 +58,9 @@ def test_process_environment_update_with_environment_audit_log(environment, mock
         environment
     )
     mock_send_environment_update_message_for_project.assert_not_called()
+    mock_publish_environment_invalidation.assert_called_once_with(
+        project_id=environment.project.id, environment_id=environment.id
+    )
 
 
 def test_process_environment_update_with_project_audit_log(environment, mocker):  # type: ignore[no-untyped-def]
@@ -71,6 +77,9 @@ def test_process_environment_update_with_project_audit_log(environment, mocker):
         "environments.tasks.send_environment_update_message_for_project",
         autospec=True,
     )
+    mock_publish_environment_invalidation = mocker.patch(
+        "environments.tasks.publish_environment_invalidation", autospec=True
+    )
 
     # When
     process_environment_update(audit_log_id=audit_log.id)
@@ -83,6 +92,41 @@ def test_process_environment_update_with_project_audit_log(environment, mocker):
     mock_send_environment_update_message_for_project.assert_called_once_with(
         environment.project
     )
+    mock_publish_environment_invalidation.assert_called_once_with(
+        project_id=environment.project.id, environment_id=None
+    )
+
+
+def test_process_environment_update__publish_invalidation_fails__sends_update_message(
+    environment: Environment,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    audit_log = AuditLog.objects.create(
+        project=environment.project, environment=environment
+    )
+    mocker.patch("environments.tasks.Environment", autospec=True)
+    mock_send_environment_update_message_for_environment = mocker.patch(
+        "environments.tasks.send_environment_update_message_for_environment",
+        autospec=True,
+    )
+    mocker.patch(
+        "environments.tasks.publish_environment_invalidation",
+        autospec=True,
+        side_effect=ConnectionError("Redis is unavailable"),
+    )
+    mock_logger = mocker.patch("environments.tasks.logger", autospec=True)
+
+    # When
+    process_environment_update(audit_log_id=audit_log.id)
+
+    # Then
+    mock_logger.exception.assert_called_once_with(
+        "Failed to publish invalidation for audit log %d.", audit_log.id
+    )
+    mock_send_environment_update_message_for_environment.assert_called_once_with(
+        environment
+    )
 
 
 def test_delete_environment__calls_internal_methods_correctly(
@@ -1,7 +1,11 @@
+import gzip
+import json
 import time
+import typing
 from typing import TYPE_CHECKING
 
 import pytest
+from django.core.cache.backends.locmem import LocMemCache
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.http import http_date
@@ -9,6 +13,7 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from core.constants import FLAGSMITH_UPDATED_AT_HEADER
+from environments.enums import EnvironmentDocumentCacheMode
 from environments.identities.models import Identity
 from environments.models import Environment, EnvironmentAPIKey
 from features.feature_types import MULTIVARIATE
@@ -26,6 +31,8 @@ from segments.models import Segment
 
 if TYPE_CHECKING:
     from pytest_django import DjangoAssertNumQueries
+    from pytest_django.fixtures import SettingsWrapper
+    from pytest_mock import MockerFixture
 
     from organisations.models import Organisation
 
@@ -204,3 +211,163 @@ def test_environment_document_if_modified_since(
     # Then - actual environment is returned with a 200
     assert response4.status_code == status.HTTP_200_OK
     assert len(response4.content) > 0
+
+
+@pytest.fixture()
+def prerendered_environment_document_cache(
+    settings: "SettingsWrapper",
+    mocker: "MockerFixture",
+) -> LocMemCache:
+    settings.CACHE_ENVIRONMENT_DOCUMENT_MODE = EnvironmentDocumentCacheMode.PERSISTENT
+    settings.CACHE_ENVIRONMENT_DOCUMENT_PRERENDERED = True
+    cache = LocMemCache(name="environment_document", params={"timeout": None})
+    mocker.patch("environments.models.environment_document_cache", cache)
+    return cache
+
+
+def test_get_environment_document__prerendered__returns_rendered_document(
+    environment: Environment,
+    feature: Feature,
+    prerendered_environment_document_cache: LocMemCache,
+    django_assert_num_queries: "DjangoAssertNumQueries",
+) -> None:
+    # Given
+    api_key = EnvironmentAPIKey.objects.create(environment=environment).key
+    Environment.write_environment_documents(environment_id=environment.id)
+
+    client = APIClient()
+    client.credentials(HTTP_X_ENVIRONMENT_KEY=api_key)
+    url = reverse("api-v1:environment-document")
+
+    # When
+    # Only the query to authenticate the request is expected.
+    with django_assert_num_queries(1):
+        response = client.get(url)
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Content-Type"] == "application/json"
+    assert response.headers["ETag"]
+    assert response.headers[FLAGSMITH_UPDATED_AT_HEADER] == str(
+        environment.updated_at.timestamp()
+    )
+    environment_document = json.loads(response.content)
+    assert environment_document["api_key"] == environment.api_key
+    assert environment_document["feature_states"][0]["feature"]["id"] == feature.id
+
+
+def test_get_environment_document__prerendered_accepts_gzip__returns_gzip_content(
+    environment: Environment,
+    prerendered_environment_document_cache: LocMemCache,
+) -> None:
+    # Given
+    api_key = EnvironmentAPIKey.objects.create(environment=environment).key
+
+    client = APIClient()
+    client.credentials(HTTP_X_ENVIRONMENT_KEY=api_key)
+    url = reverse("api-v1:environment-document")
+
+    # When
+    response = client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate, br")
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    environment_document = json.loads(gzip.decompress(response.content))
+    assert environment_document["api_key"] == environment.api_key
+
+
+def test_get_environment_document__prerendered_if_none_match__returns_304(
+    environment: Environment,
+    feature: Feature,
+    prerendered_environment_document_cache: LocMemCache,
+) -> None:
+    # Given
+    api_key = EnvironmentAPIKey.objects.create(environment=environment).key
+
+    client = APIClient()
+    client.credentials(HTTP_X_ENVIRONMENT_KEY=api_key)
+    url = reverse("api-v1:environment-document")
+
+    etag = client.get(url).headers["ETag"]
+
+    # When
+    not_modified_response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    FeatureState.objects.filter(feature=feature, environment=environment).update(
+        enabled=True
+    )
+    Environment.write_environment_documents(environment_id=environment.id)
+    modified_response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    # Then
+    assert not_modified_response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not_modified_response.content == b""
+    assert not_modified_response.headers["ETag"] == etag
+
+    assert modified_response.status_code == status.HTTP_200_OK
+    assert modified_response.headers["ETag"] != etag
+
+
+def test_get_environment_document__prerendered_if_none_match__only_reads_etag(
+    environment: Environment,
+    prerendered_environment_document_cache: LocMemCache,
+    mocker: "MockerFixture",
+) -> None:
+    # Given
+    api_key = EnvironmentAPIKey.objects.create(environment=environment).key
+    Environment.write_environment_documents(environment_id=environment.id)
+
+    client = APIClient()
+    client.credentials(HTTP_X_ENVIRONMENT_KEY=api_key)
+    url = reverse("api-v1:environment-document")
+
+    etag = client.get(url).headers["ETag"]
+    get_rendered_environment_document_spy = mocker.spy(
+        Environment, "get_rendered_environment_document"
+    )
+
+    # When
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    # Then
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    get_rendered_environment_document_spy.assert_not_called()
+
+
+def test_get_rendered_environment_document__written_after_read__keeps_written_document(
+    environment: Environment,
+    feature: Feature,
+    prerendered_environment_document_cache: LocMemCache,
+    mocker: "MockerFixture",
+) -> None:
+    # Given
+    get_environment_document = Environment.get_environment_document
+
+    def write_after_read(api_key: str) -> dict[str, typing.Any]:
+        environment_document = get_environment_document(api_key)
+        FeatureState.objects.filter(feature=feature, environment=environment).update(
+            enabled=True
+        )
+        Environment.write_environment_documents(environment_id=environment.id)
+        return environment_document
+
+    mocker.patch.object(
+        Environment, "get_environment_document", side_effect=write_after_read
+    )
+
+    # When
+    Environment.get_rendered_environment_document(environment.api_key)
+
+    # Then
+    rendered_environment_document = Environment.get_rendered_environment_document(
+        environment.api_key
+    )
+    environment_document = json.loads(rendered_environment_document.content)
+    assert environment_document["feature_states"][0]["enabled"] is True
+    assert (
+        Environment.get_rendered_environment_document_etag(environment.api_key)
+        == rendered_environment_document.etag
+    )
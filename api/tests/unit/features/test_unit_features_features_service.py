@@ -8,6 +8,7 @@ from environments.identities.models import Identity
 from features.features_service import (
     get_core_overrides_data,
     get_edge_overrides_data,
+    get_environment_feature_names,
     get_overrides_data,
 )
 from features.models import Feature, FeatureSegment, FeatureState
@@ -19,6 +20,7 @@ from util.mappers.engine import (
 )
 
 if TYPE_CHECKING:
+    from pytest_django import DjangoAssertNumQueries
     from pytest_mock import MockerFixture
 
     from environments.dynamodb import (
@@ -308,3 +310,44 @@ def test_get_edge_overrides_data_skips_deleted_features(  # type: ignore[no-unty
         overrides_data[distinct_identity_featurestate.feature.id].num_identity_overrides
         == 1
     )
+
+
+def test_get_environment_feature_names__returns_cached_names(
+    environment: "Environment",
+    feature: Feature,
+    django_assert_num_queries: "DjangoAssertNumQueries",
+) -> None:
+    # Given
+    get_environment_feature_names(environment.id)
+
+    # When
+    with django_assert_num_queries(0):
+        feature_names = get_environment_feature_names(environment.id)
+
+    # Then
+    assert feature_names == {feature.name}
+
+
+def test_get_environment_feature_names__feature_created_or_deleted__cache_cleared(
+    environment: "Environment",
+    feature: Feature,
+) -> None:
+    # Given
+    get_environment_feature_names(environment.id)
+
+    # When
+    new_feature = Feature.objects.create(
+        project=environment.project, name="new_feature"
+    )
+
+    # Then
+    assert get_environment_feature_names(environment.id) == {
+        feature.name,
+        new_feature.name,
+    }
+
+    # When
+    feature.delete()
+
+    # Then
+    assert get_environment_feature_names(environment.id) == {new_feature.name}
@@ -620,6 +620,31 @@ def test_get_multivariate_value_returns_correct_value_when_we_pass_identity(  #
     assert multivariate_value.value != multivariate_value.initial_value
 
 
+def test_get_multivariate_feature_state_values_returns_same_values_as_single_identity(
+    multivariate_feature: Feature,
+    environment: Environment,
+) -> None:
+    # Given
+    feature_state = FeatureState.objects.get(
+        environment=environment,
+        feature=multivariate_feature,
+        identity=None,
+        feature_segment=None,
+    )
+    identity_hash_keys = [f"identity-{i}" for i in range(50)]
+
+    # When
+    multivariate_values = feature_state.get_multivariate_feature_state_values(
+        identity_hash_keys
+    )
+
+    # Then
+    assert multivariate_values == [
+        feature_state.get_multivariate_feature_state_value(identity_hash_key)
+        for identity_hash_key in identity_hash_keys
+    ]
+
+
 @mock.patch.object(FeatureState, "get_multivariate_feature_state_value")
 def test_get_feature_state_value_for_multivariate_features(  # type: ignore[no-untyped-def]
     mock_get_mv_feature_state_value, environment, multivariate_feature, identity
@@ -40,6 +40,7 @@ from environments.dynamodb import (
     DynamoIdentityWrapper,
 )
 from environments.identities.models import Identity
+from environments.invalidation import invalidate_environment_caches
 from environments.models import Environment, EnvironmentAPIKey
 from environments.permissions.models import UserEnvironmentPermission
 from features.dataclasses import EnvironmentFeatureOverridesData
@@ -842,6 +843,100 @@ def test_get_flags_cache(
             )
 
 
+def test_get_flags_cache__environment_invalidated__only_refreshes_its_flags(
+    environment: Environment,
+    feature: Feature,
+    django_assert_num_queries: DjangoAssertNumQueries,
+    project_two_environment: Environment,
+    use_local_mem_cache_for_cache_middleware: None,
+) -> None:
+    # Given
+    url = reverse("api-v1:flags")
+    environment_one_client = APIClient(
+        headers={SDK_ENVIRONMENT_KEY_HEADER: environment.api_key}
+    )
+    project_two_environment_client = APIClient(
+        headers={SDK_ENVIRONMENT_KEY_HEADER: project_two_environment.api_key}
+    )
+    environment_one_client.get(url)
+    project_two_environment_client.get(url)
+
+    FeatureState.objects.filter(environment=environment, feature=feature).update(
+        enabled=True
+    )
+
+    # When
+    invalidate_environment_caches(
+        {
+            "project_id": environment.project_id,
+            "environment_ids": [environment.id],
+            "api_keys": [environment.api_key],
+        }
+    )
+
+    # Then
+    assert environment_one_client.get(url).json()[0]["enabled"] is True
+    with django_assert_num_queries(0):
+        response = project_two_environment_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_get_flags__etags_enabled__returns_304_until_environment_updated(
+    api_client: APIClient,
+    environment: Environment,
+    feature: Feature,
+    settings: SettingsWrapper,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    # Given
+    settings.ENABLE_SDK_ETAGS = True
+    url = reverse("api-v1:flags")
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment.api_key)
+
+    etag = api_client.get(url).headers["ETag"]
+
+    # When
+    with django_assert_num_queries(0):
+        not_modified_response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    environment.updated_at = timezone.now()
+    environment.save()
+    modified_response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    # Then
+    assert not_modified_response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not_modified_response.content == b""
+
+    assert modified_response.status_code == status.HTTP_200_OK
+    assert modified_response.headers["ETag"] != etag
+    assert modified_response.json()[0]["feature"]["id"] == feature.id
+
+
+def test_get_flags__etags_enabled__etag_depends_on_request_origin(
+    api_client: APIClient,
+    environment: Environment,
+    environment_api_key: EnvironmentAPIKey,
+    settings: SettingsWrapper,
+) -> None:
+    # Given
+    settings.ENABLE_SDK_ETAGS = True
+    url = reverse("api-v1:flags")
+
+    api_client.credentials(HTTP_X_ENVIRONMENT_KEY=environment.api_key)
+    client_etag = api_client.get(url).headers["ETag"]
+
+    # When
+    api_client.credentials(
+        HTTP_X_ENVIRONMENT_KEY=environment_api_key.key,
+        HTTP_IF_NONE_MATCH=client_etag,
+    )
+    response = api_client.get(url)
+
+    # Then
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != client_etag
+
+
 def test_get_flags__server_key_only_feature__server_key_auth__return_expected(
     api_client: APIClient,
     environment_api_key: EnvironmentAPIKey,
@@ -3416,7 +3511,7 @@ def test_feature_list_last_modified_values_without_rbac(
         feature,
         with_project_permissions,
         django_assert_num_queries,
-        num_queries=19,
+        num_queries=18,
     )
 
 
@@ -3442,7 +3537,7 @@ def test_feature_list_last_modified_values_with_rbac(
         feature,
         with_project_permissions,
         django_assert_num_queries,
-        num_queries=20,
+        num_queries=19,
     )
 
 
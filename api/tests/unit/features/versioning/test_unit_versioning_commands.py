@@ -0,0 +1,19 @@
+from django.core.management import call_command
+
+from environments.models import Environment
+from features.models import Feature, FeatureState
+from features.versioning.models import LiveFeatureState
+
+
+def test_rebuild_live_feature_states__rebuilds_given_environments(
+    environment: Environment,
+    environment_two: Environment,
+    feature: Feature,
+) -> None:
+    # When
+    call_command("rebuild_live_feature_states", environment_ids=[environment.id])
+
+    # Then
+    assert list(LiveFeatureState.objects.values_list("feature_state", flat=True)) == [
+        FeatureState.objects.get(environment=environment, feature=feature).id
+    ]
@@ -4,6 +4,8 @@ from datetime import timedelta
 import pytest
 from django.utils import timezone
 from freezegun import freeze_time
+from freezegun.api import FrozenDateTimeFactory
+from pytest_django import DjangoAssertNumQueries
 from pytest_mock import MockerFixture
 
 from core.constants import STRING
@@ -280,6 +282,95 @@ def test_get_latest_versions_does_not_return_versions_scheduled_for_the_future(
     assert latest_versions.first() == version_0
 
 
+def test_get_latest_version_uuids__cached_until_scheduled_version_is_live(
+    environment_v2_versioning: Environment,
+    feature: "Feature",
+    admin_user: "FFAdminUser",
+    django_assert_num_queries: DjangoAssertNumQueries,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    # Given
+    version_0 = EnvironmentFeatureVersion.objects.get(
+        environment=environment_v2_versioning, feature=feature
+    )
+    scheduled_version = EnvironmentFeatureVersion.objects.create(
+        environment=environment_v2_versioning,
+        feature=feature,
+        live_from=timezone.now() + timedelta(hours=1),
+    )
+    scheduled_version.publish(admin_user)
+
+    # When
+    with django_assert_num_queries(1):
+        EnvironmentFeatureVersion.objects.get_latest_version_uuids(
+            environment_v2_versioning
+        )
+        latest_version_uuids = (
+            EnvironmentFeatureVersion.objects.get_latest_version_uuids(
+                environment_v2_versioning
+            )
+        )
+
+    # Then
+    assert latest_version_uuids == {version_0.uuid}
+
+    # and, once the scheduled version is live, it's returned
+    freezer.move_to(scheduled_version.live_from)
+    assert EnvironmentFeatureVersion.objects.get_latest_version_uuids(
+        environment_v2_versioning
+    ) == {scheduled_version.uuid}
+
+
+def test_get_latest_version_uuids__version_published__returns_published_version(
+    environment_v2_versioning: Environment,
+    feature: "Feature",
+    admin_user: "FFAdminUser",
+) -> None:
+    # Given
+    EnvironmentFeatureVersion.objects.get_latest_version_uuids(
+        environment_v2_versioning
+    )
+    new_version = EnvironmentFeatureVersion.objects.create(
+        environment=environment_v2_versioning, feature=feature
+    )
+
+    # When
+    new_version.publish(admin_user)
+
+    # Then
+    assert EnvironmentFeatureVersion.objects.get_latest_version_uuids(
+        environment_v2_versioning
+    ) == {new_version.uuid}
+
+
+def test_get_latest_version_uuids__environment_updated__returns_published_version(
+    environment_v2_versioning: Environment,
+    feature: "Feature",
+) -> None:
+    # Given
+    EnvironmentFeatureVersion.objects.get_latest_version_uuids(
+        environment_v2_versioning
+    )
+
+    # a version is published by another process, so the cached uuids aren't
+    # cleared in this one, but the environment is stamped
+    new_version = EnvironmentFeatureVersion.objects.create(
+        environment=environment_v2_versioning, feature=feature
+    )
+    EnvironmentFeatureVersion.objects.filter(uuid=new_version.uuid).update(
+        published_at=timezone.now(), live_from=timezone.now()
+    )
+    environment_v2_versioning.updated_at = timezone.now()
+
+    # When
+    latest_version_uuids = EnvironmentFeatureVersion.objects.get_latest_version_uuids(
+        environment_v2_versioning
+    )
+
+    # Then
+    assert latest_version_uuids == {new_version.uuid}
+
+
 def test_version_change_set_adds_environment_on_create_with_change_request(
     environment_v2_versioning: Environment,
     feature: "Feature",
@@ -1,17 +1,26 @@
 from datetime import timedelta
 
+import pytest
+from django.db import IntegrityError, connection
 from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
+from freezegun.api import FrozenDateTimeFactory
 from pytest_django import DjangoAssertNumQueries
+from pytest_django.fixtures import SettingsWrapper
+from pytest_mock import MockerFixture
 
 from environments.identities.models import Identity
 from environments.models import Environment
 from features.models import Feature, FeatureState
-from features.versioning.models import EnvironmentFeatureVersion
+from features.versioning.models import EnvironmentFeatureVersion, LiveFeatureState
 from features.versioning.versioning_service import (
     get_current_live_environment_feature_version,
+    get_environment_flags_dict,
     get_environment_flags_list,
     get_environment_flags_queryset,
+    promote_live_feature_states,
+    rebuild_live_feature_states,
 )
 from projects.models import Project
 from segments.models import Segment
@@ -228,3 +237,313 @@ def test_get_current_live_environment_feature_version(
 
     # Then
     assert latest_version == version_1
+
+
+@pytest.fixture()
+def feature_states_with_history(
+    project: Project,
+    environment: Environment,
+    feature: Feature,
+    segment_featurestate: FeatureState,
+    identity: Identity,
+) -> None:
+    now = timezone.now()
+    feature_state = FeatureState.objects.get(
+        feature=feature, environment=environment, feature_segment=None, identity=None
+    )
+
+    # a more recent live_from has priority over a higher version
+    feature_state.clone(env=environment, live_from=now - timedelta(hours=1), version=2)
+    feature_state.clone(env=environment, live_from=now - timedelta(hours=2), version=3)
+    # scheduled and draft feature states aren't live
+    feature_state.clone(env=environment, live_from=now + timedelta(hours=1), version=4)
+    feature_state.clone(env=environment, as_draft=True)
+
+    # for the same live_from, the higher version has priority
+    feature_2 = Feature.objects.create(name="feature_2", project=project)
+    feature_2_state = FeatureState.objects.get(feature=feature_2, identity=None)
+    feature_2_state.clone(env=environment, live_from=now, version=3)
+    feature_2_state.clone(env=environment, live_from=now, version=2)
+
+    # segment overrides have their own history
+    segment_featurestate.clone(
+        env=environment, live_from=now - timedelta(minutes=1), version=2
+    )
+    segment_featurestate.clone(
+        env=environment, live_from=now + timedelta(minutes=1), version=3
+    )
+
+    # the most recently created identity override has priority, regardless
+    # of its version
+    FeatureState.objects.create(
+        feature=feature_2, identity=identity, environment=environment, version=2
+    )
+    FeatureState.objects.create(
+        feature=feature_2, identity=identity, environment=environment
+    )
+    FeatureState.objects.create(
+        feature=feature, identity=identity, environment=environment
+    )
+    FeatureState.objects.create(
+        feature=feature,
+        identity=Identity.objects.create(identifier="other", environment=environment),
+        environment=environment,
+        live_from=now - timedelta(days=1),
+    )
+
+
+@pytest.mark.parametrize(
+    "feature_name, additional_filters",
+    [
+        (None, None),
+        (None, Q(feature_segment=None, identity=None)),
+        (None, Q(identity=None)),
+        ("feature_2", None),
+    ],
+)
+@pytest.mark.usefixtures("feature_states_with_history")
+def test_get_environment_flags_dict__resolved_in_database__matches_python(
+    environment: Environment,
+    settings: SettingsWrapper,
+    feature_name: str | None,
+    additional_filters: Q | None,
+) -> None:
+    # Given
+    settings.RESOLVE_FEATURE_STATE_PRIORITY_IN_DATABASE = False
+    expected_feature_states = get_environment_flags_dict(
+        environment,
+        feature_name=feature_name,  # type: ignore[arg-type]
+        additional_filters=additional_filters,  # type: ignore[arg-type]
+    )
+    settings.RESOLVE_FEATURE_STATE_PRIORITY_IN_DATABASE = True
+
+    # When
+    with CaptureQueriesContext(connection) as captured_queries:
+        feature_states = get_environment_flags_dict(
+            environment,
+            feature_name=feature_name,  # type: ignore[arg-type]
+            additional_filters=additional_filters,  # type: ignore[arg-type]
+        )
+
+    # Then
+    assert len(captured_queries) == 1
+    assert "DISTINCT ON" in captured_queries[0]["sql"]
+    assert {key: fs.id for key, fs in feature_states.items()} == {
+        key: fs.id for key, fs in expected_feature_states.items()
+    }
+    assert list(feature_states.values()) == sorted(
+        expected_feature_states.values(), key=lambda fs: fs.id
+    )
+
+
+@pytest.mark.usefixtures("feature_states_with_history")
+def test_get_environment_flags_dict__key_function__resolved_in_python(
+    environment: Environment,
+) -> None:
+    # When
+    with CaptureQueriesContext(connection) as captured_queries:
+        feature_states = get_environment_flags_dict(
+            environment,
+            additional_filters=Q(feature_segment=None, identity=None),
+            key_function=lambda fs: fs.feature.name,  # type: ignore[arg-type,return-value]
+        )
+
+    # Then
+    assert "DISTINCT ON" not in captured_queries[0]["sql"]
+    assert set(feature_states) == {"Test Feature1", "feature_2"}
+
+
+@pytest.mark.parametrize(
+    "feature_name, additional_filters",
+    [
+        (None, None),
+        (None, Q(identity=None)),
+        ("feature_2", None),
+    ],
+)
+@pytest.mark.usefixtures("feature_states_with_history")
+def test_get_environment_flags_dict__live_feature_states__matches_resolved(
+    environment: Environment,
+    settings: SettingsWrapper,
+    feature_name: str | None,
+    additional_filters: Q | None,
+) -> None:
+    # Given
+    expected_feature_states = get_environment_flags_dict(
+        environment,
+        feature_name=feature_name,  # type: ignore[arg-type]
+        additional_filters=additional_filters,  # type: ignore[arg-type]
+    )
+    rebuild_live_feature_states(environment)
+    settings.USE_LIVE_FEATURE_STATES = True
+
+    # When
+    feature_states = get_environment_flags_dict(
+        environment,
+        feature_name=feature_name,  # type: ignore[arg-type]
+        additional_filters=additional_filters,  # type: ignore[arg-type]
+    )
+
+    # Then
+    assert {key: fs.id for key, fs in feature_states.items()} == {
+        key: fs.id for key, fs in expected_feature_states.items()
+    }
+
+
+def test_live_feature_states__feature_state_published__promoted_when_live(
+    environment: Environment,
+    feature: Feature,
+    identity: Identity,
+    settings: SettingsWrapper,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    # Given
+    settings.MAINTAIN_LIVE_FEATURE_STATES = True
+    settings.USE_LIVE_FEATURE_STATES = True
+    rebuild_live_feature_states(environment)
+    feature_state = FeatureState.objects.get(
+        feature=feature, environment=environment, identity=None
+    )
+    now = timezone.now()
+
+    # When
+    feature_state_v2 = feature_state.clone(env=environment, live_from=now, version=2)
+    feature_state_v3 = feature_state.clone(
+        env=environment, live_from=now + timedelta(hours=1), version=3
+    )
+    identity_override = FeatureState.objects.create(
+        feature=feature, identity=identity, environment=environment
+    )
+
+    # Then
+    assert set(get_environment_flags_list(environment)) == {
+        feature_state_v2,
+        identity_override,
+    }
+    assert LiveFeatureState.objects.get(
+        feature_state=feature_state_v2
+    ).promote_at == now + timedelta(hours=1)
+
+    # and, once the scheduled feature state is live, it's promoted
+    freezer.move_to(now + timedelta(hours=1))
+    promote_live_feature_states()
+    assert set(get_environment_flags_list(environment)) == {
+        feature_state_v3,
+        identity_override,
+    }
+    assert not LiveFeatureState.objects.filter(promote_at__isnull=False).exists()
+
+    # and deleted identity overrides are no longer live
+    identity_override.delete()
+    assert get_environment_flags_list(environment) == [feature_state_v3]
+
+
+def test_live_feature_states__version_published__promoted_when_live(
+    environment_v2_versioning: Environment,
+    feature: Feature,
+    staff_user: FFAdminUser,
+    settings: SettingsWrapper,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    # Given
+    settings.MAINTAIN_LIVE_FEATURE_STATES = True
+    settings.USE_LIVE_FEATURE_STATES = True
+    rebuild_live_feature_states(environment_v2_versioning)
+    now = timezone.now()
+
+    version_2 = EnvironmentFeatureVersion.objects.create(
+        environment=environment_v2_versioning, feature=feature
+    )
+    version_3 = EnvironmentFeatureVersion.objects.create(
+        environment=environment_v2_versioning, feature=feature
+    )
+
+    # When
+    version_2.publish(staff_user)
+    version_3.publish(staff_user, live_from=now + timedelta(hours=1))
+
+    # Then
+    assert list(get_environment_flags_list(environment_v2_versioning)) == list(
+        version_2.feature_states.all()
+    )
+
+    # and, once the scheduled version is live, it's promoted
+    freezer.move_to(now + timedelta(hours=1))
+    promote_live_feature_states()
+    assert list(get_environment_flags_list(environment_v2_versioning)) == list(
+        version_3.feature_states.all()
+    )
+
+
+def test_live_feature_states__version_published__refreshed_before_webhooks(
+    environment_v2_versioning: Environment,
+    feature: Feature,
+    staff_user: FFAdminUser,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    settings.MAINTAIN_LIVE_FEATURE_STATES = True
+    settings.USE_LIVE_FEATURE_STATES = True
+    rebuild_live_feature_states(environment_v2_versioning)
+    version_2 = EnvironmentFeatureVersion.objects.create(
+        environment=environment_v2_versioning, feature=feature
+    )
+
+    flags_when_webhooks_triggered = []
+    trigger_update_version_webhooks_mock = mocker.patch(
+        "features.versioning.receivers.trigger_update_version_webhooks"
+    )
+    trigger_update_version_webhooks_mock.delay.side_effect = (
+        lambda **kwargs: flags_when_webhooks_triggered.extend(
+            get_environment_flags_list(environment_v2_versioning)
+        )
+    )
+
+    # When
+    version_2.publish(staff_user)
+
+    # Then
+    trigger_update_version_webhooks_mock.delay.assert_called_once()
+    assert flags_when_webhooks_triggered == list(version_2.feature_states.all())
+
+
+def test_rebuild_live_feature_states__unchanged__only_locks_environment(
+    environment: Environment,
+    feature: Feature,
+    segment_featurestate: FeatureState,
+    identity_featurestate: FeatureState,
+) -> None:
+    # Given
+    rebuild_live_feature_states(environment)
+    live_feature_state_ids = set(LiveFeatureState.objects.values_list("id", flat=True))
+
+    # When
+    with CaptureQueriesContext(connection) as captured_queries:
+        rebuild_live_feature_states(environment)
+
+    # Then
+    assert (
+        set(LiveFeatureState.objects.values_list("id", flat=True))
+        == live_feature_state_ids
+    )
+    assert LiveFeatureState.objects.get(
+        feature_state=segment_featurestate
+    ).feature_segment_id == (segment_featurestate.feature_segment_id)
+    assert any("FOR UPDATE" in query["sql"] for query in captured_queries)
+    assert not any(
+        query["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+        for query in captured_queries
+    )
+
+
+def test_live_feature_state__duplicate_environment_default__raises_integrity_error(
+    environment: Environment,
+    feature: Feature,
+) -> None:
+    # Given
+    rebuild_live_feature_states(environment)
+
+    # When
+    with pytest.raises(IntegrityError):
+        LiveFeatureState.objects.create(environment=environment, feature=feature)
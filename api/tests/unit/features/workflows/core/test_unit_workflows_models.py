@@ -8,6 +8,7 @@ from django.db.models import Q
 from django.utils import timezone
 from flag_engine.segments.constants import EQUAL, PERCENTAGE_SPLIT
 from freezegun.api import FrozenDateTimeFactory
+from pytest_django.fixtures import SettingsWrapper
 from pytest_mock import MockerFixture
 
 from audit.constants import (
@@ -27,7 +28,10 @@ from features.versioning.models import (
     VersionChangeSet,
 )
 from features.versioning.tasks import publish_version_change_set
-from features.versioning.versioning_service import get_environment_flags_list
+from features.versioning.versioning_service import (
+    get_environment_flags_list,
+    rebuild_live_feature_states,
+)
 from features.workflows.core.exceptions import (
     CannotApproveOwnChangeRequest,
     ChangeRequestDeletionError,
@@ -647,6 +651,46 @@ def test_commit_change_request_publishes_environment_feature_versions(  # type:
     )
 
 
+def test_commit_change_request__live_feature_states__refreshed_before_webhooks(
+    environment_v2_versioning: Environment,
+    feature: Feature,
+    admin_user: FFAdminUser,
+    settings: SettingsWrapper,
+    mocker: MockerFixture,
+) -> None:
+    # Given
+    settings.MAINTAIN_LIVE_FEATURE_STATES = True
+    settings.USE_LIVE_FEATURE_STATES = True
+    rebuild_live_feature_states(environment_v2_versioning)
+
+    change_request = ChangeRequest.objects.create(
+        title="Test CR", environment=environment_v2_versioning, user=admin_user
+    )
+    environment_feature_version = EnvironmentFeatureVersion.objects.create(
+        environment=environment_v2_versioning, feature=feature
+    )
+    change_request.environment_feature_versions.add(environment_feature_version)
+
+    flags_when_webhooks_triggered = []
+    mock_trigger_update_version_webhooks = mocker.patch(
+        "core.workflows_services.trigger_update_version_webhooks"
+    )
+    mock_trigger_update_version_webhooks.delay.side_effect = (
+        lambda **kwargs: flags_when_webhooks_triggered.extend(
+            get_environment_flags_list(environment_v2_versioning)
+        )
+    )
+
+    # When
+    change_request.commit(admin_user)
+
+    # Then
+    mock_trigger_update_version_webhooks.delay.assert_called_once()
+    assert flags_when_webhooks_triggered == list(
+        environment_feature_version.feature_states.all()
+    )
+
+
 def test_cannot_delete_committed_change_request(
     change_request: ChangeRequest, admin_user: FFAdminUser
 ) -> None:
@@ -4,10 +4,12 @@ from unittest import mock
 import pytest
 from django.conf import settings
 from django.utils import timezone
+from pytest_django import DjangoAssertNumQueries
 from pytest_django.fixtures import SettingsWrapper
 
 from organisations.models import Organisation
 from projects.models import EdgeV2MigrationStatus, Project
+from segments.definitions import get_segment_definitions_cache_key
 from segments.models import Segment
 
 now = timezone.now()
@@ -84,6 +86,81 @@ def test_get_segments_from_cache_set_to_empty_list(
     mock_project_segments_cache.set.assert_called_once()
 
 
+def test_get_segment_definitions_from_cache__cache_miss__sets_live_segments(
+    project: Project,
+    segment: Segment,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Given
+    mock_project_segments_cache = mock.MagicMock()
+    mock_project_segments_cache.get.return_value = None
+
+    monkeypatch.setattr(
+        "projects.services.project_segments_cache", mock_project_segments_cache
+    )
+
+    # When
+    segment_definitions = project.get_segment_definitions_from_cache(now)
+
+    # Then
+    assert [segment_definition.id for segment_definition in segment_definitions] == [
+        segment.id
+    ]
+    mock_project_segments_cache.set.assert_called_once_with(
+        get_segment_definitions_cache_key(project.id),
+        (now, segment_definitions),
+        timeout=settings.CACHE_PROJECT_SEGMENTS_SECONDS,
+    )
+
+
+def test_get_segment_definitions_from_cache__cache_hit__does_not_query(
+    project: Project,
+    monkeypatch: pytest.MonkeyPatch,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    # Given
+    mock_project_segments_cache = mock.MagicMock()
+    mock_project_segments_cache.get.return_value = (now, [])
+
+    monkeypatch.setattr(
+        "projects.services.project_segments_cache", mock_project_segments_cache
+    )
+
+    # When
+    with django_assert_num_queries(0):
+        segment_definitions = project.get_segment_definitions_from_cache(yesterday)
+
+    # Then
+    assert segment_definitions == []
+    mock_project_segments_cache.get.assert_called_once_with(
+        get_segment_definitions_cache_key(project.id)
+    )
+    mock_project_segments_cache.set.assert_not_called()
+
+
+def test_get_segment_definitions_from_cache__cached_before_update__rebuilds(
+    project: Project,
+    segment: Segment,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Given
+    mock_project_segments_cache = mock.MagicMock()
+    mock_project_segments_cache.get.return_value = (yesterday, [])
+
+    monkeypatch.setattr(
+        "projects.services.project_segments_cache", mock_project_segments_cache
+    )
+
+    # When
+    segment_definitions = project.get_segment_definitions_from_cache(now)
+
+    # Then
+    assert [segment_definition.id for segment_definition in segment_definitions] == [
+        segment.id
+    ]
+    mock_project_segments_cache.set.assert_called_once()
+
+
 @pytest.mark.parametrize(
     "edge_enabled, expected_enable_dynamo_db_value",
     ((True, True), (False, False)),
@@ -0,0 +1,126 @@
+from flag_engine.segments import constants
+from pytest_django import DjangoAssertNumQueries
+
+from projects.models import Project
+from segments.definitions import (
+    ConditionDefinition,
+    SegmentDefinition,
+    SegmentRuleDefinition,
+    get_segment_definitions,
+)
+from segments.models import Condition, Segment, SegmentRule
+
+
+def test_get_segment_definitions__nested_rules__returns_definitions_in_three_queries(
+    segment: Segment,
+    another_segment: Segment,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    # Given
+    # rules nested deeper than any prefetch would reach
+    parent_rule = SegmentRule.objects.create(segment=segment, type=SegmentRule.ALL_RULE)
+    Condition.objects.create(
+        rule=parent_rule, operator=constants.EQUAL, property="foo", value="bar"
+    )
+    for depth in range(4):
+        parent_rule = SegmentRule.objects.create(
+            rule=parent_rule, type=SegmentRule.ANY_RULE
+        )
+        Condition.objects.create(
+            rule=parent_rule,
+            operator=constants.EQUAL,
+            property="depth",
+            value=str(depth),
+        )
+
+    # When
+    with django_assert_num_queries(3):
+        segment_definitions = get_segment_definitions(
+            Segment.objects.filter(id__in=[segment.id, another_segment.id])
+        )
+
+    # Then
+    def _expected_rule(depth: int) -> SegmentRuleDefinition:
+        return SegmentRuleDefinition(
+            type=SegmentRule.ANY_RULE,
+            rules=(_expected_rule(depth + 1),) if depth < 3 else (),
+            conditions=(
+                ConditionDefinition(
+                    operator=constants.EQUAL, property="depth", value=str(depth)
+                ),
+            ),
+        )
+
+    assert segment_definitions == [
+        SegmentDefinition(
+            id=segment.id,
+            name=segment.name,
+            description=segment.description,
+            rules=(
+                SegmentRuleDefinition(
+                    type=SegmentRule.ALL_RULE,
+                    rules=(_expected_rule(0),),
+                    conditions=(
+                        ConditionDefinition(
+                            operator=constants.EQUAL, property="foo", value="bar"
+                        ),
+                    ),
+                ),
+            ),
+        ),
+        SegmentDefinition(
+            id=another_segment.id,
+            name=another_segment.name,
+            description=another_segment.description,
+            rules=(),
+        ),
+    ]
+
+
+def test_get_segment_definitions__deleted_rules_and_conditions__excluded(
+    segment: Segment,
+) -> None:
+    # Given
+    rule = SegmentRule.objects.create(segment=segment, type=SegmentRule.ALL_RULE)
+    Condition.objects.create(
+        rule=rule, operator=constants.EQUAL, property="foo", value="bar"
+    )
+    Condition.objects.create(
+        rule=rule, operator=constants.EQUAL, property="foo", value="baz"
+    ).delete()
+
+    deleted_rule = SegmentRule.objects.create(
+        segment=segment, type=SegmentRule.ANY_RULE
+    )
+    SegmentRule.objects.create(rule=deleted_rule, type=SegmentRule.ALL_RULE)
+    deleted_rule.delete()
+
+    # When
+    segment_definitions = get_segment_definitions(Segment.objects.filter(id=segment.id))
+
+    # Then
+    assert segment_definitions[0].rules == (
+        SegmentRuleDefinition(
+            type=SegmentRule.ALL_RULE,
+            rules=(),
+            conditions=(
+                ConditionDefinition(
+                    operator=constants.EQUAL, property="foo", value="bar"
+                ),
+            ),
+        ),
+    )
+
+
+def test_get_segment_definitions__no_segments__returns_empty_list(
+    project: Project,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    # When
+    with django_assert_num_queries(1):
+        segment_definitions = get_segment_definitions(
+            Segment.objects.filter(project=project)
+        )
+
+    # Then
+    assert segment_definitions == []
@@ -0,0 +1,361 @@
+import typing
+
+import pytest
+from flag_engine.context.types import EvaluationContext
+from flag_engine.identities.traits.types import ContextValue
+from flag_engine.segments import constants
+from flag_engine.segments.evaluator import is_context_in_segment
+from flag_engine.segments.models import (
+    SegmentConditionModel,
+    SegmentModel,
+    SegmentRuleModel,
+)
+from pytest_django import DjangoAssertNumQueries
+
+from environments.models import Environment
+from features.models import Feature, FeatureSegment, FeatureState
+from segments.evaluator import (
+    CompiledSegment,
+    SegmentIndex,
+    get_environment_segment_index,
+)
+from segments.models import Condition, Segment, SegmentRule
+
+
+def _get_context(traits: dict[str, typing.Any]) -> EvaluationContext:
+    return {
+        "environment": {"key": "api-key", "name": "Test Environment"},
+        "identity": {
+            "identifier": "identity",
+            "key": "api-key_identity",
+            "traits": traits,
+        },
+    }
+
+
+@pytest.mark.parametrize(
+    "operator, property_, value",
+    [
+        (constants.EQUAL, "foo", "bar"),
+        (constants.EQUAL, "num", "10"),
+        (constants.EQUAL, "flag", "true"),
+        (constants.NOT_EQUAL, "foo", "bar"),
+        (constants.GREATER_THAN, "num", "5"),
+        (constants.GREATER_THAN_INCLUSIVE, "num", "10"),
+        (constants.LESS_THAN, "num", "5.5"),
+        (constants.LESS_THAN_INCLUSIVE, "version", "1.2.3:semver"),
+        (constants.CONTAINS, "foo", "ba"),
+        (constants.NOT_CONTAINS, "foo", "ba"),
+        (constants.REGEX, "foo", "^b.r$"),
+        (constants.MODULO, "num", "3|1"),
+        (constants.MODULO, "num", "invalid"),
+        (constants.IN, "foo", "bar,baz"),
+        (constants.IN, "num", "10,11"),
+        (constants.IS_SET, "foo", None),
+        (constants.IS_NOT_SET, "foo", None),
+        (constants.IS_NOT_SET, "missing", None),
+        (constants.PERCENTAGE_SPLIT, None, "50"),
+        (constants.PERCENTAGE_SPLIT, "foo", "50"),
+        (constants.EQUAL, "$.identity.identifier", "identity"),
+        (constants.EQUAL, "$.environment.name", "Test Environment"),
+    ],
+)
+@pytest.mark.parametrize(
+    "traits",
+    [
+        {},
+        {"foo": "bar", "num": 10, "flag": True, "version": "1.2.3"},
+        {"foo": "baz", "num": 4.5, "flag": False, "version": "2.0.0"},
+    ],
+)
+@pytest.mark.parametrize(
+    "rule_type",
+    [constants.ALL_RULE, constants.ANY_RULE, constants.NONE_RULE],
+)
+def test_compiled_segment_matches__returns_same_result_as_engine(
+    operator: str,
+    property_: str | None,
+    value: str | None,
+    traits: dict[str, typing.Any],
+    rule_type: str,
+) -> None:
+    # Given
+    segment_model = SegmentModel(
+        id=1,
+        name="segment",
+        rules=[
+            SegmentRuleModel(
+                type=rule_type,  # type: ignore[arg-type]
+                conditions=[
+                    SegmentConditionModel(
+                        operator=operator,  # type: ignore[arg-type]
+                        property_=property_,
+                        value=value,
+                    )
+                ],
+                rules=[
+                    SegmentRuleModel(
+                        type=constants.ANY_RULE,
+                        conditions=[
+                            SegmentConditionModel(
+                                operator=constants.IS_NOT_SET, property_="other"
+                            )
+                        ],
+                    )
+                ],
+            )
+        ],
+    )
+    context = _get_context(traits)
+
+    # When
+    result = CompiledSegment(segment_model, segment_model).matches(context)
+
+    # Then
+    assert result is is_context_in_segment(context=context, segment=segment_model)
+
+
+def test_compiled_segment_matches__returns_false_for_segment_without_rules() -> None:
+    # Given
+    segment_model = SegmentModel(id=1, name="segment")
+
+    # When
+    result = CompiledSegment(segment_model, segment_model).matches(_get_context({}))
+
+    # Then
+    assert result is False
+
+
+def test_segment_index_get_matching_segments__returns_matching_segments(
+    segment: Segment,
+    another_segment: Segment,
+) -> None:
+    # Given
+    for segment_, value in ((segment, "bar"), (another_segment, "baz")):
+        rule = SegmentRule.objects.create(segment=segment_, type=SegmentRule.ALL_RULE)
+        Condition.objects.create(
+            rule=rule, operator=constants.EQUAL, property="foo", value=value
+        )
+
+    segment_index = SegmentIndex.from_segments(
+        Segment.objects.filter(id__in=[segment.id, another_segment.id])
+    )
+
+    # When
+    matching_segments = segment_index.get_matching_segments(
+        _get_context({"foo": "bar"})
+    )
+
+    # Then
+    assert matching_segments == [segment]
+
+
+def test_get_environment_segment_index__reuses_index_until_environment_updated(
+    environment: Environment,
+    feature: Feature,
+    segment: Segment,
+    django_assert_num_queries: DjangoAssertNumQueries,
+) -> None:
+    # Given
+    rule = SegmentRule.objects.create(segment=segment, type=SegmentRule.ALL_RULE)
+    Condition.objects.create(
+        rule=rule, operator=constants.EQUAL, property="foo", value="bar"
+    )
+    feature_segment = FeatureSegment.objects.create(
+        feature=feature, segment=segment, environment=environment
+    )
+    FeatureState.objects.create(
+        feature=feature, environment=environment, feature_segment=feature_segment
+    )
+    environment.refresh_from_db()
+
+    segment_index = get_environment_segment_index(environment, overrides_only=True)
+
+    # When
+    with django_assert_num_queries(0):
+        cached_segment_index = get_environment_segment_index(
+            environment, overrides_only=True
+        )
+
+    environment.updated_at = environment.updated_at.replace(year=2000)
+    rebuilt_segment_index = get_environment_segment_index(
+        environment, overrides_only=True
+    )
+
+    # Then
+    assert cached_segment_index is segment_index
+    assert rebuilt_segment_index is not segment_index
+    assert [compiled.segment.id for compiled in segment_index.compiled_segments] == [
+        segment.id
+    ]
+
+
+def _build_segment_model(
+    segment_id: int,
+    rule_type: str,
+    conditions: list[tuple[str, str | None, str | None]],
+    sub_rule_conditions: list[tuple[str, str | None, str | None]] | None = None,
+) -> SegmentModel:
+    def _build_conditions(
+        conditions_: list[tuple[str, str | None, str | None]],
+    ) -> list[SegmentConditionModel]:
+        return [
+            SegmentConditionModel(
+                operator=operator,  # type: ignore[arg-type]
+                property_=property_,
+                value=value,
+            )
+            for operator, property_, value in conditions_
+        ]
+
+    return SegmentModel(
+        id=segment_id,
+        name=f"segment-{segment_id}",
+        rules=[
+            SegmentRuleModel(
+                type=rule_type,  # type: ignore[arg-type]
+                conditions=_build_conditions(conditions),
+                rules=(
+                    [
+                        SegmentRuleModel(
+                            type=constants.ALL_RULE,
+                            conditions=_build_conditions(sub_rule_conditions),
+                        )
+                    ]
+                    if sub_rule_conditions
+                    else []
+                ),
+            )
+        ],
+    )
+
+
+INDEXED_SEGMENT_MODELS = [
+    _build_segment_model(1, constants.ALL_RULE, [(constants.EQUAL, "foo", "bar")]),
+    _build_segment_model(
+        2,
+        constants.ANY_RULE,
+        [(constants.EQUAL, "foo", "baz"), (constants.GREATER_THAN, "num", "5")],
+    ),
+    _build_segment_model(3, constants.ALL_RULE, [(constants.IS_NOT_SET, "foo", None)]),
+    _build_segment_model(
+        4, constants.ALL_RULE, [(constants.PERCENTAGE_SPLIT, None, "100")]
+    ),
+    _build_segment_model(
+        5,
+        constants.NONE_RULE,
+        [(constants.EQUAL, "foo", "bar")],
+        sub_rule_conditions=[(constants.IS_SET, "num", None)],
+    ),
+    _build_segment_model(
+        6,
+        constants.ANY_RULE,
+        [(constants.EQUAL, "foo", "bar"), (constants.IS_NOT_SET, "num", None)],
+    ),
+    _build_segment_model(7, constants.ALL_RULE, [(constants.IS_SET, "other", None)]),
+    SegmentModel(id=8, name="segment-8"),
+]
+
+
+@pytest.mark.parametrize(
+    "traits, expected_candidate_ids",
+    [
+        ({}, [3, 4, 6]),
+        ({"foo": "bar"}, [1, 2, 3, 4, 6]),
+        ({"num": 10}, [2, 3, 4, 5, 6]),
+        ({"unrelated": "value"}, [3, 4, 6]),
+        ({"other": "value", "foo": "bar"}, [1, 2, 3, 4, 6, 7]),
+    ],
+)
+def test_segment_index_get_candidates__skips_segments_missing_required_traits(
+    traits: dict[str, typing.Any],
+    expected_candidate_ids: list[int],
+) -> None:
+    # Given
+    segment_index = SegmentIndex.from_segment_models(INDEXED_SEGMENT_MODELS)
+
+    # When
+    candidates = segment_index.get_candidates(_get_context(traits))
+
+    # Then
+    assert [candidate.id for candidate in candidates] == expected_candidate_ids
+
+
+@pytest.mark.parametrize(
+    "traits",
+    [
+        {},
+        {"foo": "bar"},
+        {"foo": "baz", "num": 10},
+        {"num": 1},
+        {"other": "value"},
+        {"foo": "bar", "num": 10, "other": "value"},
+    ],
+)
+def test_segment_index_get_matching_segments__returns_same_result_as_engine(
+    traits: dict[str, typing.Any],
+) -> None:
+    # Given
+    segment_index = SegmentIndex.from_segment_models(INDEXED_SEGMENT_MODELS)
+    context = _get_context(traits)
+
+    # When
+    matching_segments = segment_index.get_matching_segments(context)
+
+    # Then
+    assert matching_segments == [
+        segment_model
+        for segment_model in INDEXED_SEGMENT_MODELS
+        if is_context_in_segment(context=context, segment=segment_model)
+    ]
+
+
+def test_segment_index_get_matching_segments_for_contexts__returns_same_result_as_single_context() -> (
+    None
+):
+    # Given
+    segment_index = SegmentIndex.from_segment_models(
+        [
+            *INDEXED_SEGMENT_MODELS,
+            _build_segment_model(
+                9, constants.ALL_RULE, [(constants.PERCENTAGE_SPLIT, None, "50")]
+            ),
+            _build_segment_model(
+                10,
+                constants.ALL_RULE,
+                [(constants.EQUAL, "$.identity.identifier", "identity-1")],
+            ),
+        ]
+    )
+    contexts: list[EvaluationContext] = [
+        {
+            "environment": {"key": "api-key", "name": "Test Environment"},
+            "identity": {
+                "identifier": f"identity-{i}",
+                "key": f"api-key_identity-{i}",
+                "traits": traits,
+            },
+        }
+        for i in range(20)
+        for traits in typing.cast(
+            list[dict[str, ContextValue]],
+            [{}, {"foo": "bar"}, {"num": 10}, {"num": True}],
+        )
+    ]
+
+    # When
+    matching_segments = list(segment_index.get_matching_segments_for_contexts(contexts))
+
+    # Then
+    assert matching_segments == [
+        segment_index.get_matching_segments(context) for context in contexts
+    ]
+    assert (
+        len(
+            {
+                tuple(segment.id for segment in segments)
+                for segments in matching_segments
+            }
+        )
+        > 4
+    )
@@ -1,17 +1,23 @@
+import typing
+from unittest.mock import MagicMock
+
 import boto3
 import pytest
 from django.conf import settings
+from influxdb_client.client.exceptions import InfluxDBError
 from moto import mock_s3  # type: ignore[import-untyped]
 from pytest_lazyfixture import lazy_fixture  # type: ignore[import-untyped]
 from pytest_mock import MockerFixture
 
-from sse.dataclasses import SSEAccessLogs
+from sse.dataclasses import SSEUsage
 from sse.sse_service import (
+    process_access_logs,
     send_environment_update_message_for_environment,
     send_environment_update_message_for_project,
-    stream_access_logs,
 )
 
+S3Client = typing.Any
+
 
 def test_send_environment_update_message_for_project_schedules_task_correctly(  # type: ignore[no-untyped-def]
     mocker,
@@ -104,59 +110,152 @@ def test_send_environment_update_message_for_environment_schedules_task_correctl
     )
 
 
-@mock_s3  # type: ignore[misc]
-def test_stream_access_logs(mocker: MockerFixture, aws_credentials: None) -> None:
-    # Given - Some test data
-    first_log = SSEAccessLogs("2023-11-27T06:42:47+0000", "key_one")
-    second_log = SSEAccessLogs("2023-11-27T06:42:47+0000", "key_two")
-    third_log = SSEAccessLogs("2023-11-27T06:42:47+0000", "key_three")
+@pytest.fixture()
+def sse_logs_bucket(aws_credentials: None) -> typing.Generator[S3Client, None, None]:
+    with mock_s3():
+        s3_client = boto3.client("s3", region_name="eu-west-2")
+        s3_client.create_bucket(
+            Bucket=settings.AWS_SSE_LOGS_BUCKET_NAME,
+            CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+        )
+        yield s3_client
+
+
+@pytest.fixture()
+def mocked_gpg(mocker: MockerFixture) -> MagicMock:
+    """
+    Decrypt files by removing their `encrypted:` prefix, and fail to decrypt
+    files without it.
+    """
+
+    def decrypt_file(encrypted_file: typing.BinaryIO, output: str) -> MagicMock:
+        encrypted_data = encrypted_file.read()
+        if not encrypted_data.startswith(b"encrypted:"):
+            return MagicMock(ok=False, status="decryption failed")
+        with open(output, "wb") as decrypted_file:
+            decrypted_file.write(encrypted_data.removeprefix(b"encrypted:"))
+        return MagicMock(ok=True)
+
+    mocked_gpg = mocker.patch("sse.sse_service.gnupg.GPG", autospec=True)
+    mocked_gpg.return_value.decrypt_file.side_effect = decrypt_file
+    return mocked_gpg
+
+
+def _put_log_file(s3_client: S3Client, key: str, body: bytes) -> None:
+    s3_client.put_object(Body=body, Bucket=settings.AWS_SSE_LOGS_BUCKET_NAME, Key=key)
 
-    first_encrypted_object_data = b"first_bucket_encrypted_data"
-    first_decrypted_object_data = (
-        f"{first_log.generated_at},{first_log.api_key}\n"
-        f"{second_log.generated_at},{second_log.api_key}\n"
-        "some,invalid,log,entry,111,222".encode()
+
+def _get_log_file_keys(s3_client: S3Client) -> list[str]:
+    return [
+        log_file["Key"]
+        for log_file in s3_client.list_objects_v2(
+            Bucket=settings.AWS_SSE_LOGS_BUCKET_NAME
+        ).get("Contents", [])
+    ]
+
+
+def test_process_access_logs__aggregates_usage_and_deletes_files(
+    sse_logs_bucket: S3Client,
+    mocked_gpg: MagicMock,
+) -> None:
+    # Given
+    _put_log_file(
+        sse_logs_bucket,
+        "first_object",
+        b"encrypted:2023-11-27T06:42:47+0000,key_one\n"
+        b"2023-11-27T06:44:47+0000,key_two\n"
+        b"some,invalid,log,entry,111,222",
     )
-    second_encrypted_object_data = b"second_bucket_encrypted_data"
-    second_decrypted_object_data = (
-        f"{third_log.generated_at},{third_log.api_key}".encode()
+    _put_log_file(
+        sse_logs_bucket,
+        "second_object",
+        b"encrypted:2023-11-27T06:43:47+0000,key_one",
     )
+    write_usage = MagicMock()
 
-    # Next, let's create a bucket
-    bucket_name = settings.AWS_SSE_LOGS_BUCKET_NAME
-    s3_client = boto3.client("s3", region_name="eu-west-2")
-    s3_client.create_bucket(
-        Bucket=bucket_name,
-        CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
-    )
-    # put some objects
-    s3_client.put_object(
-        Body=first_encrypted_object_data, Bucket=bucket_name, Key="first_object"
+    # When
+    process_access_logs(write_usage=write_usage)
+
+    # Then
+    write_usage.assert_called_once_with(
+        {
+            "key_one": SSEUsage(
+                request_count=2,
+                last_event_generated_at="2023-11-27T06:43:47+0000",
+            ),
+            "key_two": SSEUsage(
+                request_count=1,
+                last_event_generated_at="2023-11-27T06:44:47+0000",
+            ),
+        }
     )
-    s3_client.put_object(
-        Body=second_encrypted_object_data, Bucket=bucket_name, Key="second_object"
+    assert mocked_gpg.return_value.decrypt_file.call_count == 2
+
+    # And, the bucket is now empty
+    assert _get_log_file_keys(sse_logs_bucket) == []
+
+
+def test_process_access_logs__write_fails__does_not_delete_files(
+    sse_logs_bucket: S3Client,
+    mocked_gpg: MagicMock,
+) -> None:
+    # Given
+    _put_log_file(
+        sse_logs_bucket,
+        "first_object",
+        b"encrypted:2023-11-27T06:42:47+0000,key_one",
     )
+    write_usage = MagicMock(side_effect=InfluxDBError(message="Failed"))
 
-    mocked_gpg = mocker.patch("sse.sse_service.gnupg.GPG", autospec=True)
+    # When
+    with pytest.raises(InfluxDBError):
+        process_access_logs(write_usage=write_usage)
 
-    mocked_gpg.return_value.decrypt.side_effect = [
-        mocker.MagicMock(data=first_decrypted_object_data),
-        mocker.MagicMock(data=second_decrypted_object_data),
-    ]
+    # Then
+    assert _get_log_file_keys(sse_logs_bucket) == ["first_object"]
+
+
+def test_process_access_logs__file_fails__leaves_file_for_next_time(
+    mocker: MockerFixture,
+    sse_logs_bucket: S3Client,
+    mocked_gpg: MagicMock,
+) -> None:
+    # Given
+    mocked_logger = mocker.patch("sse.sse_service.logger")
+    _put_log_file(
+        sse_logs_bucket,
+        "first_object",
+        b"encrypted:2023-11-27T06:42:47+0000,key_one",
+    )
+    _put_log_file(sse_logs_bucket, "second_object", b"corrupted")
+    write_usage = MagicMock()
 
     # When
-    access_logs = list(stream_access_logs())
+    process_access_logs(write_usage=write_usage)
 
     # Then
-    assert access_logs == [first_log, second_log, third_log]
-
-    # gpg decrypt was called correctly
-    mocked_gpg.return_value.decrypt.assert_has_calls(
-        [
-            mocker.call(first_encrypted_object_data),
-            mocker.call(second_encrypted_object_data),
-        ]
+    write_usage.assert_called_once_with(
+        {
+            "key_one": SSEUsage(
+                request_count=1,
+                last_event_generated_at="2023-11-27T06:42:47+0000",
+            ),
+        }
+    )
+    mocked_logger.exception.assert_called_once_with(
+        "Failed to process SSE access log file %s.", "second_object"
     )
+    assert _get_log_file_keys(sse_logs_bucket) == ["second_object"]
 
-    # And, bucket is now empty
-    assert "Contents" not in s3_client.list_objects(Bucket=bucket_name)
+
+def test_process_access_logs__no_files__does_not_write_usage(
+    sse_logs_bucket: S3Client,
+) -> None:
+    # Given
+    write_usage = MagicMock()
+
+    # When
+    process_access_logs(write_usage=write_usage)
+
+    # Then
+    write_usage.assert_not_called()
@@ -3,11 +3,10 @@ from unittest.mock import call
 
 import pytest
 from pytest_django import DjangoAssertNumQueries
-from pytest_django.fixtures import SettingsWrapper
 from pytest_mock import MockerFixture
 
 from environments.models import Environment
-from sse.dataclasses import SSEAccessLogs
+from sse.dataclasses import SSEUsage
 from sse.exceptions import SSEAuthTokenNotSet
 from sse.tasks import (
     get_auth_header,
@@ -95,23 +94,24 @@ def test_track_sse_usage(  # type: ignore[no-untyped-def]
     mocker: MockerFixture,
     environment: Environment,
     django_assert_num_queries: DjangoAssertNumQueries,
-    settings: SettingsWrapper,
 ):
-    # Given - two valid logs
-    first_access_log = SSEAccessLogs(datetime.now().isoformat(), environment.api_key)
-    second_access_log = SSEAccessLogs(datetime.now().isoformat(), environment.api_key)
-
-    # and, another log with invalid api key
-    third_access_log = SSEAccessLogs(datetime.now().isoformat(), "third_key")
+    # Given - usage for a valid environment
+    last_event_generated_at = datetime.now().isoformat()
+    usage = {
+        environment.api_key: SSEUsage(
+            request_count=2, last_event_generated_at=last_event_generated_at
+        ),
+        # and, for an invalid api key
+        "third_key": SSEUsage(
+            request_count=1, last_event_generated_at=last_event_generated_at
+        ),
+    }
 
     mocker.patch(
-        "sse.sse_service.stream_access_logs",
-        return_value=[first_access_log, second_access_log, third_access_log],
+        "sse.sse_service.process_access_logs",
+        side_effect=lambda write_usage: write_usage(usage),
     )
-    influxdb_bucket = "test_bucket"
-    settings.INFLUXDB_BUCKET = influxdb_bucket
-
-    mocked_influx_db_client = mocker.patch("sse.tasks.influxdb_client")
+    mocked_get_influxdb_writer = mocker.patch("sse.tasks.get_influxdb_writer")
     mocked_influx_point = mocker.patch("sse.tasks.Point")
 
     # When
@@ -140,24 +140,11 @@ def test_track_sse_usage(  # type: ignore[no-untyped-def]
             .tag()
             .tag()
             .tag("organisation", environment.project.organisation.name),
-            call()
-            .field()
-            .tag()
-            .tag()
-            .tag()
-            .tag()
-            .tag()
-            .time(second_access_log.generated_at),
+            call().field().tag().tag().tag().tag().tag().time(last_event_generated_at),
         ]
     )
 
-    # Only valid logs were written to InfluxDB
-    write_method = (
-        mocked_influx_db_client.write_api.return_value.__enter__.return_value.write
-    )
-
-    assert write_method.call_count == 1
-    write_method.assert_called_once_with(
-        bucket=influxdb_bucket,
-        record=mocked_influx_point().field().tag().tag().tag().tag().tag().time(),
+    # Only valid usage was written to InfluxDB
+    mocked_get_influxdb_writer.return_value.write_synchronously.assert_called_once_with(
+        [mocked_influx_point().field().tag().tag().tag().tag().tag().time()]
     )
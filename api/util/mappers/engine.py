@@ -47,6 +47,7 @@ if TYPE_CHECKING:  # pragma: no cover
     from integrations.webhook.models import WebhookConfiguration
     from organisations.models import Organisation
     from projects.models import Project
+    from segments.definitions import SegmentDefinition, SegmentRuleDefinition
     from segments.models import Segment, SegmentRule
 
 
@@ -56,6 +57,7 @@ __all__ = (
     "map_feature_to_engine",
     "map_identity_to_engine",
     "map_mv_option_to_engine",
+    "map_segment_definition_to_engine",
     "map_segment_to_engine",
     "map_traits_to_engine",
 )
@@ -107,6 +109,39 @@ def map_segment_rule_to_engine(
     )
 
 
+def map_segment_definition_to_engine(
+    segment: "SegmentDefinition",
+) -> SegmentModel:
+    return SegmentModel(
+        id=segment.id,
+        name=segment.name,
+        rules=[
+            map_segment_rule_definition_to_engine(segment_rule)
+            for segment_rule in segment.rules
+        ],
+    )
+
+
+def map_segment_rule_definition_to_engine(
+    segment_rule: "SegmentRuleDefinition",
+) -> SegmentRuleModel:
+    return SegmentRuleModel(
+        type=segment_rule.type,  # type: ignore[arg-type]
+        rules=[
+            map_segment_rule_definition_to_engine(segment_sub_rule)
+            for segment_sub_rule in segment_rule.rules
+        ],
+        conditions=[
+            SegmentConditionModel(
+                operator=condition.operator,  # type: ignore[arg-type]
+                value=condition.value,
+                property_=condition.property,
+            )
+            for condition in segment_rule.conditions
+        ],
+    )
+
+
 def map_integration_to_engine(
     integration: Optional["EnvironmentIntegrationModel"],
 ) -> Optional[IntegrationModel]: